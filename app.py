@@ -1,16 +1,70 @@
-from flask import Flask,request,render_template
-import numpy as np
+from flask import Flask,request,render_template,jsonify,g,Response
 import pandas as pd
 import json
 import os
+import time
 
-from sklearn.preprocessing import StandardScaler
-from src.pipeline.predict_pipeline import CustomData,PredictPipeline
+from src.pipeline.predict_pipeline import CustomData,PredictPipeline,SegmentPipeline,FEATURE_COLUMNS
+from src.pipeline.model_registry import get_registry
+from src.pipeline.prediction_cache import get_prediction_cache
+from src.metrics import metrics
+from src.pipeline.micro_batcher import get_micro_batcher
+from src.components.ensemble import request_deadline
+from src.pipeline.warmup import warm_up
+from src.pipeline.rank_leads import rank_leads
+from src.logger import inference_logger,queue_handler
 
 application=Flask(__name__)
 
 app=application
 
+# load the artifacts and score a dummy record before the worker takes traffic;
+# with gunicorn --preload this runs once in the master and is shared by forked workers
+if os.environ.get('WARMUP_ON_START','1')!='0':
+	warm_up()
+
+# 'direct' scores each request on its own thread, 'microbatch' groups concurrent requests
+SERVING_MODE=os.environ.get('SERVING_MODE','direct')
+
+def predict_one(record):
+	"""Label for one customer record, through the micro-batcher when enabled."""
+	if SERVING_MODE=='microbatch':
+		return get_micro_batcher().predict(record)
+	return PredictPipeline().predict_record(record)[0]
+
+def record_hash(record):
+	"""Stable id of a customer record for the inference log, which must not hold the raw fields."""
+	return PredictPipeline._cache_key(record).hex()
+
+# optional per-request latency budget; ensemble members that would miss it are dropped
+REQUEST_DEADLINE_MS=os.environ.get('REQUEST_DEADLINE_MS')
+
+@app.before_request
+def start_request_timer():
+	g.request_start=time.perf_counter()
+	if REQUEST_DEADLINE_MS:
+		g.deadline_token=request_deadline.set(time.monotonic()+float(REQUEST_DEADLINE_MS)/1000.0)
+
+def _record_request(status):
+	start=g.pop('request_start',None)
+	if start is not None:
+		endpoint=request.endpoint or 'unknown'
+		metrics.observe('request_latency_seconds',time.perf_counter()-start,endpoint=endpoint)
+		metrics.inc('requests_total',endpoint=endpoint,status=str(status))
+
+@app.after_request
+def record_request_metrics(response):
+	_record_request(response.status_code)
+	return response
+
+@app.teardown_request
+def finish_request(exc):
+	# an unhandled error can skip after_request; count it as a 500 here
+	_record_request(500)
+	token=g.pop('deadline_token',None)
+	if token is not None:
+		request_deadline.reset(token)
+
 ## Route for a home page
 
 @app.route('/')
@@ -22,34 +76,139 @@ def predict_datapoint():
 	if request.method=='GET':
 		return render_template('home.html')
 	else:
-		data=CustomData(
-			Age=int(request.form.get('Age')),
-			TypeofContact=request.form.get('TypeofContact'),
-			CityTier=int(request.form.get('CityTier')),
-			DurationOfPitch=float(request.form.get('DurationOfPitch')),
-			Occupation=request.form.get('Occupation'),
-			Gender=request.form.get('Gender'),
-			NumberOfPersonVisiting=int(request.form.get('NumberOfPersonVisiting')),
-			NumberOfFollowups=float(request.form.get('NumberOfFollowups')),
-			ProductPitched=request.form.get('ProductPitched'),
-			PreferredPropertyStar=float(request.form.get('PreferredPropertyStar')),
-			MaritalStatus=request.form.get('MaritalStatus'),
-			NumberOfTrips=float(request.form.get('NumberOfTrips')),
-			Passport=int(request.form.get('Passport')),
-			PitchSatisfactionScore=int(request.form.get('PitchSatisfactionScore')),
-			OwnCar=int(request.form.get('OwnCar')),
-			NumberOfChildrenVisiting=float(request.form.get('NumberOfChildrenVisiting')),
-			Designation=request.form.get('Designation'),
-			MonthlyIncome=float(request.form.get('MonthlyIncome')),
-		)
+		with metrics.span('parse_form'):
+			data=CustomData(
+				Age=int(request.form.get('Age')),
+				TypeofContact=request.form.get('TypeofContact'),
+				CityTier=int(request.form.get('CityTier')),
+				DurationOfPitch=float(request.form.get('DurationOfPitch')),
+				Occupation=request.form.get('Occupation'),
+				Gender=request.form.get('Gender'),
+				NumberOfPersonVisiting=int(request.form.get('NumberOfPersonVisiting')),
+				NumberOfFollowups=float(request.form.get('NumberOfFollowups')),
+				ProductPitched=request.form.get('ProductPitched'),
+				PreferredPropertyStar=float(request.form.get('PreferredPropertyStar')),
+				MaritalStatus=request.form.get('MaritalStatus'),
+				NumberOfTrips=float(request.form.get('NumberOfTrips')),
+				Passport=int(request.form.get('Passport')),
+				PitchSatisfactionScore=int(request.form.get('PitchSatisfactionScore')),
+				OwnCar=int(request.form.get('OwnCar')),
+				NumberOfChildrenVisiting=float(request.form.get('NumberOfChildrenVisiting')),
+				Designation=request.form.get('Designation'),
+				MonthlyIncome=float(request.form.get('MonthlyIncome')),
+			)
 		
-		pred_df=data.get_data_as_data_frame()
-		print(pred_df)
+		with metrics.span('build_record'):
+			record=data.get_data_as_dict()
+
+		result=predict_one(record)
+		inference_logger.info('prediction',extra={'endpoint':'predictdata','prediction':int(result),'record_hash':record_hash(record)})
+		label = 'Will Purchase' if int(result)==1 else 'Will Not Purchase'
+		with metrics.span('render_template'):
+			return render_template('home.html',results=label)
+
+@app.route('/predict',methods=['POST'])
+def predict_json():
+	record=request.get_json(silent=True)
+	if not isinstance(record,dict):
+		return jsonify({'error':'Expected a JSON object with customer fields'}),400
+	missing=[col for col in FEATURE_COLUMNS if col not in record]
+	if missing:
+		return jsonify({'error':f'Missing columns: {missing}'}),400
+	result=int(predict_one(record))
+	inference_logger.info('prediction',extra={'endpoint':'predict','prediction':result,'record_hash':record_hash(record)})
+	return jsonify({'prediction':result})
+
+def read_batch_request():
+	"""Parse a JSON array / {"records": [...]} body or a CSV upload; returns (DataFrame, error response)."""
+	if 'file' in request.files:
+		batch_df=pd.read_csv(request.files['file'])
+	else:
+		payload=request.get_json(silent=True)
+		if isinstance(payload,dict):
+			payload=payload.get('records')
+		if not isinstance(payload,list):
+			return None,(jsonify({'error':'Expected a JSON array of records or a CSV upload in field "file"'}),400)
+		batch_df=pd.DataFrame.from_records(payload)
+
+	missing=[col for col in FEATURE_COLUMNS if col not in batch_df.columns]
+	if missing:
+		return None,(jsonify({'error':f'Missing columns: {missing}'}),400)
+	return batch_df,None
+
+@app.route('/predict/batch',methods=['POST'])
+def predict_batch():
+	batch_df,error=read_batch_request()
+	if error:
+		return error
+
+	start=time.perf_counter()
+	labels,probabilities=PredictPipeline().predict_batch(batch_df)
+	elapsed=time.perf_counter()-start
+	rows=len(batch_df)
+	metrics.inc('rows_scored_total',rows,endpoint='predict_batch')
+	return jsonify({
+		'predictions':[int(label) for label in labels],
+		'probabilities':None if probabilities is None else [float(p) for p in probabilities],
+		'rows':rows,
+		'seconds':elapsed,
+		'rows_per_second':rows/elapsed if elapsed>0 else None,
+	})
+
+@app.route('/rank',methods=['POST'])
+def rank_batch():
+	batch_df,error=read_batch_request()
+	if error:
+		return error
+
+	k=request.args.get('k',100,type=int)
+	if k is None or k<1:
+		return jsonify({'error':'k must be a positive integer'}),400
+	per_segment=request.args.get('per_segment','0').lower() in ('1','true','yes')
+	start=time.perf_counter()
+	ranked=rank_leads(batch_df,k,per_segment=per_segment)
+	elapsed=time.perf_counter()-start
+	response={'k':k,'rows':len(batch_df),'seconds':elapsed}
+	if per_segment:
+		response['segments']={str(seg):json.loads(leads.to_json(orient='records')) for seg,leads in ranked.items()}
+	else:
+		response['leads']=json.loads(ranked.to_json(orient='records'))
+	return jsonify(response)
+
+@app.route('/segment',methods=['POST'])
+def assign_segment():
+	record=request.get_json(silent=True)
+	if not isinstance(record,dict):
+		return jsonify({'error':'Expected a JSON object with customer fields'}),400
+	missing=[col for col in FEATURE_COLUMNS if col not in record]
+	if missing:
+		return jsonify({'error':f'Missing columns: {missing}'}),400
+	return jsonify(SegmentPipeline().assign_record(record))
+
+@app.route('/segment/batch',methods=['POST'])
+def assign_segment_batch():
+	batch_df,error=read_batch_request()
+	if error:
+		return error
 
-		predict_pipeline=PredictPipeline()
-		results=predict_pipeline.predict(pred_df)
-		label = 'Will Purchase' if int(results[0])==1 else 'Will Not Purchase'
-		return render_template('home.html',results=label)
+	with_predictions=request.args.get('with_predictions','0').lower() in ('1','true','yes')
+	start=time.perf_counter()
+	result=SegmentPipeline().score_batch(batch_df,with_predictions=with_predictions)
+	elapsed=time.perf_counter()-start
+	rows=len(batch_df)
+	metrics.inc('rows_scored_total',rows,endpoint='assign_segment_batch')
+	response={
+		'segments':[int(seg) for seg in result['segments']],
+		'strategies':result['strategies'],
+		'rows':rows,
+		'seconds':elapsed,
+		'rows_per_second':rows/elapsed if elapsed>0 else None,
+	}
+	if with_predictions:
+		response['predictions']=[int(label) for label in result['labels']]
+		probabilities=result['probabilities']
+		response['probabilities']=None if probabilities is None else [float(p) for p in probabilities]
+	return jsonify(response)
 
 @app.route('/segments')
 def view_segments():
@@ -61,6 +220,32 @@ def view_segments():
 	profiles = meta.get('profiles', {})
 	return render_template('segments.html', meta=meta, profiles=profiles)
 
+@app.route('/registry')
+def registry_stats():
+	return jsonify(get_registry().stats())
+
+@app.route('/cache')
+def cache_stats():
+	return jsonify(get_prediction_cache().stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+	registry=get_registry().stats()
+	cache=get_prediction_cache().stats()
+	gauges={
+		'model_registry_last_load_seconds':registry['last_load_seconds'],
+		'prediction_cache_entries':cache['entries'],
+		'prediction_cache_bytes':cache['bytes'],
+	}
+	counters={
+		'model_registry_loads_total':registry['load_count'],
+		'prediction_cache_hits_total':cache['hits'],
+		'prediction_cache_misses_total':cache['misses'],
+		'prediction_cache_evictions_total':cache['evictions'],
+		'log_records_dropped_total':queue_handler.dropped,
+	}
+	return Response(metrics.render(gauges,counters),mimetype='text/plain; version=0.0.4')
+
 
 if __name__=="__main__":      
 	app.run(host="0.0.0.0",debug=True)        
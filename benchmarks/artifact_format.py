@@ -0,0 +1,85 @@
+"""
+Compare load time and peak RSS of the dill pickles in artifacts/ against the
+mmap-able artifact format (src.utils.save_artifact / load_artifact).
+
+Each load runs in a fresh interpreter so import cost and page cache sharing
+do not leak between measurements.
+
+	python -m benchmarks.artifact_format --repeat 5 --output bench_artifact_format.json
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from src.utils import load_object, save_artifact
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD_SCRIPT = """
+import json, resource, sys, time
+from src.utils import load_object, load_artifact
+kind, path = sys.argv[1], sys.argv[2]
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+obj = load_artifact(path, mmap_mode='r') if kind == 'artifact' else load_object(path)
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'seconds': elapsed, 'rss_before_kb': before, 'rss_after_kb': after}))
+"""
+
+
+def _measure(kind: str, path: str, repeat: int) -> dict:
+	runs = []
+	for _ in range(repeat):
+		out = subprocess.run(
+			[sys.executable, "-c", _CHILD_SCRIPT, kind, path],
+			cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+		)
+		runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+	return {
+		"load_seconds_median": statistics.median(r["seconds"] for r in runs),
+		"load_seconds_min": min(r["seconds"] for r in runs),
+		"peak_rss_kb": max(r["rss_after_kb"] for r in runs),
+		"load_rss_delta_kb": statistics.median(r["rss_after_kb"] - r["rss_before_kb"] for r in runs),
+	}
+
+
+def run(pickle_paths, repeat: int=5) -> dict:
+	results = {}
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		for pickle_path in pickle_paths:
+			name = os.path.splitext(os.path.basename(pickle_path))[0]
+			artifact_path = os.path.join(tmp_dir, name)
+			save_artifact(artifact_path, load_object(pickle_path))
+			results[name] = {
+				"dill": _measure("dill", os.path.abspath(pickle_path), repeat),
+				"artifact": _measure("artifact", artifact_path, repeat),
+			}
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("pickles", nargs="*",
+		default=[os.path.join("artifacts", "model.pkl"), os.path.join("artifacts", "preprocessor.pkl")])
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.pickles, repeat=args.repeat)
+	for name, formats in results.items():
+		for fmt, stats in formats.items():
+			print(f"{name:<14} {fmt:<9} load {stats['load_seconds_median'] * 1000:9.2f} ms  "
+				f"peak rss {stats['peak_rss_kb'] / 1024:8.1f} MiB  load delta {stats['load_rss_delta_kb'] / 1024:8.1f} MiB")
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,106 @@
+"""
+Check that the compiled single-row plan (src.pipeline.fast_path) reproduces
+preprocessor.transform bit for bit, and time both single-row paths.
+
+	python -m benchmarks.fast_path --rows 500 --output bench_fast_path.json
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.pipeline.fast_path import CompiledPreprocessor
+from src.components.feature_engineering import load_feature_engineer
+from src.utils import load_object
+
+
+def _time_per_call(fn, records, repeat: int) -> dict:
+	timings = []
+	for _ in range(repeat):
+		for record in records:
+			start = time.perf_counter()
+			fn(record)
+			timings.append(time.perf_counter() - start)
+	timings.sort()
+	return {
+		"median_us": statistics.median(timings) * 1e6,
+		"p99_us": timings[int(len(timings) * 0.99) - 1] * 1e6,
+	}
+
+
+def run(data_path: str, preprocessor_path: str, model_path: str, rows: int, repeat: int) -> dict:
+	preprocessor = load_object(preprocessor_path)
+	model = load_object(model_path)
+	compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+	df = pd.read_csv(data_path, nrows=rows).drop(columns=["ProdTaken"], errors="ignore")
+	records = df.to_dict("records")
+	feature_engineer = load_feature_engineer(os.path.join(os.path.dirname(preprocessor_path), "features.pkl"))
+	engineer_frame = feature_engineer.transform
+	engineer_record = feature_engineer.transform_record
+
+	mismatches = 0
+	for i, record in enumerate(records):
+		expected = preprocessor.transform(engineer_frame(df.iloc[[i]]))
+		if sparse.issparse(expected):
+			expected = expected.toarray()
+		actual = compiled.transform_record(engineer_record(record))
+		expected = np.ascontiguousarray(expected, dtype=np.float64)
+		if expected.shape != actual.shape or not np.array_equal(expected.view(np.uint64), actual.view(np.uint64)):
+			mismatches += 1
+
+	def pandas_transform(record):
+		return preprocessor.transform(engineer_frame(pd.DataFrame([record])))
+
+	def compiled_transform(record):
+		return compiled.transform_record(engineer_record(record))
+
+	def pandas_predict(record):
+		return model.predict(pandas_transform(record))
+
+	def compiled_predict(record):
+		return model.predict(compiled_transform(record))
+
+	results = {
+		"rows": len(records),
+		"bitwise_mismatches": mismatches,
+		"transform": {
+			"pandas": _time_per_call(pandas_transform, records, repeat),
+			"compiled": _time_per_call(compiled_transform, records, repeat),
+		},
+		"predict": {
+			"pandas": _time_per_call(pandas_predict, records, repeat),
+			"compiled": _time_per_call(compiled_predict, records, repeat),
+		},
+	}
+	for stage in ("transform", "predict"):
+		results[stage]["speedup"] = results[stage]["pandas"]["median_us"] / results[stage]["compiled"]["median_us"]
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--data", default=os.path.join("artifacts", "test.csv"))
+	parser.add_argument("--preprocessor", default=os.path.join("artifacts", "preprocessor.pkl"))
+	parser.add_argument("--model", default=os.path.join("artifacts", "model.pkl"))
+	parser.add_argument("--rows", type=int, default=500)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.data, args.preprocessor, args.model, args.rows, args.repeat)
+	print(json.dumps(results, indent=2))
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+	if results["bitwise_mismatches"]:
+		raise SystemExit(f"{results['bitwise_mismatches']} rows differ from preprocessor.transform")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,142 @@
+"""
+Latency that logging adds on the caller's thread, before and after the
+queue-based logger in src.logger:
+- sync:    the previous setup, a FileHandler writing every record inline
+- queued:  NonBlockingQueueHandler, the file is written by the listener thread
+- sampled: queued, per-prediction records additionally sampled by the
+           inference logger's SamplingFilter
+Measured per logging call and, when trained artifacts exist, per /predictdata
+request through the Flask test client. --disk-latency-ms adds a sleep to
+every file write to show the effect of a slow or contended disk.
+
+	python -m benchmarks.logging_overhead --calls 20000 --requests 500 --output bench_logging.json
+"""
+import os
+import json
+import time
+import queue
+import logging
+import argparse
+import itertools
+import tempfile
+import statistics
+import logging.handlers
+
+from src import logger as app_logger
+
+
+class _SlowFileHandler(logging.FileHandler):
+	def __init__(self, filename, delay_seconds: float):
+		super().__init__(filename, encoding="utf-8")
+		self.delay_seconds = delay_seconds
+
+	def emit(self, record):
+		if self.delay_seconds:
+			time.sleep(self.delay_seconds)
+		super().emit(record)
+
+
+def _configure(mode: str, path: str, delay_seconds: float, sample_rate: float):
+	"""Point the root logger at a fresh file in `mode`; returns a function that restores it."""
+	root = logging.getLogger()
+	inference = app_logger.inference_logger
+	saved_handlers, saved_filters = root.handlers[:], inference.filters[:]
+	file_handler = _SlowFileHandler(path, delay_seconds)
+	listener = None
+	if mode == "sync":
+		file_handler.setFormatter(logging.Formatter(app_logger.TEXT_FORMAT))
+		handler = file_handler
+	else:
+		file_handler.setFormatter(app_logger.JsonFormatter())
+		handler = app_logger.NonBlockingQueueHandler(queue.Queue(maxsize=100000))
+		listener = logging.handlers.QueueListener(handler.queue, file_handler)
+		listener.start()
+	root.handlers = [handler]
+	inference.filters = [app_logger.SamplingFilter(sample_rate)] if mode == "sampled" else []
+
+	def restore():
+		if listener is not None:
+			listener.stop()
+		file_handler.close()
+		root.handlers, inference.filters = saved_handlers, saved_filters
+		return getattr(handler, "dropped", 0)
+	return restore
+
+
+def _summary(timings: list) -> dict:
+	timings = sorted(timings)
+	return {
+		"mean_us": statistics.fmean(timings) * 1e6,
+		"p50_us": timings[len(timings) // 2] * 1e6,
+		"p99_us": timings[int(len(timings) * 0.99) - 1] * 1e6,
+	}
+
+
+def _per_call(calls: int) -> dict:
+	record = {"Age": 35, "MonthlyIncome": 22000.0, "ProductPitched": "Basic"}
+	timings = []
+	for i in range(calls):
+		start = time.perf_counter()
+		app_logger.inference_logger.info("prediction", extra={"endpoint": "predictdata", "prediction": i & 1, "record": record})
+		timings.append(time.perf_counter() - start)
+	return _summary(timings)
+
+
+# a distinct income for every request in every mode, so none is served from the prediction cache
+_incomes = itertools.count(20000.5)
+
+
+def _per_request(client, form: dict, requests: int) -> dict:
+	timings = []
+	for _ in range(requests):
+		form["MonthlyIncome"] = str(next(_incomes))
+		start = time.perf_counter()
+		response = client.post("/predictdata", data=form)
+		timings.append(time.perf_counter() - start)
+	summary = _summary(timings)
+	summary["status"] = response.status_code
+	return summary
+
+
+def run(calls: int, requests: int, delay_ms: float, sample_rate: float) -> dict:
+	results = {"calls": calls, "requests": requests, "disk_latency_ms": delay_ms, "sample_rate": sample_rate, "modes": {}}
+	client = form = None
+	if requests and os.path.exists(os.path.join("artifacts", "model.pkl")):
+		os.environ.setdefault("WARMUP_ON_START", "1")
+		import app
+		from src.pipeline.warmup import WARMUP_RECORD
+		client = app.app.test_client()
+		form = {key: str(value) for key, value in WARMUP_RECORD.items()}
+
+	with tempfile.TemporaryDirectory() as tmp:
+		for mode in ("sync", "queued", "sampled"):
+			restore = _configure(mode, os.path.join(tmp, f"{mode}.log"), delay_ms / 1000.0, sample_rate)
+			entry = {}
+			try:
+				entry["per_call"] = _per_call(calls)
+				if client is not None:
+					entry["predictdata"] = _per_request(client, form, requests)
+			finally:
+				entry["dropped"] = restore()
+			results["modes"][mode] = entry
+			print(mode, json.dumps(entry), flush=True)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--calls", type=int, default=20000)
+	parser.add_argument("--requests", type=int, default=500, help="/predictdata requests per mode, 0 to skip")
+	parser.add_argument("--disk-latency-ms", type=float, default=0.0)
+	parser.add_argument("--sample-rate", type=float, default=0.01)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.calls, args.requests, args.disk_latency_ms, args.sample_rate)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,82 @@
+"""
+Concurrent load test of single-customer scoring: N client threads call either
+PredictPipeline.predict_record directly or the MicroBatcher, and throughput and
+latency percentiles are reported for both.
+
+	python -m benchmarks.microbatch --clients 32 --requests 200 --max-wait-ms 3
+"""
+import os
+import json
+import time
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.micro_batcher import MicroBatcher, MicroBatcherConfig
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+def _load(records, clients: int, requests_per_client: int, call) -> dict:
+	latencies = [[] for _ in range(clients)]
+
+	def client(idx: int):
+		for i in range(requests_per_client):
+			record = records[(idx * requests_per_client + i) % len(records)]
+			start = time.perf_counter()
+			call(record)
+			latencies[idx].append(time.perf_counter() - start)
+
+	threads = [threading.Thread(target=client, args=(idx,)) for idx in range(clients)]
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	elapsed = time.perf_counter() - start
+
+	flat = np.array([value for per_client in latencies for value in per_client])
+	return {
+		"requests": int(flat.size),
+		"seconds": elapsed,
+		"requests_per_second": flat.size / elapsed,
+		"p50_ms": float(np.percentile(flat, 50) * 1000),
+		"p99_ms": float(np.percentile(flat, 99) * 1000),
+	}
+
+
+def run(data_path: str, clients: int, requests_per_client: int, max_wait_ms: float, max_batch_size: int) -> dict:
+	records = pd.read_csv(data_path).drop(columns=["ProdTaken"], errors="ignore").to_dict("records")
+	# the cache would turn repeated records into lookups, so it is off for both modes
+	pipeline = PredictPipeline(use_cache=False)
+	pipeline.registry.get()
+
+	direct = _load(records, clients, requests_per_client, pipeline.predict_record)
+	batcher = MicroBatcher(pipeline=pipeline, config=MicroBatcherConfig(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms))
+	try:
+		batched = _load(records, clients, requests_per_client, batcher.predict)
+	finally:
+		batcher.close()
+	return {"clients": clients, "max_wait_ms": max_wait_ms, "direct": direct, "microbatch": batched}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--data", default=os.path.join("artifacts", "test.csv"))
+	parser.add_argument("--clients", type=int, default=32)
+	parser.add_argument("--requests", type=int, default=200, help="requests per client")
+	parser.add_argument("--max-wait-ms", type=float, default=3.0)
+	parser.add_argument("--max-batch-size", type=int, default=256)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.data, args.clients, args.requests, args.max_wait_ms, args.max_batch_size)
+	print(json.dumps(results, indent=2))
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,94 @@
+"""
+Memory and runtime of the transformed feature matrix when a high-cardinality
+categorical column is one-hot encoded: CSR output kept end to end versus the
+old dense path (toarray + np.c_ with the target, then slicing it back off).
+
+	python -m benchmarks.sparse_features --rows 200000 --cardinalities 0,100,1000,10000
+"""
+import json
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import generate_travel_frame
+from src.components.data_transformation import DataTransformation
+from src.utils import matrix_nbytes
+
+
+def _measure(fn):
+	"""Run fn once; returns (result, seconds, peak traced MiB)."""
+	tracemalloc.start()
+	start = time.perf_counter()
+	result = fn()
+	seconds = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return result, seconds, peak / 2 ** 20
+
+
+def run(rows: int, cardinalities, seed: int=42, max_dense_mb: float=4096.0, fit_model: bool=True) -> dict:
+	from sklearn.linear_model import LogisticRegression
+
+	base = generate_travel_frame(rows, seed=seed)
+	rng = np.random.default_rng(seed)
+	results = {"rows": rows, "cases": []}
+	for cardinality in cardinalities:
+		df = base.copy()
+		if cardinality:
+			df["AgentCode"] = np.char.add("A", rng.integers(0, cardinality, size=rows).astype(str)).astype(object)
+		features = df.drop(columns=["ProdTaken"])
+		target = df["ProdTaken"].to_numpy()
+
+		transformer = DataTransformation()
+		transformer.data_transformation_config.sparse_threshold = 1.0
+		preprocessor = transformer.get_data_transformer_object(df)
+		X, sparse_seconds, sparse_peak = _measure(lambda: preprocessor.fit_transform(features))
+		case = {
+			"cardinality": cardinality,
+			"n_features": X.shape[1],
+			"density": X.nnz / (X.shape[0] * X.shape[1]),
+			"sparse": {"transform_seconds": sparse_seconds, "peak_mb": sparse_peak, "matrix_mb": matrix_nbytes(X) / 2 ** 20},
+		}
+
+		dense_mb = X.shape[0] * (X.shape[1] + 1) * 8 / 2 ** 20
+		if dense_mb <= max_dense_mb:
+			def dense_path():
+				arr = np.c_[preprocessor.transform(features).toarray(), target]
+				return arr[:, :-1], arr[:, -1]
+			(X_dense, _), dense_seconds, dense_peak = _measure(dense_path)
+			case["dense"] = {"transform_seconds": dense_seconds, "peak_mb": dense_peak, "matrix_mb": matrix_nbytes(X_dense) / 2 ** 20}
+		else:
+			X_dense = None
+			case["dense"] = {"skipped": f"estimated {dense_mb:.0f} MiB exceeds --max-dense-mb"}
+
+		if fit_model:
+			model = LogisticRegression(max_iter=1000)
+			_, case["sparse"]["fit_seconds"], _ = _measure(lambda: model.fit(X, target))
+			if X_dense is not None:
+				_, case["dense"]["fit_seconds"], _ = _measure(lambda: model.fit(X_dense, target))
+		results["cases"].append(case)
+		print(json.dumps(case), flush=True)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--rows", type=int, default=200000)
+	parser.add_argument("--cardinalities", default="0,100,1000,10000",
+		help="levels of the extra categorical column; 0 runs the plain Travel schema")
+	parser.add_argument("--max-dense-mb", type=float, default=4096.0, help="skip the dense path above this size")
+	parser.add_argument("--no-fit", action="store_true", help="only measure the transform")
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	cardinalities = [int(value) for value in args.cardinalities.split(",")]
+	results = run(args.rows, cardinalities, max_dense_mb=args.max_dense_mb, fit_model=not args.no_fit)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
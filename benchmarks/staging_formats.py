@@ -0,0 +1,66 @@
+"""
+Compare CSV, Parquet and Feather as the ingestion staging format: write time,
+file size, full read time and column-pruned read time (the segmentation stage
+reads every column except the target).
+
+	python -m benchmarks.staging_formats --rows 1000000 --output bench_staging.json
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic import generate_travel_frame
+from src.utils import write_dataset, read_dataset
+
+
+FORMATS = (".csv", ".parquet", ".feather")
+
+
+def _best_of(fn, repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def run(rows: int, repeat: int, seed: int=42) -> dict:
+	df = generate_travel_frame(rows, seed=seed)
+	pruned_columns = [col for col in df.columns if col != "ProdTaken"]
+	results = {"rows": rows, "formats": {}}
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		for ext in FORMATS:
+			path = os.path.join(tmp_dir, "train" + ext)
+			write_seconds = _best_of(lambda: write_dataset(df, path), repeat)
+			results["formats"][ext.lstrip(".")] = {
+				"write_seconds": write_seconds,
+				"size_mb": os.path.getsize(path) / 2 ** 20,
+				"read_seconds": _best_of(lambda: read_dataset(path), repeat),
+				"read_pruned_seconds": _best_of(lambda: read_dataset(path, columns=pruned_columns), repeat),
+			}
+	csv_stats = results["formats"]["csv"]
+	for stats in results["formats"].values():
+		stats["read_speedup_vs_csv"] = csv_stats["read_seconds"] / stats["read_seconds"]
+		stats["write_speedup_vs_csv"] = csv_stats["write_seconds"] / stats["write_seconds"]
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--rows", type=int, default=1000000)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.rows, args.repeat)
+	print(json.dumps(results, indent=2))
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,88 @@
+"""
+Cold-start cost of the serving process: time to import app.py, which heavy
+training-only modules that import drags in, and the latency of the first and
+second /predict request, with the warm-up hook (WARMUP_ON_START) on and off.
+Every measurement runs in a fresh interpreter so nothing is already imported.
+Needs trained artifacts under artifacts/.
+
+	python -m benchmarks.startup --runs 5 --output bench_startup.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+
+# modules the serving path should not need
+TRAINING_ONLY_MODULES = [
+	"sklearn.model_selection",
+	"sklearn.linear_model",
+	"xgboost",
+	"catboost",
+	"dill",
+	"src.components.model_trainer",
+	"src.components.data_transformation",
+]
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - start
+client = app.app.test_client()
+from src.pipeline.warmup import WARMUP_RECORD as record
+latencies = []
+for _ in range(2):
+	start = time.perf_counter()
+	response = client.post("/predict", json=record)
+	latencies.append(time.perf_counter() - start)
+print(json.dumps({
+	"import_seconds": import_seconds,
+	"first_request_seconds": latencies[0],
+	"second_request_seconds": latencies[1],
+	"status": response.status_code,
+	"loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def _probe(warmup: bool) -> dict:
+	env = dict(os.environ, WARMUP_ON_START="1" if warmup else "0")
+	out = subprocess.run(
+		[sys.executable, "-c", _PROBE % (TRAINING_ONLY_MODULES,)],
+		env=env, capture_output=True, text=True, check=True,
+	)
+	return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int) -> dict:
+	results = {"runs": runs}
+	for label, warmup in (("cold", False), ("warm_up", True)):
+		samples = [_probe(warmup) for _ in range(runs)]
+		results[label] = {
+			key: statistics.median(sample[key] for sample in samples)
+			for key in ("import_seconds", "first_request_seconds", "second_request_seconds")
+		}
+		results[label]["status"] = samples[-1]["status"]
+		results[label]["training_only_modules_loaded"] = samples[-1]["loaded"]
+		results[label]["time_to_first_response_seconds"] = results[label]["import_seconds"] + results[label]["first_request_seconds"]
+		print(label, json.dumps(results[label]), flush=True)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--runs", type=int, default=5)
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	results = run(args.runs)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,247 @@
+"""
+End-to-end benchmark of the training pipeline stages and the three inference
+paths (single-row, batch, streaming) on synthetic Travel-schema datasets.
+
+Every stage runs in a fresh process inside a scratch working directory, so
+the reported peak RSS belongs to that stage alone. Results are written as
+JSON and can be compared against an earlier run with --baseline.
+
+	python -m benchmarks.suite --sizes 10k,1m --output bench_results.json
+	python -m benchmarks.suite --sizes 10k --baseline bench_results.json
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import write_synthetic_dataset
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING_STAGES = ["ingestion", "transformation", "model_trainer", "segmentation"]
+INFERENCE_STAGES = ["inference_single", "inference_batch", "inference_streaming"]
+SOURCE_PATH = os.path.join("notebook", "data", "Travel.csv")
+
+
+def _parse_size(text: str) -> int:
+	text = text.strip().lower()
+	multiplier = {"k": 1000, "m": 1000000}.get(text[-1], 1)
+	return int(float(text.rstrip("km")) * multiplier)
+
+
+def _staged_paths():
+	from src.components.data_ingestion import DataIngestionConfig
+	config = DataIngestionConfig()
+	return config.train_data_path, config.test_data_path
+
+
+def _stage_ingestion(params: dict) -> int:
+	from src.components.data_ingestion import DataIngestion
+	ingestor = DataIngestion()
+	ingestor.ingestion_config.use_cache = False
+	ingestor.initiate_data_ingestion()
+	return params["rows"]
+
+
+def _stage_transformation(params: dict) -> int:
+	import numpy as np
+	from src.components.data_transformation import DataTransformation
+	from src.utils import save_matrix
+	transformer = DataTransformation()
+	transformer.data_transformation_config.use_cache = False
+	X_train, y_train, X_test, y_test, _ = transformer.initiate_data_transformation(*_staged_paths())
+	save_matrix(os.path.join("artifacts", "bench_train_X.npz"), X_train)
+	np.save(os.path.join("artifacts", "bench_train_y.npy"), y_train)
+	save_matrix(os.path.join("artifacts", "bench_test_X.npz"), X_test)
+	np.save(os.path.join("artifacts", "bench_test_y.npy"), y_test)
+	return X_train.shape[0] + X_test.shape[0]
+
+
+def _stage_model_trainer(params: dict) -> int:
+	import numpy as np
+	from src.components.model_trainer import ModelTrainer
+	from src.utils import load_matrix
+	X_train = load_matrix(os.path.join("artifacts", "bench_train_X.npz"))
+	y_train = np.load(os.path.join("artifacts", "bench_train_y.npy"))
+	X_test = load_matrix(os.path.join("artifacts", "bench_test_X.npz"))
+	y_test = np.load(os.path.join("artifacts", "bench_test_y.npy"))
+	trainer = ModelTrainer()
+	config = trainer.model_trainer_config
+	config.use_cache = False
+	config.search_strategy = params["search"]
+	config.max_fits_per_model = params["max_fits"]
+	config.search_time_budget_seconds = params["search_budget_seconds"]
+	trainer.initiate_model_trainer(X_train, y_train, X_test, y_test)
+	return X_train.shape[0]
+
+
+def _stage_segmentation(params: dict) -> int:
+	from src.components.segmentation import CustomerSegmentationTrainer
+	seg = CustomerSegmentationTrainer()
+	seg.config.use_cache = False
+	seg.train(*_staged_paths(), os.path.join("artifacts", "preprocessor.pkl"))
+	return params["rows"]
+
+
+def _stage_inference_single(params: dict) -> int:
+	from src.pipeline.predict_pipeline import PredictPipeline
+	from src.utils import read_dataset
+	records = read_dataset(_staged_paths()[1]).head(params["single_rows"]) \
+		.drop(columns=["ProdTaken"]).to_dict("records")
+	pipeline = PredictPipeline(use_cache=False)
+	pipeline.registry.get()
+	for record in records:
+		pipeline.predict_record(record)
+	return len(records)
+
+
+def _stage_inference_batch(params: dict) -> int:
+	from src.pipeline.predict_pipeline import PredictPipeline
+	from src.utils import read_dataset
+	df = read_dataset(_staged_paths()[1]).drop(columns=["ProdTaken"])
+	pipeline = PredictPipeline(use_cache=False)
+	pipeline.registry.get()
+	pipeline.predict_batch(df)
+	return len(df)
+
+
+def _stage_inference_streaming(params: dict) -> int:
+	from src.pipeline.batch_score import run_batch_scoring
+	summary = run_batch_scoring(SOURCE_PATH, os.path.join("artifacts", "bench_scored.csv"),
+		chunk_size=params["chunk_size"], workers=params["workers"])
+	return summary["rows"]
+
+
+STAGES = {
+	"ingestion": _stage_ingestion,
+	"transformation": _stage_transformation,
+	"model_trainer": _stage_model_trainer,
+	"segmentation": _stage_segmentation,
+	"inference_single": _stage_inference_single,
+	"inference_batch": _stage_inference_batch,
+	"inference_streaming": _stage_inference_streaming,
+}
+
+
+def _run_stage_in_child(workdir: str, stage: str, params: dict) -> dict:
+	os.chdir(workdir)
+	start = time.perf_counter()
+	rows = STAGES[stage](params)
+	seconds = time.perf_counter() - start
+	usage = resource.getrusage(resource.RUSAGE_SELF)
+	children = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return {
+		"seconds": seconds,
+		"rows": rows,
+		"rows_per_second": rows / seconds if seconds > 0 else None,
+		# ru_maxrss is KiB on Linux; worker pools report through RUSAGE_CHILDREN
+		"peak_rss_mb": max(usage.ru_maxrss, children.ru_maxrss) / 1024,
+	}
+
+
+def run_stage(workdir: str, stage: str, params: dict) -> dict:
+	context = multiprocessing.get_context("spawn")
+	with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+		return executor.submit(_run_stage_in_child, workdir, stage, params).result()
+
+
+def _git_commit() -> str:
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+	except Exception:
+		return None
+
+
+def run_suite(sizes, stages, params: dict, scratch_dir: str, keep: bool=False) -> dict:
+	results = []
+	for size in sizes:
+		workdir = os.path.join(scratch_dir, f"rows_{size}")
+		shutil.rmtree(workdir, ignore_errors=True)
+		start = time.perf_counter()
+		write_synthetic_dataset(os.path.join(workdir, SOURCE_PATH), size, seed=params["seed"])
+		print(f"[{size} rows] generated dataset in {time.perf_counter() - start:.1f}s", flush=True)
+
+		for stage in stages:
+			result = run_stage(workdir, stage, {**params, "rows": size})
+			result.update({"size": size, "stage": stage})
+			results.append(result)
+			print(f"[{size} rows] {stage:<20} {result['seconds']:10.3f}s  {result['peak_rss_mb']:9.1f} MiB  "
+				f"{result['rows_per_second'] or 0:14.1f} rows/s", flush=True)
+		if not keep:
+			shutil.rmtree(workdir, ignore_errors=True)
+
+	return {
+		"meta": {
+			"git_commit": _git_commit(),
+			"python": platform.python_version(),
+			"platform": platform.platform(),
+			"cpu_count": os.cpu_count(),
+			"timestamp": time.time(),
+			"params": params,
+		},
+		"results": results,
+	}
+
+
+def compare(current: dict, baseline: dict):
+	"""Print the wall-time and peak-RSS ratio of each (size, stage) against a baseline run."""
+	base = {(r["size"], r["stage"]): r for r in baseline["results"]}
+	for result in current["results"]:
+		ref = base.get((result["size"], result["stage"]))
+		if ref is None:
+			continue
+		print(f"{result['size']:>10} {result['stage']:<20} time x{result['seconds'] / ref['seconds']:.3f}  "
+			f"rss x{result['peak_rss_mb'] / ref['peak_rss_mb']:.3f}")
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--sizes", default="10k,1m,10m", help="comma-separated row counts, e.g. 10k,1m,10m")
+	parser.add_argument("--stages", default=",".join(TRAINING_STAGES + INFERENCE_STAGES))
+	parser.add_argument("--scratch-dir", default=os.path.join(REPO_ROOT, "bench_data"))
+	parser.add_argument("--keep", action="store_true", help="keep the generated data and artifacts")
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--search", default="random", help="search strategy for the model_trainer stage")
+	parser.add_argument("--max-fits", type=int, default=12, help="per-model fit budget for the model_trainer stage")
+	parser.add_argument("--search-budget-seconds", type=float, default=None)
+	parser.add_argument("--single-rows", type=int, default=2000, help="records scored one at a time")
+	parser.add_argument("--chunk-size", type=int, default=50000)
+	parser.add_argument("--workers", type=int, default=1, help="processes for streaming inference")
+	parser.add_argument("--output", default="bench_results.json")
+	parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+	args = parser.parse_args(argv)
+
+	stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+	unknown = [stage for stage in stages if stage not in STAGES]
+	if unknown:
+		parser.error(f"unknown stages {unknown}, choose from {list(STAGES)}")
+
+	params = {
+		"seed": args.seed,
+		"search": args.search,
+		"max_fits": args.max_fits,
+		"search_budget_seconds": args.search_budget_seconds,
+		"single_rows": args.single_rows,
+		"chunk_size": args.chunk_size,
+		"workers": args.workers,
+	}
+	sizes = [_parse_size(size) for size in args.sizes.split(",")]
+	report = run_suite(sizes, stages, params, args.scratch_dir, keep=args.keep)
+
+	with open(args.output, "w", encoding="utf-8") as f:
+		json.dump(report, f, indent=2)
+	print(f"Wrote {args.output}")
+
+	if args.baseline:
+		with open(args.baseline, "r", encoding="utf-8") as f:
+			compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+	main()
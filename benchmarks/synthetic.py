@@ -0,0 +1,126 @@
+"""
+Synthetic datasets with the Travel.xls schema, written in chunks so that
+multi-million row files can be produced with bounded memory.
+
+	python -m benchmarks.synthetic 1000000 bench_data/Travel_1m.csv
+"""
+import os
+import argparse
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+
+CATEGORICAL = {
+	"TypeofContact": (["Self Enquiry", "Company Invited"], [0.71, 0.29]),
+	"Occupation": (["Salaried", "Small Business", "Large Business", "Free Lancer"], [0.485, 0.426, 0.088, 0.001]),
+	"Gender": (["Male", "Female", "Fe Male"], [0.597, 0.372, 0.031]),
+	"ProductPitched": (["Basic", "Deluxe", "Standard", "Super Deluxe", "King"], [0.377, 0.354, 0.152, 0.07, 0.047]),
+	"MaritalStatus": (["Married", "Divorced", "Single", "Unmarried"], [0.479, 0.194, 0.187, 0.14]),
+}
+# Designation follows ProductPitched one-to-one in the source data
+DESIGNATION = {"Basic": "Executive", "Deluxe": "Manager", "Standard": "Senior Manager", "Super Deluxe": "AVP", "King": "VP"}
+
+DISCRETE = {
+	"CityTier": ([1, 2, 3], [0.653, 0.041, 0.306]),
+	"NumberOfPersonVisiting": ([1, 2, 3, 4, 5], [0.008, 0.29, 0.492, 0.209, 0.001]),
+	"NumberOfFollowups": ([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], [0.036, 0.047, 0.301, 0.425, 0.163, 0.028]),
+	"PreferredPropertyStar": ([3.0, 4.0, 5.0], [0.616, 0.188, 0.196]),
+	"Passport": ([0, 1], [0.71, 0.29]),
+	"PitchSatisfactionScore": ([1, 2, 3, 4, 5], [0.193, 0.12, 0.302, 0.187, 0.198]),
+	"OwnCar": ([0, 1], [0.38, 0.62]),
+	"NumberOfChildrenVisiting": ([0.0, 1.0, 2.0, 3.0], [0.222, 0.43, 0.275, 0.073]),
+}
+
+# (mean, std, min, max)
+CONTINUOUS = {
+	"Age": (37.6, 9.3, 18, 61),
+	"DurationOfPitch": (15.5, 8.5, 5, 127),
+	"NumberOfTrips": (3.2, 1.8, 1, 22),
+	"MonthlyIncome": (23620.0, 5380.0, 1000, 98678),
+}
+
+COLUMN_ORDER = [
+	"CustomerID", "ProdTaken", "Age", "TypeofContact", "CityTier", "DurationOfPitch", "Occupation", "Gender",
+	"NumberOfPersonVisiting", "NumberOfFollowups", "ProductPitched", "PreferredPropertyStar", "MaritalStatus",
+	"NumberOfTrips", "Passport", "PitchSatisfactionScore", "OwnCar", "NumberOfChildrenVisiting", "Designation",
+	"MonthlyIncome",
+]
+
+# share of missing values injected in columns that have gaps in the source data
+MISSING_RATE = 0.03
+MISSING_COLUMNS = [
+	"Age", "TypeofContact", "DurationOfPitch", "NumberOfFollowups", "PreferredPropertyStar",
+	"NumberOfTrips", "NumberOfChildrenVisiting", "MonthlyIncome",
+]
+
+
+def generate_travel_frame(n_rows: int, seed: int=42, start_id: int=200000) -> pd.DataFrame:
+	"""One synthetic chunk; ProdTaken depends on a few features so models have signal to learn."""
+	rng = np.random.default_rng(seed)
+	data = {"CustomerID": np.arange(start_id, start_id + n_rows)}
+	for name, (values, probs) in {**CATEGORICAL, **DISCRETE}.items():
+		data[name] = rng.choice(np.array(values, dtype=object if isinstance(values[0], str) else None), size=n_rows, p=probs)
+	for name, (mean, std, low, high) in CONTINUOUS.items():
+		data[name] = np.clip(np.round(rng.normal(mean, std, size=n_rows)), low, high)
+	data["Designation"] = np.array([DESIGNATION[p] for p in data["ProductPitched"]], dtype=object)
+
+	logit = (
+		-3.0
+		+ 2.5 * data["Passport"]
+		+ 1.8 * (data["ProductPitched"] == "Basic")
+		+ 1.5 * (data["MaritalStatus"] == "Single")
+		+ 1.2 * (data["Age"] < 30)
+		+ 0.8 * (data["CityTier"] == 3)
+		+ 0.3 * (data["NumberOfFollowups"] - 3.7)
+	)
+	data["ProdTaken"] = (rng.random(n_rows) < 1.0 / (1.0 + np.exp(-2.0 * logit))).astype(int)
+
+	df = pd.DataFrame(data)[COLUMN_ORDER]
+	for name in MISSING_COLUMNS:
+		df.loc[rng.random(n_rows) < MISSING_RATE, name] = np.nan
+	return df
+
+
+def write_synthetic_dataset(path: str, n_rows: int, seed: int=42, chunk_rows: int=1000000) -> str:
+	"""Write `n_rows` synthetic rows to a CSV (or Parquet) file, one chunk at a time."""
+	dir_path = os.path.dirname(path)
+	if dir_path:
+		os.makedirs(dir_path, exist_ok=True)
+
+	is_parquet = path.endswith(".parquet")
+	parquet_writer = None
+	written = 0
+	chunk_index = 0
+	with nullcontext() if is_parquet else open(path, "w", newline="", encoding="utf-8") as csv_file:
+		while written < n_rows:
+			rows = min(chunk_rows, n_rows - written)
+			chunk = generate_travel_frame(rows, seed=seed + chunk_index, start_id=200000 + written)
+			if is_parquet:
+				import pyarrow as pa
+				import pyarrow.parquet as pq
+				table = pa.Table.from_pandas(chunk, preserve_index=False)
+				if parquet_writer is None:
+					parquet_writer = pq.ParquetWriter(path, table.schema)
+				parquet_writer.write_table(table.cast(parquet_writer.schema))
+			else:
+				chunk.to_csv(csv_file, index=False, header=written == 0)
+			written += rows
+			chunk_index += 1
+	if parquet_writer is not None:
+		parquet_writer.close()
+	return path
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("rows", type=int)
+	parser.add_argument("output_path")
+	parser.add_argument("--seed", type=int, default=42)
+	args = parser.parse_args(argv)
+	write_synthetic_dataset(args.output_path, args.rows, seed=args.seed)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,144 @@
+"""
+Compare tree models against their compiled node-array form
+(src.components.tree_compiler): exactness of predict/predict_proba, single-row
+and batch latency, pickled size and resident memory after loading.
+
+	python -m benchmarks.tree_compiler --rows 20000 --trees 1000 --output bench_tree_compiler.json
+"""
+import gc
+import json
+import time
+import pickle
+import argparse
+import statistics
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import generate_travel_frame
+from src.components.data_transformation import DataTransformation
+from src.components.feature_engineering import FeatureEngineer
+from src.components.tree_compiler import compile_tree_model
+
+
+def _models(trees: int, seed: int) -> dict:
+	from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+	models = {
+		"random_forest": RandomForestClassifier(n_estimators=trees, random_state=seed),
+		"gradient_boosting": GradientBoostingClassifier(n_estimators=trees, random_state=seed),
+		"adaboost": AdaBoostClassifier(n_estimators=trees, random_state=seed),
+	}
+	try:
+		from xgboost import XGBClassifier
+		models["xgboost"] = XGBClassifier(n_estimators=trees, eval_metric="logloss", random_state=seed)
+	except ImportError:
+		pass
+	return models
+
+
+def _latency(fn, X, calls: int) -> dict:
+	timings = []
+	for i in range(calls):
+		row = X[i % X.shape[0]:i % X.shape[0] + 1]
+		start = time.perf_counter()
+		fn(row)
+		timings.append(time.perf_counter() - start)
+	timings.sort()
+	return {"median_ms": statistics.median(timings) * 1e3, "p99_ms": timings[int(len(timings) * 0.99) - 1] * 1e3}
+
+
+def _batch_seconds(fn, X, repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn(X)
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def _loaded_mb(obj) -> tuple:
+	"""Pickled size and traced allocation peak of unpickling `obj`, in MiB."""
+	payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+	gc.collect()
+	tracemalloc.start()
+	loaded = pickle.loads(payload)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del loaded
+	return len(payload) / 2 ** 20, peak / 2 ** 20
+
+
+def run(rows: int, trees: int, single_calls: int, repeat: int, seed: int=42, only=None) -> dict:
+	df = generate_travel_frame(rows, seed=seed)
+	transformation = DataTransformation()
+	df = FeatureEngineer().fit_transform(df)
+	preprocessor = transformation.get_data_transformer_object(df)
+	X = preprocessor.fit_transform(df.drop(columns=["ProdTaken"]))
+	X = X.toarray() if hasattr(X, "toarray") else X
+	y = df["ProdTaken"].to_numpy()
+	split = int(rows * 0.8)
+	X_train, y_train, X_test = X[:split], y[:split], X[split:]
+
+	results = {"rows": rows, "trees": trees, "models": {}}
+	for name, model in _models(trees, seed).items():
+		if only and name not in only:
+			continue
+		start = time.perf_counter()
+		model.fit(X_train, y_train)
+		fit_seconds = time.perf_counter() - start
+		start = time.perf_counter()
+		compiled = compile_tree_model(model)
+		compile_seconds = time.perf_counter() - start
+
+		original_size, original_peak = _loaded_mb(model)
+		compiled_size, compiled_peak = _loaded_mb(compiled)
+		entry = {
+			"fit_seconds": fit_seconds,
+			"compile_seconds": compile_seconds,
+			"identical_predict": bool(np.array_equal(model.predict(X_test), compiled.predict(X_test))),
+			"identical_predict_proba": bool(np.array_equal(model.predict_proba(X_test), compiled.predict_proba(X_test))),
+			"single_row": {
+				"original": _latency(model.predict_proba, X_test, single_calls),
+				"compiled": _latency(compiled.predict_proba, X_test, single_calls),
+			},
+			"batch_seconds": {
+				"original": _batch_seconds(model.predict_proba, X_test, repeat),
+				"compiled": _batch_seconds(compiled.predict_proba, X_test, repeat),
+			},
+			"memory_mb": {
+				"original_pickle": original_size,
+				"compiled_pickle": compiled_size,
+				"original_load_peak": original_peak,
+				"compiled_load_peak": compiled_peak,
+			},
+		}
+		entry["single_row"]["speedup"] = entry["single_row"]["original"]["median_ms"] / entry["single_row"]["compiled"]["median_ms"]
+		entry["batch_seconds"]["speedup"] = entry["batch_seconds"]["original"] / entry["batch_seconds"]["compiled"]
+		results["models"][name] = entry
+		print(name, json.dumps(entry), flush=True)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--rows", type=int, default=20000)
+	parser.add_argument("--trees", type=int, default=1000)
+	parser.add_argument("--single-calls", type=int, default=200)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--models", default=None, help="comma-separated subset of random_forest,gradient_boosting,adaboost,xgboost")
+	parser.add_argument("--output", default=None, help="write results as JSON to this file")
+	args = parser.parse_args(argv)
+
+	only = set(args.models.split(",")) if args.models else None
+	results = run(args.rows, args.trees, args.single_calls, args.repeat, only=only)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+	mismatched = [name for name, entry in results["models"].items()
+		if not (entry["identical_predict"] and entry["identical_predict_proba"])]
+	if mismatched:
+		raise SystemExit(f"compiled output differs for {mismatched}")
+
+
+if __name__ == "__main__":
+	main()
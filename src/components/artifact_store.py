@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_sha256
+
+
+@dataclass
+class ArtifactStoreConfig:
+	root_dir: str = os.path.join('artifacts', 'store')
+
+
+class ArtifactStore:
+	'''
+	Content-addressed cache for training stage outputs.
+	Each stage fingerprints its inputs (file contents, arrays and config) and
+	the outputs produced for that fingerprint are kept under
+	<root_dir>/<stage>/<fingerprint>/ so unchanged stages can be skipped.
+	'''
+	META_FILE = '_meta.json'
+
+	def __init__(self, config: ArtifactStoreConfig=None):
+		self.config = config or ArtifactStoreConfig()
+
+	@staticmethod
+	def fingerprint(stage: str, files=(), arrays=(), config: dict=None) -> str:
+		try:
+			digest = hashlib.sha256(stage.encode('utf-8'))
+			for path in files:
+				digest.update(file_sha256(path).encode('utf-8'))
+			for arr in arrays:
+				if sparse.issparse(arr):
+					# hash the CSR buffers instead of densifying
+					arr = sparse.csr_matrix(arr)
+					digest.update(f"csr{arr.shape}".encode('utf-8'))
+					parts = (arr.data, arr.indices, arr.indptr)
+				else:
+					parts = (arr,)
+				for part in parts:
+					part = np.ascontiguousarray(part)
+					digest.update(f"{part.dtype.str}{part.shape}".encode('utf-8'))
+					digest.update(memoryview(part).cast('B'))
+			digest.update(json.dumps(config or {}, sort_keys=True, default=str).encode('utf-8'))
+			return digest.hexdigest()
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	@staticmethod
+	def _copy(src_path: str, dest_path: str):
+		"""Copy a file or an artifact directory."""
+		if os.path.isdir(src_path):
+			# save_artifact leaves a symlink to the current version
+			if os.path.islink(dest_path):
+				os.unlink(dest_path)
+			elif os.path.exists(dest_path):
+				shutil.rmtree(dest_path)
+			shutil.copytree(src_path, dest_path)
+		else:
+			shutil.copyfile(src_path, dest_path)
+
+	def _entry_dir(self, stage: str, key: str) -> str:
+		return os.path.join(self.config.root_dir, stage, key)
+
+	def restore(self, stage: str, key: str, outputs: dict):
+		'''
+		Copy cached outputs {name: destination path} (files or directories) into place.
+		Returns the stored metadata dict on a hit, None on a miss.
+		'''
+		try:
+			entry_dir = self._entry_dir(stage, key)
+			meta_path = os.path.join(entry_dir, self.META_FILE)
+			if not os.path.exists(meta_path):
+				return None
+			if not all(os.path.exists(os.path.join(entry_dir, name)) for name in outputs):
+				return None
+
+			for name, dest_path in outputs.items():
+				dest_dir = os.path.dirname(dest_path)
+				if dest_dir:
+					os.makedirs(dest_dir, exist_ok=True)
+				self._copy(os.path.join(entry_dir, name), dest_path)
+
+			with open(meta_path, 'r', encoding='utf-8') as f:
+				meta = json.load(f)
+			logging.info(f"Artifact store hit for {stage} ({key[:12]})")
+			return meta
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def store(self, stage: str, key: str, outputs: dict, meta: dict=None):
+		"""Copy outputs {name: source path} into the store; the entry appears atomically."""
+		try:
+			entry_dir = self._entry_dir(stage, key)
+			if os.path.exists(entry_dir):
+				return
+			stage_dir = os.path.dirname(entry_dir)
+			os.makedirs(stage_dir, exist_ok=True)
+
+			tmp_dir = tempfile.mkdtemp(dir=stage_dir)
+			try:
+				for name, src_path in outputs.items():
+					self._copy(src_path, os.path.join(tmp_dir, name))
+				with open(os.path.join(tmp_dir, self.META_FILE), 'w', encoding='utf-8') as f:
+					json.dump(meta or {}, f, indent=2)
+				os.replace(tmp_dir, entry_dir)
+			except Exception:
+				shutil.rmtree(tmp_dir, ignore_errors=True)
+				# another run stored the same fingerprint concurrently
+				if os.path.exists(entry_dir):
+					return
+				raise
+			logging.info(f"Stored {stage} outputs in artifact store ({key[:12]})")
+
+		except Exception as e:
+			raise CustomException(e, sys)
@@ -2,11 +2,15 @@ import os
 import sys
 from src.exception import CustomException
 from src.logger import logging
+from src.utils import write_dataset, ChunkWriter, PARQUET_EXTENSIONS
+import numpy as np
 import pandas as pd
 
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass
 
+from src.components.artifact_store import ArtifactStore
+from src.components.readers import read_source, source_files, iter_source_chunks
 from src.components.data_transformation import DataTransformation
 from src.components.data_transformation import DataTransformationConfig
 
@@ -16,68 +20,206 @@ from src.components.model_trainer import ModelTrainer
 
 @dataclass
 class DataIngestionConfig:
-	train_data_path: str=os.path.join('artifacts',"train.csv")
-	test_data_path: str=os.path.join('artifacts',"test.csv")
-	raw_data_path: str=os.path.join('artifacts',"data.csv")
+	# the extension picks the staging format: .parquet, .feather or .csv
+	train_data_path: str=os.path.join('artifacts',"train.parquet")
+	test_data_path: str=os.path.join('artifacts',"test.parquet")
+	raw_data_path: str=os.path.join('artifacts',"data.parquet")
+	test_size: float=0.2
+	random_state: int=42
+	use_cache: bool=True
+	# a file, a directory of CSV/Parquet shards or a glob; None searches DataIngestion.SOURCE_PATHS
+	source_path: str=None
+	# threads for reading shards, None uses one per CPU
+	read_workers: int=None
+	# 'memory' loads the source and uses train_test_split; 'streaming' assigns rows chunk by
+	# chunk at constant memory and skips the raw copy (needs .csv or .parquet outputs)
+	split_mode: str="memory"
+	chunk_size: int=100000
+	# streaming split: {column: "float64" | "string"} for columns the first chunk cannot type,
+	# such as one that is entirely missing there
+	column_types: dict=None
 
 class DataIngestion:
+	SOURCE_PATHS = [
+		os.path.join('notebook', 'data', 'Travel.xls'),
+		os.path.join('notebook', 'data', 'Travel.xlsx'),
+		os.path.join('notebook', 'data', 'Travel.csv'),
+		os.path.join('notebook', 'Travel.csv'),
+	]
+
 	def __init__(self):
 		self.ingestion_config=DataIngestionConfig()
+		self.store=ArtifactStore()
 
-	def _read_source_dataframe(self) -> pd.DataFrame:
-		"""Read source data from notebook data folder (supports xls/xlsx/csv).
-		Falls back to CSV parser if Excel engine fails (handles mislabelled .xls files)."""
-		possible_paths = [
-			os.path.join('notebook', 'data', 'Travel.xls'),
-			os.path.join('notebook', 'data', 'Travel.xlsx'),
-			os.path.join('notebook', 'data', 'Travel.csv'),
-			os.path.join('notebook', 'Travel.csv'),
-		]
-		for path in possible_paths:
+	def _find_source_path(self) -> str:
+		if self.ingestion_config.source_path:
+			return self.ingestion_config.source_path
+		for path in self.SOURCE_PATHS:
 			if os.path.exists(path):
-				logging.info(f"Loading dataset from {path}")
-				lower = path.lower()
+				return path
+		raise CustomException(f"Source dataset not found in expected locations: {self.SOURCE_PATHS}", sys)
+
+	def _read_source_dataframe(self) -> pd.DataFrame:
+		"""Read the source data; the format of every file is sniffed from its content, not its extension."""
+		path=self._find_source_path()
+		logging.info(f"Loading dataset from {path}")
+		return read_source(path,max_workers=self.ingestion_config.read_workers)
+
+	def _streaming_types(self, chunk: pd.DataFrame, target_column_name: str) -> dict:
+		'''
+		{column: "float64" | "string" | "int64"}, decided once before anything
+		is written. Numeric features are float64 (a later chunk may hold missing
+		values), text and categorical columns strings, a column entirely missing
+		from the first chunk float64 unless column_types says otherwise. An
+		integer target stays int64; a later missing label is stored as null.
+		'''
+		types={}
+		for col in chunk.columns:
+			values=chunk[col]
+			if col==target_column_name and pd.api.types.is_integer_dtype(values):
+				types[col]="int64"
+			elif pd.api.types.is_numeric_dtype(values) or values.isna().all():
+				types[col]="float64"
+			else:
+				types[col]="string"
+		types.update(self.ingestion_config.column_types or {})
+		return types
+
+	@staticmethod
+	def _apply_types(chunk: pd.DataFrame, types: dict, target_column_name: str) -> pd.DataFrame:
+		columns={}
+		for col,kind in types.items():
+			values=chunk[col] if col in chunk.columns else pd.Series(np.nan,index=chunk.index)
+			if kind=="string":
+				values=values.astype(object).where(values.notna(),None)
+				columns[col]=values.where(values.isna(),values.astype(str))
+			elif kind=="float64" or col!=target_column_name:
 				try:
-					if lower.endswith('.xls'):
-						try:
-							return pd.read_excel(path, engine='xlrd')
-						except Exception:
-							# Fallback: try as CSV if file is not a real XLS
-							logging.info("Reading .xls with csv fallback")
-							return pd.read_csv(path)
-					elif lower.endswith('.xlsx'):
-						try:
-							return pd.read_excel(path, engine='openpyxl')
-						except Exception:
-							logging.info("Reading .xlsx with csv fallback")
-							return pd.read_csv(path)
-					else:
-						return pd.read_csv(path)
-				except ImportError as ie:
+					columns[col]=values.astype("float64")
+				except (TypeError,ValueError):
 					raise CustomException(
-						f"Missing Excel engine for '{path}'. Install required package (e.g., pip install xlrd for .xls or openpyxl for .xlsx). Original error: {ie}",
-						sys,
-					)
-				except Exception as e:
-					raise CustomException(e, sys)
-		raise CustomException(f"Source dataset not found in expected locations: {possible_paths}", sys)
+						f"Column '{col}' was typed float64 from the first chunk but holds text later; "
+						f"set DataIngestionConfig.column_types['{col}']='string'",sys)
+			else:
+				# int64 target: a chunk with a missing label reads as float, pyarrow stores NaN as null
+				columns[col]=values if values.isna().any() else values.astype("int64")
+		return pd.DataFrame(columns,index=chunk.index)
+
+	@staticmethod
+	def _parquet_schema(types: dict):
+		import pyarrow as pa
+		arrow_types={"float64":pa.float64(),"string":pa.string(),"int64":pa.int64()}
+		return pa.schema([(col,arrow_types[kind]) for col,kind in types.items()])
+
+	def _streaming_split(self, target_column_name: str="ProdTaken") -> dict:
+		'''
+		Stream the source straight into the train and test files. Within every
+		target class each chunk sends to test the rows with the smallest seeded
+		row hashes, as many as keep the class's running test share at test_size,
+		so every class ends within one row of its exact share, as with
+		train_test_split(stratify=...). Same source, seed and chunk_size give
+		the same split.
+		'''
+		config=self.ingestion_config
+		for path in (config.train_data_path,config.test_data_path):
+			if path.lower().endswith('.feather'):
+				raise ValueError(f"Streaming split cannot append to '{path}', use .csv or .parquet")
+
+		hash_key=f"{config.random_state:016d}"[-16:]
+		seen={}
+		in_test={}
+		writers={}
+		types=None
+		empty=None
+		try:
+			for chunk in iter_source_chunks(self._find_source_path(),config.chunk_size):
+				if types is None:
+					# the output schema is fixed before the first write, not by whatever the first chunk holds
+					types=self._streaming_types(chunk,target_column_name)
+					for name,path in (("train",config.train_data_path),("test",config.test_data_path)):
+						schema=self._parquet_schema(types) if path.lower().endswith(PARQUET_EXTENSIONS) else None
+						writers[name]=ChunkWriter(path,schema=schema)
+				chunk=self._apply_types(chunk,types,target_column_name)
+				if empty is None:
+					empty=chunk.iloc[:0]
+				hashes=pd.util.hash_pandas_object(chunk,index=False,hash_key=hash_key).to_numpy()
+
+				labels=chunk[target_column_name] if target_column_name in chunk.columns else pd.Series(0,index=chunk.index)
+				test_mask=np.zeros(len(chunk),dtype=bool)
+				for label,rows in labels.groupby(labels.to_numpy(),dropna=False).indices.items():
+					key="missing" if pd.isna(label) else label
+					seen[key]=seen.get(key,0)+len(rows)
+					quota=int(np.floor(seen[key]*config.test_size+0.5))-in_test.get(key,0)
+					if quota>0:
+						test_mask[rows[np.argsort(hashes[rows],kind="stable")[:quota]]]=True
+						in_test[key]=in_test.get(key,0)+min(quota,len(rows))
+
+				for name,mask in (("train",~test_mask),("test",test_mask)):
+					if mask.any():
+						writers[name].write(chunk[mask])
+			for writer in writers.values():
+				if not writer.rows_written and empty is not None:
+					writer.write(empty)
+		finally:
+			for writer in writers.values():
+				writer.close()
+
+		summary={
+			"rows":sum(seen.values()),
+			"train_rows":writers["train"].rows_written if writers else 0,
+			"test_rows":writers["test"].rows_written if writers else 0,
+			"test_share_by_class":{str(key):in_test.get(key,0)/count for key,count in seen.items()},
+		}
+		logging.info(f"Streaming split finished: {summary}")
+		return summary
 
 	def initiate_data_ingestion(self):
 		logging.info("Entered the data ingestion component")
 		try:
-			df=self._read_source_dataframe()
-			logging.info('Read the dataset as dataframe')
+			config=self.ingestion_config
+			streaming=config.split_mode=="streaming"
+			# the streaming split never materializes the source, so there is no raw copy to keep
+			paths=(config.train_data_path,config.test_data_path) if streaming else (config.raw_data_path,config.train_data_path,config.test_data_path)
+			outputs={os.path.basename(path):path for path in paths}
+			cache_key=None
+			if config.use_cache:
+				cache_key=self.store.fingerprint(
+					"ingestion",
+					files=source_files(self._find_source_path()),
+					config={
+						"test_size":config.test_size,
+						"random_state":config.random_state,
+						"split_mode":config.split_mode,
+						"chunk_size":config.chunk_size if streaming else None,
+					},
+				)
+				if self.store.restore("ingestion",cache_key,outputs) is not None:
+					logging.info("Source data unchanged, reused cached ingestion outputs")
+					return(
+						config.train_data_path,
+						config.test_data_path
+					)
+
+			if streaming:
+				logging.info("Streaming train-test split initiated")
+				self._streaming_split()
+			else:
+				df=self._read_source_dataframe()
+				logging.info('Read the dataset as dataframe')
+
+				os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
 
-			os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
+				write_dataset(df,self.ingestion_config.raw_data_path)
 
-			df.to_csv(self.ingestion_config.raw_data_path,index=False,header=True)
+				logging.info("Train-test split initiated")
+				train_set,test_set=train_test_split(df,test_size=config.test_size,random_state=config.random_state,stratify=df['ProdTaken'] if 'ProdTaken' in df.columns else None)
 
-			logging.info("Train-test split initiated")
-			train_set,test_set=train_test_split(df,test_size=0.2,random_state=42,stratify=df['ProdTaken'] if 'ProdTaken' in df.columns else None)
+				write_dataset(train_set,self.ingestion_config.train_data_path)
 
-			train_set.to_csv(self.ingestion_config.train_data_path,index=False,header=True)
+				write_dataset(test_set,self.ingestion_config.test_data_path)
 
-			test_set.to_csv(self.ingestion_config.test_data_path,index=False,header=True)
+			if cache_key is not None:
+				self.store.store("ingestion",cache_key,outputs)
 
 			logging.info("Ingestion of the data is completed")
 
@@ -94,10 +236,10 @@ if __name__=="__main__":
 	train_data,test_data=obj.initiate_data_ingestion()
 
 	data_transformation=DataTransformation()
-	train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_data,test_data)
+	X_train,y_train,X_test,y_test,_=data_transformation.initiate_data_transformation(train_data,test_data)
 
 	modeltrainer=ModelTrainer()
-	print(modeltrainer.initiate_model_trainer(train_arr,test_arr))
+	print(modeltrainer.initiate_model_trainer(X_train,y_train,X_test,y_test))
 
 
 
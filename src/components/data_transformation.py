@@ -12,15 +12,33 @@ from src.exception import CustomException
 from src.logger import logging
 import os
 
-from src.utils import save_object
+from src.utils import save_object, save_artifact, read_dataset, save_matrix, load_matrix, matrix_nbytes
+from src.components.artifact_store import ArtifactStore
+from src.components.feature_engineering import FeatureEngineer
 
 @dataclass
 class DataTransformationConfig:
 	preprocessor_obj_file_path=os.path.join('artifacts',"preprocessor.pkl")
+	preprocessor_artifact_path: str=os.path.join('artifacts',"preprocessor_artifact")
+	# fitted FeatureEngineer, applied before the preprocessor everywhere it is used
+	feature_engineer_file_path: str=os.path.join('artifacts',"features.pkl")
+	# features are .npz (CSR when sparse), targets are kept separately
+	train_features_file_path: str=os.path.join('artifacts',"train_X.npz")
+	train_target_file_path: str=os.path.join('artifacts',"train_y.npy")
+	test_features_file_path: str=os.path.join('artifacts',"test_X.npz")
+	test_target_file_path: str=os.path.join('artifacts',"test_y.npy")
+	# output is CSR when its density is below this. The default 1.0 keeps the one-hot output
+	# sparse whatever its density (at 0.3 this dataset came out dense); estimators that need
+	# dense input are listed in ModelTrainerConfig.dense_only_models
+	sparse_threshold: float=1.0
+	use_cache: bool=True
+	# bump when the feature engineering or preprocessing recipe changes
+	cache_version: int=3
 
 class DataTransformation:
 	def __init__(self):
 		self.data_transformation_config=DataTransformationConfig()
+		self.store=ArtifactStore()
 
 	def get_data_transformer_object(self, train_df: pd.DataFrame):
 		'''
@@ -33,8 +51,8 @@ class DataTransformation:
 			# derive features excluding target
 			target_column_name = "ProdTaken"
 			feature_df = train_df.drop(columns=[target_column_name], errors='ignore')
-			categorical_columns = feature_df.select_dtypes(include="object").columns.tolist()
-			numerical_columns = feature_df.select_dtypes(exclude="object").columns.tolist()
+			categorical_columns = feature_df.select_dtypes(include=["object", "category"]).columns.tolist()
+			numerical_columns = feature_df.select_dtypes(exclude=["object", "category"]).columns.tolist()
 
 			num_pipeline= Pipeline(
 				steps=[
@@ -62,8 +80,8 @@ class DataTransformation:
 				("num_pipeline",num_pipeline,numerical_columns),
 				("cat_pipelines",cat_pipeline,categorical_columns)
 
-				]
-
+				],
+				sparse_threshold=self.data_transformation_config.sparse_threshold,
 
 			)
 
@@ -75,16 +93,40 @@ class DataTransformation:
 	def initiate_data_transformation(self,train_path,test_path):
 
 		try:
-			train_df=pd.read_csv(train_path)
-			test_df=pd.read_csv(test_path)
+			config=self.data_transformation_config
+			outputs={
+				"preprocessor.pkl":config.preprocessor_obj_file_path,
+				"preprocessor_artifact":config.preprocessor_artifact_path,
+				"features.pkl":config.feature_engineer_file_path,
+				"train_X.npz":config.train_features_file_path,
+				"train_y.npy":config.train_target_file_path,
+				"test_X.npz":config.test_features_file_path,
+				"test_y.npy":config.test_target_file_path,
+			}
+			cache_key=None
+			if config.use_cache:
+				cache_key=self.store.fingerprint(
+					"transformation",files=[train_path,test_path],
+					config={"cache_version":config.cache_version,"sparse_threshold":config.sparse_threshold}
+				)
+				if self.store.restore("transformation",cache_key,outputs) is not None:
+					logging.info("Train/test data unchanged, reused cached preprocessor and arrays")
+					return (
+						load_matrix(config.train_features_file_path),
+						np.load(config.train_target_file_path),
+						load_matrix(config.test_features_file_path),
+						np.load(config.test_target_file_path),
+						config.preprocessor_obj_file_path,
+					)
+
+			train_df=read_dataset(train_path)
+			test_df=read_dataset(test_path)
 
 			logging.info("Read train and test data completed")
 
-			# Feature engineering to match notebook: create TotalVisiting and drop components
-			for df in (train_df, test_df):
-				if 'NumberOfPersonVisiting' in df.columns and 'NumberOfChildrenVisiting' in df.columns:
-					df['TotalVisiting'] = df['NumberOfPersonVisiting'] + df['NumberOfChildrenVisiting']
-					df.drop(columns=['NumberOfPersonVisiting','NumberOfChildrenVisiting'], inplace=True)
+			feature_engineer=FeatureEngineer()
+			train_df=feature_engineer.fit_transform(train_df)
+			test_df=feature_engineer.transform(test_df)
 
 			logging.info("Obtaining preprocessing object")
 
@@ -107,11 +149,14 @@ class DataTransformation:
 
 			input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df)
 			input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df)
+			target_train_arr=np.asarray(target_feature_train_df)
+			target_test_arr=np.asarray(target_feature_test_df)
 
-			train_arr = np.c_[
-				input_feature_train_arr, np.array(target_feature_train_df)
-			]
-			test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+			# features and target stay separate so one-hot output is never densified
+			logging.info(
+				f"Transformed features: {type(input_feature_train_arr).__name__} {input_feature_train_arr.shape}, "
+				f"{matrix_nbytes(input_feature_train_arr) / 2**20:.1f} MiB for train"
+			)
 
 			logging.info(f"Saved preprocessing object.")
 
@@ -121,10 +166,21 @@ class DataTransformation:
 				obj=preprocessing_obj
 
 			)
+			save_artifact(config.preprocessor_artifact_path,preprocessing_obj)
+			save_object(file_path=config.feature_engineer_file_path,obj=feature_engineer)
+
+			if cache_key is not None:
+				save_matrix(config.train_features_file_path,input_feature_train_arr)
+				np.save(config.train_target_file_path,target_train_arr)
+				save_matrix(config.test_features_file_path,input_feature_test_arr)
+				np.save(config.test_target_file_path,target_test_arr)
+				self.store.store("transformation",cache_key,outputs)
 
 			return (
-				train_arr,
-				test_arr,
+				input_feature_train_arr,
+				target_train_arr,
+				input_feature_test_arr,
+				target_test_arr,
 				self.data_transformation_config.preprocessor_obj_file_path,
 			)
 		except Exception as e:
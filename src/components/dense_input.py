@@ -0,0 +1,38 @@
+from scipy import sparse
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+
+
+def _dense(X):
+	return X.toarray() if sparse.issparse(X) else X
+
+
+class DenseInputClassifier(ClassifierMixin, BaseEstimator):
+	'''
+	Wraps a classifier that must see dense features, so that sparse input is
+	densified on every path. XGBoost reads entries absent from a CSR matrix as
+	missing rather than 0, so a model trained on dense rows would otherwise
+	score the CSR batch path and the dense single-row path differently.
+	'''
+	def __init__(self, estimator=None):
+		self.estimator = estimator
+
+	@classmethod
+	def from_fitted(cls, estimator) -> "DenseInputClassifier":
+		wrapper = cls(estimator)
+		wrapper._set_fitted(estimator)
+		return wrapper
+
+	def _set_fitted(self, estimator):
+		self.estimator_ = estimator
+		self.classes_ = estimator.classes_
+		self.n_features_in_ = estimator.n_features_in_
+
+	def fit(self, X, y, **fit_params):
+		self._set_fitted(clone(self.estimator).fit(_dense(X), y, **fit_params))
+		return self
+
+	def predict(self, X):
+		return self.estimator_.predict(_dense(X))
+
+	def predict_proba(self, X):
+		return self.estimator_.predict_proba(_dense(X))
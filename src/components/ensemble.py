@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import weakref
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import metrics
+
+
+# absolute time.monotonic() deadline of the request being served, if any
+request_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+# ensembles that own a thread pool; pool threads do not survive fork, so a child
+# (gunicorn --preload worker) must build its own instead of submitting to a dead one
+_pooled_ensembles = weakref.WeakSet()
+
+
+def _reset_pools_after_fork():
+	for model in list(_pooled_ensembles):
+		model._init_runtime()
+	_pooled_ensembles.clear()
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+def out_of_fold_proba(model, X, y, cv_data=None, n_folds: int=3, random_state: int=42) -> np.ndarray:
+	'''
+	Positive-class probabilities for every training row from a clone fitted
+	without that row. With cv_data (FeatureCache.search_inputs) the per-fold
+	preprocessed features are used and the result is in stacked-fold order.
+	'''
+	from sklearn.base import clone
+	from sklearn.model_selection import StratifiedKFold
+
+	if cv_data is not None:
+		X, y, splits = cv_data
+	else:
+		splits = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(np.zeros(len(y)), y))
+	proba = np.zeros(len(y))
+	for train_rows, val_rows in splits:
+		member = clone(model).fit(X[train_rows], y[train_rows])
+		proba[val_rows] = member.predict_proba(X[val_rows])[:, 1]
+	return proba
+
+
+class EnsembleModel:
+	'''
+	Soft-voting or stacked ensemble of already fitted binary classifiers.
+	Members score the same transformed batch concurrently on a thread pool
+	(tree and boosting predictions spend most of their time in native code
+	that releases the GIL). With a latency budget, members still running at
+	the deadline are dropped: soft voting renormalizes over the finished
+	members, stacking substitutes the dropped member's mean training
+	probability. Members whose recent latency exceeds the remaining budget,
+	or whose call dropped by an earlier deadline is still running, are not
+	started at all, so stragglers cannot pile up in the pool.
+	'''
+	def __init__(self, members: list, method: str="soft", weights=None, meta_model=None,
+			fallback_proba=None, budget_ms: float=None):
+		if method not in ("soft", "stacked"):
+			raise ValueError(f"Unknown ensemble method '{method}', expected 'soft' or 'stacked'")
+		if method == "stacked" and meta_model is None:
+			raise ValueError("A stacked ensemble needs a fitted meta_model")
+		self.members = list(members)
+		self.method = method
+		self.weights = np.ones(len(self.members)) if weights is None else np.asarray(weights, dtype=np.float64)
+		self.meta_model = meta_model
+		self.fallback_proba = np.full(len(self.members), 0.5) if fallback_proba is None else np.asarray(fallback_proba)
+		self.budget_ms = budget_ms
+		self.classes_ = np.array([0, 1])
+		self._init_runtime()
+
+	def _init_runtime(self):
+		self._executor = None
+		self._executor_lock = threading.Lock()
+		# exponentially weighted per-member latency in seconds
+		self._latency = [0.0] * len(self.members)
+		# member index -> calls past their deadline that are still occupying a pool thread
+		self._stragglers = {}
+		self._stragglers_lock = threading.Lock()
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		for name in ("_executor", "_executor_lock", "_latency", "_stragglers", "_stragglers_lock"):
+			state.pop(name, None)
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self._init_runtime()
+
+	@property
+	def member_names(self) -> list:
+		return [name for name, _ in self.members]
+
+	def _pool(self) -> ThreadPoolExecutor:
+		if self._executor is None:
+			with self._executor_lock:
+				if self._executor is None:
+					self._executor = ThreadPoolExecutor(max_workers=len(self.members), thread_name_prefix="ensemble")
+					_pooled_ensembles.add(self)
+		return self._executor
+
+	def _run_member(self, index: int, X):
+		start = time.perf_counter()
+		proba = self.members[index][1].predict_proba(X)[:, 1]
+		elapsed = time.perf_counter() - start
+		self._latency[index] = elapsed if not self._latency[index] else 0.8 * self._latency[index] + 0.2 * elapsed
+		metrics.observe("ensemble_member_latency_seconds", elapsed, member=self.members[index][0])
+		return proba
+
+	def _abandon(self, future, index: int):
+		"""Count a member call whose result is no longer wanted until it leaves the pool."""
+		if future.cancel():
+			return
+		with self._stragglers_lock:
+			self._stragglers[index] = self._stragglers.get(index, 0) + 1
+
+		def release(_):
+			with self._stragglers_lock:
+				self._stragglers[index] -= 1
+				if not self._stragglers[index]:
+					del self._stragglers[index]
+		future.add_done_callback(release)
+
+	def _deadline(self):
+		deadline = request_deadline.get()
+		if deadline is None and self.budget_ms is not None:
+			deadline = time.monotonic() + self.budget_ms / 1000.0
+		return deadline
+
+	def member_probabilities(self, X) -> np.ndarray:
+		'''
+		(n_rows, n_members) positive-class probabilities; columns of dropped
+		members are NaN. At least one member always finishes.
+		'''
+		deadline = self._deadline()
+		n_rows = X.shape[0]
+		if not n_rows:
+			return np.empty((0, len(self.members)))
+		if len(self.members) == 1:
+			return self._run_member(0, X)[:, None]
+
+		pool = self._pool()
+		with self._stragglers_lock:
+			busy = set(self._stragglers)
+		if len(busy) == len(self.members):
+			busy = set()
+		futures = {}
+		for index, (name, _) in enumerate(self.members):
+			if index in busy:
+				metrics.inc("ensemble_members_dropped_total", member=name, reason="straggling")
+				continue
+			if deadline is not None and futures and self._latency[index] > deadline - time.monotonic():
+				metrics.inc("ensemble_members_dropped_total", member=name, reason="expected_latency")
+				continue
+			# members run in a copy of the caller's context, so metrics.paused() and the deadline carry over
+			futures[pool.submit(contextvars.copy_context().run, self._run_member, index, X)] = index
+
+		timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+		done, pending = wait(futures, timeout=timeout)
+		if not done:
+			done, pending = wait(futures, return_when=FIRST_COMPLETED)
+
+		result = np.full((n_rows, len(self.members)), np.nan)
+		for future in done:
+			result[:, futures[future]] = future.result()
+		for future in pending:
+			# a running member cannot be interrupted; its result is ignored and the
+			# member sits out later calls until it has finished
+			self._abandon(future, futures[future])
+			metrics.inc("ensemble_members_dropped_total", member=self.members[futures[future]][0], reason="deadline")
+		return result
+
+	def predict_proba(self, X) -> np.ndarray:
+		try:
+			member_proba = self.member_probabilities(X)
+			finished = ~np.isnan(member_proba).any(axis=0)
+			if self.method == "soft":
+				weights = self.weights * finished
+				positive = member_proba[:, finished] @ weights[finished] / weights.sum()
+			else:
+				filled = np.where(np.isnan(member_proba), self.fallback_proba[None, :], member_proba)
+				positive = self.meta_model.predict_proba(filled)[:, 1]
+			return np.column_stack([1.0 - positive, positive])
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def predict(self, X) -> np.ndarray:
+		return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
+
+
+def build_ensemble(models: dict, report: dict, X_train, y_train, size: int, method: str="soft",
+		cv_data=None, budget_ms: float=None) -> EnsembleModel:
+	'''
+	Ensemble of the `size` best fitted models in `report` ({name: score}).
+	Soft voting weights members equally; stacking fits a logistic regression
+	on out-of-fold member probabilities.
+	'''
+	try:
+		# training-only imports; serving unpickles EnsembleModel without them
+		from sklearn.linear_model import LogisticRegression
+
+		names = sorted(report, key=report.get, reverse=True)[:size]
+		members = [(name, models[name]) for name in names]
+		logging.info(f"Building {method} ensemble of {names}")
+		if method != "stacked":
+			return EnsembleModel(members, method=method, budget_ms=budget_ms)
+
+		oof = np.column_stack([out_of_fold_proba(model, X_train, y_train, cv_data=cv_data) for _, model in members])
+		target = y_train if cv_data is None else cv_data[1]
+		# stacked-fold order repeats rows across folds; keep the validation rows only
+		if cv_data is not None:
+			val_rows = np.concatenate([rows for _, rows in cv_data[2]])
+			oof, target = oof[val_rows], target[val_rows]
+		meta_model = LogisticRegression(max_iter=1000).fit(oof, target)
+		return EnsembleModel(members, method="stacked", meta_model=meta_model,
+			fallback_proba=oof.mean(axis=0), budget_ms=budget_ms)
+
+	except Exception as e:
+		raise CustomException(e, sys)
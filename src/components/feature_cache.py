@@ -0,0 +1,150 @@
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import read_dataset, save_matrix, load_matrix, matrix_nbytes
+from src.components.artifact_store import ArtifactStore
+from src.components.data_transformation import DataTransformation
+from src.components.feature_engineering import FeatureEngineer
+
+
+@dataclass
+class FeatureCacheConfig:
+	n_folds: int=3
+	random_state: int=42
+	search_features_file_path: str=os.path.join('artifacts',"cv_X.npz")
+	search_target_file_path: str=os.path.join('artifacts',"cv_y.npy")
+	search_splits_file_path: str=os.path.join('artifacts',"cv_splits.npz")
+	# keep fold features in the artifact store so repeated experiments skip the per-fold preprocessing
+	use_disk: bool=True
+
+
+def _stack(blocks: list):
+	if any(sparse.issparse(block) for block in blocks):
+		return sparse.vstack([sparse.csr_matrix(block) for block in blocks], format="csr")
+	return np.vstack(blocks)
+
+
+class FeatureCache:
+	'''
+	Transformed features computed once and shared by the training stages:
+	- search_inputs: CV folds whose features come from a preprocessor fitted on
+	  that fold's training rows only, reused by every model family and candidate
+	- transformed / segmentation_features: train and test transformed with the
+	  full preprocessor, reused by the final refit and by segmentation
+	'''
+	def __init__(self, config: FeatureCacheConfig=None, transformation: DataTransformation=None):
+		self.config=config or FeatureCacheConfig()
+		self.transformation=transformation or DataTransformation()
+		self.store=ArtifactStore()
+		self._memory={}
+
+	def transformed(self, train_path: str, test_path: str):
+		"""(X_train, y_train, X_test, y_test, preprocessor_path) from DataTransformation, computed once."""
+		key=("full",train_path,test_path)
+		if key not in self._memory:
+			self._memory[key]=self.transformation.initiate_data_transformation(train_path,test_path)
+		return self._memory[key]
+
+	def segmentation_features(self, train_path: str, test_path: str):
+		"""Train rows followed by test rows, the order CustomerSegmentationTrainer reads them in."""
+		X_train,_,X_test,_,_=self.transformed(train_path,test_path)
+		return _stack([X_train,X_test])
+
+	def search_inputs(self, train_path: str):
+		'''
+		(X, y, splits) for a CV search: the folds are stacked into one matrix and
+		splits holds each fold's (train rows, validation rows) positions in it.
+		'''
+		try:
+			key=("search",train_path)
+			if key in self._memory:
+				return self._memory[key]
+
+			config=self.config
+			transformation_config=self.transformation.data_transformation_config
+			outputs={
+				"cv_X.npz":config.search_features_file_path,
+				"cv_y.npy":config.search_target_file_path,
+				"cv_splits.npz":config.search_splits_file_path,
+			}
+			cache_key=None
+			if config.use_disk:
+				cache_key=self.store.fingerprint(
+					"feature_cache",files=[train_path],
+					config={
+						"n_folds":config.n_folds,
+						"random_state":config.random_state,
+						"cache_version":transformation_config.cache_version,
+						"sparse_threshold":transformation_config.sparse_threshold,
+					},
+				)
+				if self.store.restore("feature_cache",cache_key,outputs) is not None:
+					logging.info("Training data unchanged, reused cached fold features")
+					self._memory[key]=self._load()
+					return self._memory[key]
+
+			X_search,y_search,splits=self._compute(train_path)
+			if cache_key is not None:
+				save_matrix(config.search_features_file_path,X_search)
+				np.save(config.search_target_file_path,y_search)
+				np.savez(config.search_splits_file_path,**{
+					f"{part}_{i}":rows for i,split in enumerate(splits) for part,rows in zip(("train","test"),split)
+				})
+				self.store.store("feature_cache",cache_key,outputs)
+
+			self._memory[key]=(X_search,y_search,splits)
+			return self._memory[key]
+
+		except Exception as e:
+			raise CustomException(e,sys)
+
+	def _load(self):
+		config=self.config
+		with np.load(config.search_splits_file_path) as data:
+			splits=[(data[f"train_{i}"],data[f"test_{i}"]) for i in range(len(data.files)//2)]
+		return load_matrix(config.search_features_file_path),np.load(config.search_target_file_path),splits
+
+	def _compute(self, train_path: str):
+		target_column_name="ProdTaken"
+		df=FeatureEngineer().fit_transform(read_dataset(train_path))
+		X=df.drop(columns=[target_column_name])
+		y=df[target_column_name].to_numpy()
+
+		preprocessor=self.transformation.get_data_transformer_object(df)
+		categorical_columns=dict((name,columns) for name,_,columns in preprocessor.transformers)["cat_pipelines"]
+		if categorical_columns:
+			# the same one-hot columns in every fold, even when a category is missing from a fold
+			preprocessor.set_params(cat_pipelines__one_hot_encoder__categories=[
+				sorted(X[col].dropna().unique().tolist()) for col in categorical_columns
+			])
+
+		blocks_X=[]
+		blocks_y=[]
+		splits=[]
+		offset=0
+		folds=StratifiedKFold(n_splits=self.config.n_folds,shuffle=True,random_state=self.config.random_state)
+		for train_rows,val_rows in folds.split(X,y):
+			fold_preprocessor=clone(preprocessor)
+			blocks_X.append(fold_preprocessor.fit_transform(X.iloc[train_rows]))
+			blocks_X.append(fold_preprocessor.transform(X.iloc[val_rows]))
+			blocks_y.extend([y[train_rows],y[val_rows]])
+			splits.append((
+				np.arange(offset,offset+len(train_rows)),
+				np.arange(offset+len(train_rows),offset+len(train_rows)+len(val_rows)),
+			))
+			offset+=len(train_rows)+len(val_rows)
+
+		X_search=_stack(blocks_X)
+		logging.info(
+			f"Fitted {self.config.n_folds} fold preprocessors, stacked fold features "
+			f"{X_search.shape} ({matrix_nbytes(X_search) / 2**20:.1f} MiB)"
+		)
+		return X_search,np.concatenate(blocks_y),splits
@@ -0,0 +1,136 @@
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.utils import load_object
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+	# input column names, passed positionally to fn
+	inputs: tuple
+	# vectorized over numpy arrays; also called with scalars on the single-record path
+	fn: object
+	# drop the input columns once the feature is computed
+	drop_inputs: bool=True
+
+
+# name -> recipe, applied in this order (a feature may use one defined before it).
+# Training, segmentation and serving all read this table, so a new feature is added here only.
+FEATURES = {
+	"TotalVisiting": DerivedFeature(("NumberOfPersonVisiting","NumberOfChildrenVisiting"), np.add),
+}
+
+# row identifiers: no signal for the model, and they let it memorize customers
+IDENTIFIER_COLUMNS = ("CustomerID",)
+
+
+def register_feature(name: str, inputs: tuple, fn, drop_inputs: bool=True):
+	"""Add a derived column to FEATURES; takes effect at the next training run."""
+	FEATURES[name]=DerivedFeature(tuple(inputs),fn,drop_inputs)
+
+
+class FeatureEngineer:
+	'''
+	Applies the FEATURES table. fit() freezes the recipes (functions
+	included, features.pkl is written with dill) and identifier drops that
+	apply to the training columns; the fitted object is saved next to
+	preprocessor.pkl and reused unchanged by segmentation and serving, even
+	if FEATURES has changed since. A fitted feature whose inputs are missing
+	is an error rather than a silently absent column. Only
+	the declared inputs are read, each feature is one vectorized call, and
+	transform() builds the output from the caller's columns without copying
+	or modifying the frame.
+	'''
+	def __init__(self, drop_columns: tuple=IDENTIFIER_COLUMNS):
+		self.drop_columns=tuple(drop_columns)
+		self.features_=None
+		self.drop_=None
+
+	def fit(self, df: pd.DataFrame, y=None):
+		available=set(df.columns)
+		self.features_={}
+		for name,feature in FEATURES.items():
+			if all(col in available for col in feature.inputs):
+				self.features_[name]=feature
+				available.add(name)
+		self.drop_=[col for col in self.drop_columns if col in df.columns]
+		return self
+
+	def _recipes(self) -> dict:
+		if self.features_ is None:
+			return FEATURES
+		if isinstance(self.features_,dict):
+			return self.features_
+		# pickled before the recipes themselves were stored
+		return {name:FEATURES[name] for name in self.features_ if name in FEATURES}
+
+	def _plan(self, columns) -> tuple:
+		"""(recipes to compute, columns to drop) for the given input columns."""
+		available=set(columns)
+		fitted=self.features_ is not None
+		plan={}
+		for name,feature in self._recipes().items():
+			missing=[col for col in feature.inputs if col not in available]
+			if missing:
+				if fitted:
+					raise KeyError(f"Feature '{name}' needs columns {missing} that are missing from the input")
+				continue
+			plan[name]=feature
+			available.add(name)
+		dropped=set(self.drop_columns if self.drop_ is None else self.drop_)
+		for feature in plan.values():
+			if feature.drop_inputs:
+				dropped.update(feature.inputs)
+		return plan,dropped-set(plan)
+
+	@staticmethod
+	def _derive(plan: dict, columns) -> dict:
+		values={}
+		for name,feature in plan.items():
+			values[name]=feature.fn(*(values[col] if col in values else columns[col] for col in feature.inputs))
+		return values
+
+	def transform_arrays(self, columns: dict) -> dict:
+		"""{column: 1-d array} in, {column: 1-d array} out, for callers that already hold numpy columns."""
+		plan,dropped=self._plan(columns)
+		out={col:values for col,values in columns.items() if col not in dropped}
+		out.update(self._derive(plan,columns))
+		return out
+
+	def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+		try:
+			plan,dropped=self._plan(df.columns)
+			if not plan and not dropped.intersection(df.columns):
+				return df
+			inputs={col:df[col].to_numpy() for feature in plan.values() for col in feature.inputs if col in df.columns}
+			data={col:df[col] for col in df.columns if col not in dropped}
+			data.update(self._derive(plan,inputs))
+			return pd.DataFrame(data,index=df.index,copy=False)
+
+		except Exception as e:
+			raise CustomException(e,sys)
+
+	def fit_transform(self, df: pd.DataFrame, y=None) -> pd.DataFrame:
+		return self.fit(df).transform(df)
+
+	def transform_record(self, record: dict) -> dict:
+		"""Single-customer counterpart of transform() for the compiled fast path."""
+		# a JSON null reaches here as None; the feature functions expect NaN, as in a DataFrame column
+		inputs={col for feature in self._recipes().values() for col in feature.inputs}
+		return self.transform_arrays({col:np.nan if value is None and col in inputs else value for col,value in record.items()})
+
+
+def load_feature_engineer(file_path: str) -> FeatureEngineer:
+	'''
+	The FeatureEngineer saved with a preprocessor. Artifacts trained before it
+	was saved get the derived features but keep their identifier columns,
+	since their preprocessor expects them.
+	'''
+	if os.path.exists(file_path):
+		return load_object(file_path)
+	return FeatureEngineer(drop_columns=())
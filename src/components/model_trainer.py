@@ -16,26 +16,52 @@ from xgboost import XGBClassifier
 from src.exception import CustomException
 from src.logger import logging
 
-from src.utils import save_object,evaluate_models
+from src.utils import save_object,save_artifact,evaluate_models
+from src.components.artifact_store import ArtifactStore
+from src.components.ensemble import build_ensemble
+from src.components.tree_compiler import compile_model
+from src.components.dense_input import DenseInputClassifier
 
 @dataclass
 class ModelTrainerConfig:
 	trained_model_file_path=os.path.join("artifacts","model.pkl")
+	trained_model_artifact_path: str=os.path.join("artifacts","model_artifact")
+	# 'grid', 'random' or 'halving'
+	search_strategy: str="grid"
+	# parallel workers for candidate x fold fits (-1 uses every core)
+	n_jobs: int=-1
+	# optional per-model cap on candidate x fold fits
+	max_fits_per_model: int=None
+	# optional wall-clock budget for the whole search, checked between waves of candidates
+	# (halving searches run whole once started)
+	search_time_budget_seconds: float=None
+	# model families that are trained on a dense copy of the sparse features and served dense
+	# (DenseInputClassifier). XGBoost reads entries absent from CSR as missing, not 0.
+	dense_only_models: tuple=("XGBClassifier",)
+	# >1 persists an ensemble of the top N model families instead of the single best one
+	ensemble_size: int=1
+	# 'soft' (average of member probabilities) or 'stacked' (logistic regression on out-of-fold probabilities)
+	ensemble_method: str="soft"
+	# per-prediction latency budget; members that would miss it are dropped
+	ensemble_budget_ms: float=None
+	# serve tree models from flattened node arrays (model_artifact); model.pkl keeps the original estimator
+	compile_tree_models: bool=False
+	# test rows on which the compiled model must reproduce predict_proba exactly
+	compile_check_rows: int=2000
+	use_cache: bool=True
 
 class ModelTrainer:
 	def __init__(self):
 		self.model_trainer_config=ModelTrainerConfig()
+		self.store=ArtifactStore()
 
 
-	def initiate_model_trainer(self,train_array,test_array):
+	def initiate_model_trainer(self,X_train,y_train,X_test,y_test,cv_data=None):
+		'''
+		X_train/X_test may be dense arrays or CSR matrices; they are passed through unchanged.
+		cv_data is an optional (X, y, splits) from FeatureCache.search_inputs with per-fold preprocessed features.
+		'''
 		try:
-			logging.info("Split training and test input data")
-			X_train,y_train,X_test,y_test=(
-				train_array[:,:-1],
-				train_array[:,-1],
-				test_array[:,:-1],
-				test_array[:,-1]
-			)
 			models = {
 				"Logistic Regression": LogisticRegression(max_iter=1000),
 				"Random Forest": RandomForestClassifier(),
@@ -70,9 +96,46 @@ class ModelTrainer:
 				}
 			}
 
+			config=self.model_trainer_config
+			outputs={
+				"model.pkl":config.trained_model_file_path,
+				"model_artifact":config.trained_model_artifact_path,
+			}
+			cache_key=None
+			if config.use_cache:
+				cache_key=self.store.fingerprint(
+					"model_trainer",
+					arrays=[X_train,y_train,X_test,y_test]+([] if cv_data is None else [cv_data[0],cv_data[1]]),
+					config={
+						"models":{name:repr(model) for name,model in models.items()},
+						"params":params,
+						"search":config.search_strategy,
+						"max_fits":config.max_fits_per_model,
+						"time_budget":config.search_time_budget_seconds,
+						"dense_only":list(config.dense_only_models),
+						"ensemble":[config.ensemble_size,config.ensemble_method,config.ensemble_budget_ms],
+						"compile":config.compile_tree_models,
+						"cv_splits":None if cv_data is None else [len(rows) for split in cv_data[2] for rows in split],
+					},
+				)
+				meta=self.store.restore("model_trainer",cache_key,outputs)
+				if meta is not None:
+					logging.info(f"Training data unchanged, reused cached {meta['best_model_name']}")
+					return meta["score"]
+
 			model_report:dict=evaluate_models(X_train=X_train,y_train=y_train,X_test=X_test,y_test=y_test,
-											 models=models,param=params, classification=True)
+											 models=models,param=params, classification=True,
+											 search=config.search_strategy,n_jobs=config.n_jobs,
+											 max_fits=config.max_fits_per_model,
+											 time_budget_seconds=config.search_time_budget_seconds,
+											 dense_only=config.dense_only_models,
+											 cv_data=cv_data)
 			
+			# densify their input on every serving path too, as in training
+			for name in config.dense_only_models:
+				if name in model_report:
+					models[name]=DenseInputClassifier.from_fitted(models[name])
+
 			## To get best model score from dict
 			best_model_score = max(sorted(model_report.values()))
 
@@ -87,14 +150,31 @@ class ModelTrainer:
 				raise CustomException("No best model found")
 			logging.info(f"Best found model on both training and testing dataset")
 
+			if config.ensemble_size>1:
+				# scored without the latency budget so every member counts
+				best_model=build_ensemble(models,model_report,X_train,y_train,size=config.ensemble_size,
+					method=config.ensemble_method,cv_data=cv_data)
+				best_model_name=f"{config.ensemble_method} ensemble of {best_model.member_names}"
+
+			predicted=best_model.predict(X_test)
+
+			score = f1_score(y_test, predicted)
+
+			if config.ensemble_size>1:
+				best_model.budget_ms=config.ensemble_budget_ms
+
 			save_object(
 				file_path=self.model_trainer_config.trained_model_file_path,
 				obj=best_model
 			)
+			serving_model=best_model
+			if config.compile_tree_models:
+				serving_model=compile_model(best_model,X_check=X_test[:config.compile_check_rows])
+			save_artifact(config.trained_model_artifact_path,serving_model)
 
-			predicted=best_model.predict(X_test)
-
-			score = f1_score(y_test, predicted)
+			if cache_key is not None:
+				self.store.store("model_trainer",cache_key,outputs,
+					meta={"best_model_name":best_model_name,"score":float(score),"report":model_report})
 			return score
 			
 		except Exception as e:
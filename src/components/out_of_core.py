@@ -0,0 +1,314 @@
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import save_object, save_artifact, iter_dataset_chunks
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.model_trainer import ModelTrainerConfig
+from src.components.feature_engineering import FeatureEngineer
+
+
+@dataclass
+class OutOfCoreTrainerConfig:
+	# rows held in memory at any time
+	chunk_size: int=100000
+	# 'sgd' (partial_fit logistic regression) or 'xgboost' (external-memory DMatrix)
+	learner: str="sgd"
+	# passes over the training file for the sgd learner
+	epochs: int=5
+	# medians are exact up to this many non-null values per column, reservoir-sampled above it
+	median_sample_size: int=100000
+	xgb_params: dict=field(default_factory=lambda: {
+		"objective": "binary:logistic",
+		"eval_metric": "logloss",
+		"tree_method": "hist",
+		"learning_rate": 0.1,
+		"max_depth": 6,
+	})
+	num_boost_round: int=256
+	# test f1 below which the model is rejected and nothing is saved; None saves whatever was trained
+	min_test_f1: float=0.6
+	# page cache written by xgboost while it iterates the training file
+	xgb_cache_dir: str=os.path.join('artifacts',"xgb_cache")
+	random_state: int=42
+
+
+class _NumericStats:
+	'''Running count/mean/M2 of the non-null values plus a reservoir sample for the median.'''
+	def __init__(self, sample_size: int, rng):
+		self.count = 0
+		self.missing = 0
+		self.mean = 0.0
+		self.m2 = 0.0
+		self.sample = np.empty(sample_size, dtype=np.float64)
+		self.rng = rng
+
+	def update(self, values: np.ndarray):
+		mask = np.isnan(values)
+		self.missing += int(mask.sum())
+		values = values[~mask]
+		n = len(values)
+		if n == 0:
+			return
+
+		# reservoir sampling (algorithm R), vectorized over the chunk
+		k = len(self.sample)
+		positions = np.arange(self.count, self.count + n)
+		direct = positions < k
+		self.sample[positions[direct]] = values[direct]
+		if not direct.all():
+			slots = self.rng.integers(0, positions[~direct] + 1)
+			keep = slots < k
+			self.sample[slots[keep]] = values[~direct][keep]
+
+		# Chan et al. pairwise merge of the chunk moments
+		chunk_mean = values.mean()
+		chunk_m2 = ((values - chunk_mean) ** 2).sum()
+		total = self.count + n
+		delta = chunk_mean - self.mean
+		self.mean += delta * n / total
+		self.m2 += chunk_m2 + delta * delta * self.count * n / total
+		self.count = total
+
+	def finalize(self):
+		'''Median, and mean/variance of the column after median imputation.'''
+		if self.count == 0:
+			raise ValueError("Numeric column has no non-null values")
+		median = float(np.median(self.sample[:min(self.count, len(self.sample))]))
+		total = self.count + self.missing
+		mean = (self.count * self.mean + self.missing * median) / total
+		m2 = self.m2 + self.count * (self.mean - mean) ** 2 + self.missing * (median - mean) ** 2
+		return median, mean, m2 / total, total
+
+
+class _CategoricalStats:
+	def __init__(self):
+		self.counts = Counter()
+		self.missing = 0
+
+	def update(self, values: pd.Series):
+		self.missing += int(values.isna().sum())
+		self.counts.update(values.dropna().astype(str).value_counts().to_dict())
+
+	def finalize(self):
+		'''Mode (ties go to the smallest value, like SimpleImputer) and category counts after imputation.'''
+		if not self.counts:
+			raise ValueError("Categorical column has no non-null values")
+		top = max(self.counts.values())
+		mode = min(value for value, count in self.counts.items() if count == top)
+		counts = Counter(self.counts)
+		counts[mode] += self.missing
+		return mode, counts
+
+
+class OutOfCoreTrainer:
+	'''
+	Trains on train/test files that do not fit in memory. Preprocessor
+	statistics come from one streaming pass over the training file and are
+	written into the same ColumnTransformer DataTransformation builds, so the
+	saved preprocessor.pkl and model.pkl are drop-in replacements for the
+	in-memory ones. The model is an incremental or external-memory learner
+	fed chunk by chunk.
+	'''
+	def __init__(self):
+		self.config=OutOfCoreTrainerConfig()
+		self.transformation_config=DataTransformationConfig()
+		self.trainer_config=ModelTrainerConfig()
+		self.feature_engineer=FeatureEngineer()
+
+	def _iter_chunks(self, path: str):
+		target_column_name="ProdTaken"
+		for chunk in iter_dataset_chunks(path, self.config.chunk_size):
+			if self.feature_engineer.features_ is None:
+				# the first training chunk has every column, which is all fit() looks at
+				self.feature_engineer.fit(chunk)
+			chunk = self.feature_engineer.transform(chunk)
+			if target_column_name not in chunk.columns:
+				raise KeyError(f"Target column '{target_column_name}' not found in {path}")
+			yield chunk.drop(columns=[target_column_name]), chunk[target_column_name].to_numpy()
+
+	def collect_statistics(self, train_path: str) -> dict:
+		rng = np.random.default_rng(self.config.random_state)
+		columns = None
+		numeric = {}
+		categorical = {}
+		classes = set()
+		rows = 0
+		for features, target in self._iter_chunks(train_path):
+			if columns is None:
+				columns = features.columns.tolist()
+				for col in columns:
+					if features[col].dtype == object or isinstance(features[col].dtype, pd.CategoricalDtype):
+						categorical[col] = _CategoricalStats()
+					else:
+						numeric[col] = _NumericStats(self.config.median_sample_size, rng)
+			for col, stats in numeric.items():
+				stats.update(features[col].to_numpy(dtype=np.float64, na_value=np.nan))
+			for col, stats in categorical.items():
+				stats.update(features[col])
+			classes.update(np.unique(target).tolist())
+			rows += len(features)
+
+		if columns is None:
+			raise ValueError(f"No rows found in {train_path}")
+		logging.info(f"Collected streaming statistics over {rows} training rows")
+		return {
+			"columns": columns,
+			"numeric": {col: stats.finalize() for col, stats in numeric.items()},
+			"categorical": {col: stats.finalize() for col, stats in categorical.items()},
+			"classes": np.array(sorted(classes)),
+			"rows": rows,
+		}
+
+	def build_preprocessor(self, stats: dict):
+		'''
+		Fit the standard ColumnTransformer on a small prototype frame that holds
+		every category, then overwrite its fitted statistics with the streamed ones.
+		'''
+		numeric = stats["numeric"]
+		categorical = stats["categorical"]
+		n_rows = max([len(counts) for _, counts in categorical.values()] + [1])
+		prototype = pd.DataFrame({
+			col: (
+				np.resize(np.array(sorted(categorical[col][1]), dtype=object), n_rows)
+				if col in categorical else np.zeros(n_rows)
+			)
+			for col in stats["columns"]
+		})
+		preprocessor = DataTransformation().get_data_transformer_object(prototype)
+		preprocessor.fit(prototype)
+
+		columns_of = {name: columns for name, _, columns in preprocessor.transformers_}
+		total = stats["rows"]
+		nnz = 0
+		width = 0
+		if numeric:
+			num_steps = preprocessor.named_transformers_["num_pipeline"].named_steps
+			num_columns = columns_of["num_pipeline"]
+			medians = np.array([numeric[col][0] for col in num_columns])
+			means = np.array([numeric[col][1] for col in num_columns])
+			variances = np.array([numeric[col][2] for col in num_columns])
+			num_steps["imputer"].statistics_ = medians
+			scaler = num_steps["scaler"]
+			scaler.mean_ = means
+			scaler.var_ = variances
+			scaler.scale_ = np.where(variances > 0, np.sqrt(variances), 1.0)
+			scaler.n_samples_seen_ = total
+			nnz += total * len(medians)
+			width += len(medians)
+
+		if categorical:
+			cat_steps = preprocessor.named_transformers_["cat_pipelines"].named_steps
+			cat_columns = columns_of["cat_pipelines"]
+			cat_steps["imputer"].statistics_ = np.array([categorical[col][0] for col in cat_columns], dtype=object)
+			encoder = cat_steps["one_hot_encoder"]
+			shares = []
+			for col, categories in zip(cat_columns, encoder.categories_):
+				counts = categorical[col][1]
+				# drop='first' removes the first sorted category
+				kept = np.array([counts[value] for value in categories[1:]], dtype=np.float64)
+				shares.append(kept / total)
+				nnz += int(kept.sum())
+			share = np.concatenate(shares) if shares else np.empty(0)
+			variances = share * (1.0 - share)
+			scaler = cat_steps["scaler"]
+			scaler.mean_ = share
+			scaler.var_ = variances
+			scaler.scale_ = np.where(variances > 0, np.sqrt(variances), 1.0)
+			scaler.n_samples_seen_ = total
+			width += len(share)
+
+		# the full-data fit would decide sparse vs dense output from the overall density
+		density = nnz / (total * width) if width else 1.0
+		preprocessor.sparse_output_ = density < preprocessor.sparse_threshold
+		return preprocessor
+
+	def _fit_sgd(self, preprocessor, train_path: str, classes: np.ndarray):
+		from sklearn.linear_model import SGDClassifier
+		model = SGDClassifier(loss="log_loss", random_state=self.config.random_state)
+		for epoch in range(self.config.epochs):
+			for features, target in self._iter_chunks(train_path):
+				model.partial_fit(preprocessor.transform(features), target, classes=classes)
+			logging.info(f"SGD epoch {epoch + 1}/{self.config.epochs} done")
+		return model
+
+	def _fit_xgboost(self, preprocessor, train_path: str):
+		import xgboost
+		from xgboost import XGBClassifier
+
+		trainer = self
+
+		class _ChunkIter(xgboost.DataIter):
+			def __init__(self):
+				self._chunks = None
+				super().__init__(cache_prefix=os.path.join(trainer.config.xgb_cache_dir, "train"))
+
+			def next(self, input_data):
+				if self._chunks is None:
+					self._chunks = trainer._iter_chunks(train_path)
+				try:
+					features, target = next(self._chunks)
+				except StopIteration:
+					return 0
+				input_data(data=preprocessor.transform(features), label=target)
+				return 1
+
+			def reset(self):
+				self._chunks = None
+
+		os.makedirs(self.config.xgb_cache_dir, exist_ok=True)
+		dtrain = xgboost.DMatrix(_ChunkIter())
+		booster = xgboost.train(self.config.xgb_params, dtrain, num_boost_round=self.config.num_boost_round)
+
+		# load into the sklearn wrapper so serving keeps calling predict/predict_proba
+		model_json = os.path.join(self.config.xgb_cache_dir, "booster.json")
+		booster.save_model(model_json)
+		model = XGBClassifier()
+		model.load_model(model_json)
+		return model
+
+	def _streaming_f1(self, preprocessor, model, test_path: str) -> float:
+		tp = fp = fn = 0
+		for features, target in self._iter_chunks(test_path):
+			predicted = model.predict(preprocessor.transform(features))
+			tp += int(((predicted == 1) & (target == 1)).sum())
+			fp += int(((predicted == 1) & (target != 1)).sum())
+			fn += int(((predicted != 1) & (target == 1)).sum())
+		return 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+
+	def train(self, train_path: str, test_path: str):
+		try:
+			logging.info(f"Out-of-core training with learner '{self.config.learner}'")
+			stats = self.collect_statistics(train_path)
+			preprocessor = self.build_preprocessor(stats)
+
+			if self.config.learner == "sgd":
+				model = self._fit_sgd(preprocessor, train_path, stats["classes"])
+			elif self.config.learner == "xgboost":
+				model = self._fit_xgboost(preprocessor, train_path)
+			else:
+				raise ValueError(f"Unknown out-of-core learner '{self.config.learner}'")
+
+			score = self._streaming_f1(preprocessor, model, test_path)
+			logging.info(f"Out-of-core {self.config.learner} model test f1: {score:.4f}")
+			if self.config.min_test_f1 is not None and score<self.config.min_test_f1:
+				raise ValueError(
+					f"Out-of-core {self.config.learner} model test f1 {score:.4f} is below min_test_f1 {self.config.min_test_f1}"
+				)
+
+			save_object(file_path=self.transformation_config.preprocessor_obj_file_path, obj=preprocessor)
+			save_artifact(self.transformation_config.preprocessor_artifact_path, preprocessor)
+			save_object(file_path=self.transformation_config.feature_engineer_file_path, obj=self.feature_engineer)
+			save_object(file_path=self.trainer_config.trained_model_file_path, obj=model)
+			save_artifact(self.trainer_config.trained_model_artifact_path, model)
+
+			return score, self.transformation_config.preprocessor_obj_file_path
+
+		except Exception as e:
+			raise CustomException(e,sys)
@@ -0,0 +1,231 @@
+import os
+import sys
+import glob
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+# leading bytes of each binary format; anything else is treated as delimited text
+MAGIC_BYTES = [
+	(b"PAR1", "parquet"),
+	(b"ARROW1", "feather"),
+	(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "xls"),
+	(b"PK\x03\x04", "zip"),
+	(b"\x1f\x8b", "csv.gz"),
+]
+
+# file extensions picked up from a sharded directory
+SHARD_EXTENSIONS = ('.parquet', '.pq', '.feather', '.arrow', '.csv', '.csv.gz', '.xls', '.xlsx')
+
+READERS = {}
+
+
+def register_reader(fmt: str):
+	"""Register `fn(path) -> pyarrow.Table | DataFrame` as the reader for a sniffed format."""
+	def decorator(fn):
+		READERS[fmt] = fn
+		return fn
+	return decorator
+
+
+def sniff_format(path: str) -> str:
+	"""The real format of `path` from its leading bytes, whatever its extension says."""
+	with open(path, 'rb') as f:
+		head = f.read(8)
+	for magic, fmt in MAGIC_BYTES:
+		if head.startswith(magic):
+			break
+	else:
+		return "csv"
+	if fmt == "zip":
+		# xlsx is a zip container holding the workbook under xl/
+		with zipfile.ZipFile(path) as archive:
+			if any(name.startswith("xl/") for name in archive.namelist()):
+				return "xlsx"
+		raise ValueError(f"Zip archive '{path}' is not an xlsx workbook")
+	return fmt
+
+
+@register_reader("parquet")
+def read_parquet(path: str):
+	import pyarrow.parquet as pq
+	return pq.read_table(path, use_threads=True)
+
+
+@register_reader("feather")
+def read_feather(path: str):
+	import pyarrow.feather as feather
+	return feather.read_table(path, memory_map=True)
+
+
+def _read_delimited(path: str, compression: str=None):
+	'''
+	pandas on its pyarrow engine: multithreaded parsing with pandas' own NA
+	rules, so blank cells are NaN exactly as in pd.read_csv and the chunked
+	reader below. Falls back to the C parser when pyarrow is not installed.
+	'''
+	# the compression comes from the sniffed bytes, not from the file name
+	try:
+		import pyarrow  # noqa: F401
+	except ImportError:
+		return pd.read_csv(path, compression=compression)
+	return pd.read_csv(path, compression=compression, engine="pyarrow")
+
+
+@register_reader("csv")
+def read_csv(path: str):
+	return _read_delimited(path)
+
+
+@register_reader("csv.gz")
+def read_csv_gzip(path: str):
+	return _read_delimited(path, compression="gzip")
+
+
+def _excel_engine(fmt: str) -> str:
+	try:
+		# Rust-based calamine parses both formats several times faster than xlrd/openpyxl
+		import python_calamine  # noqa: F401
+		return "calamine"
+	except ImportError:
+		return "xlrd" if fmt == "xls" else "openpyxl"
+
+
+def _read_sheet(path: str, sheet, engine: str) -> pd.DataFrame:
+	return pd.read_excel(path, sheet_name=sheet, engine=engine)
+
+
+def read_excel(path: str, fmt: str, max_workers: int=None) -> pd.DataFrame:
+	'''
+	Every sheet whose header matches the first sheet, parsed in a process pool
+	(the Excel engines hold the GIL) and concatenated in sheet order. Sheets
+	with other columns, such as a data dictionary, are skipped.
+	'''
+	engine = _excel_engine(fmt)
+	try:
+		with pd.ExcelFile(path, engine=engine) as workbook:
+			sheets = workbook.sheet_names
+	except ImportError as ie:
+		raise CustomException(
+			f"Missing Excel engine for '{path}'. Install required package (e.g., pip install xlrd for .xls or openpyxl for .xlsx). Original error: {ie}",
+			sys,
+		)
+	if len(sheets) == 1:
+		return _read_sheet(path, sheets[0], engine)
+
+	with ProcessPoolExecutor(max_workers=min(len(sheets), max_workers or os.cpu_count() or 1)) as executor:
+		frames = list(executor.map(_read_sheet, [path] * len(sheets), sheets, [engine] * len(sheets)))
+	columns = list(frames[0].columns)
+	kept = [frame for frame in frames if list(frame.columns) == columns]
+	if len(kept) < len(frames):
+		logging.info(f"Skipped {len(frames) - len(kept)} sheets of {path} with a different header")
+	return pd.concat(kept, ignore_index=True, copy=False)
+
+
+@register_reader("xls")
+def read_xls(path: str):
+	return read_excel(path, "xls")
+
+
+@register_reader("xlsx")
+def read_xlsx(path: str):
+	return read_excel(path, "xlsx")
+
+
+def source_files(source: str) -> list:
+	"""The files behind `source`: itself, the data files of a directory, or the matches of a glob, sorted."""
+	if os.path.isdir(source):
+		files = [
+			os.path.join(source, name) for name in os.listdir(source)
+			if name.lower().endswith(SHARD_EXTENSIONS) and not name.startswith(('.', '_'))
+		]
+	elif glob.has_magic(source):
+		files = [path for path in glob.glob(source) if os.path.isfile(path)]
+	else:
+		files = [source] if os.path.isfile(source) else []
+	return sorted(files)
+
+
+def read_file(path: str):
+	"""Read one file with the reader registered for its sniffed format."""
+	fmt = sniff_format(path)
+	logging.info(f"Reading {path} as {fmt}")
+	return READERS[fmt](path)
+
+
+def _concat(parts: list) -> pd.DataFrame:
+	'''
+	Arrow tables are concatenated by reference and converted to pandas once;
+	mixed or schema-incompatible parts fall back to a single pandas concat.
+	'''
+	try:
+		import pyarrow as pa
+	except ImportError:
+		return pd.concat(parts, ignore_index=True, copy=False)
+	tables = [part for part in parts if isinstance(part, pa.Table)]
+	if len(tables) == len(parts):
+		try:
+			return pa.concat_tables(tables, promote_options="default").to_pandas(split_blocks=True, self_destruct=True)
+		except (pa.ArrowInvalid, pa.ArrowTypeError):
+			logging.info("Shard schemas differ, concatenating with pandas")
+	frames = [part.to_pandas(split_blocks=True) if isinstance(part, pa.Table) else part for part in parts]
+	return pd.concat(frames, ignore_index=True, copy=False)
+
+
+def read_source(source: str, max_workers: int=None) -> pd.DataFrame:
+	'''
+	Read a file, a directory of shards or a glob into one DataFrame. Shards are
+	read concurrently on a thread pool (the pyarrow readers release the GIL)
+	and concatenated in sorted path order.
+	'''
+	try:
+		files = source_files(source)
+		if not files:
+			raise FileNotFoundError(f"No data files found for '{source}'")
+		if len(files) == 1:
+			return _concat([read_file(files[0])])
+		with ThreadPoolExecutor(max_workers=min(len(files), max_workers or os.cpu_count() or 1)) as executor:
+			parts = list(executor.map(read_file, files))
+		logging.info(f"Read {len(files)} shards of {source}")
+		return _concat(parts)
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def iter_source_chunks(source: str, chunk_size: int):
+	'''
+	Yield a file, directory of shards or glob as DataFrames of at most
+	`chunk_size` rows, one shard after another. Parquet, Feather and CSV are
+	streamed (Feather through a memory map); Excel cannot be, so each
+	workbook is read whole and sliced.
+	'''
+	try:
+		files = source_files(source)
+		if not files:
+			raise FileNotFoundError(f"No data files found for '{source}'")
+		for path in files:
+			fmt = sniff_format(path)
+			if fmt == "parquet":
+				import pyarrow.parquet as pq
+				for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+					yield batch.to_pandas()
+			elif fmt == "feather":
+				table = read_feather(path)
+				for start in range(0, table.num_rows, chunk_size):
+					yield table.slice(start, chunk_size).to_pandas()
+			elif fmt in ("csv", "csv.gz"):
+				yield from pd.read_csv(path, chunksize=chunk_size, compression="gzip" if fmt == "csv.gz" else None)
+			else:
+				logging.info(f"{path} is {fmt}, reading it whole before chunking")
+				data = READERS[fmt](path)
+				for start in range(0, len(data), chunk_size):
+					yield data.iloc[start:start + chunk_size]
+
+	except Exception as e:
+		raise CustomException(e, sys)
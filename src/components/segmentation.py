@@ -5,99 +5,258 @@ from dataclasses import dataclass
 
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from joblib import Parallel, delayed
+from sklearn import config_context
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import silhouette_score
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import load_object, save_object
+from src.utils import load_object, save_object, read_dataset, dataset_columns, iter_dataset_chunks
+from src.components.artifact_store import ArtifactStore
+from src.components.feature_engineering import load_feature_engineer
 
 
 @dataclass
 class SegmentationConfig:
 	segmenter_path: str = os.path.join('artifacts', 'segmenter.pkl')
 	segmenter_meta_path: str = os.path.join('artifacts', 'segmenter_meta.json')
+	# FeatureEngineer fitted with the preprocessor by DataTransformation
+	feature_engineer_path: str = os.path.join('artifacts', 'features.pkl')
+	k_candidates: tuple = (3, 4, 5, 6)
+	# 'kmeans' (full KMeans), 'minibatch' (MiniBatchKMeans) or 'auto' (minibatch above auto_minibatch_rows)
+	mode: str = 'auto'
+	auto_minibatch_rows: int = 50000
+	minibatch_size: int = 4096
+	# silhouette is exact up to this many rows, sampled above it
+	silhouette_sample_size: int = 10000
+	# scratch memory (MiB) for the chunked pairwise distances inside silhouette_score
+	silhouette_working_memory_mb: int = 256
+	# k candidates evaluated in parallel
+	n_jobs: int = -1
+	# rows per chunk for train_streaming
+	chunk_size: int = 100000
+	random_state: int = 42
+	use_cache: bool = True
+
+
+def _fit_candidate(X, k: int, mode: str, config: SegmentationConfig):
+	"""Fit one cluster count and score it; runs in a joblib worker."""
+	if mode == 'minibatch':
+		km = MiniBatchKMeans(n_clusters=k, batch_size=config.minibatch_size, n_init=3, random_state=config.random_state)
+	else:
+		km = KMeans(n_clusters=k, n_init=10, random_state=config.random_state)
+	labels = km.fit_predict(X)
+	sample_size = config.silhouette_sample_size if X.shape[0] > config.silhouette_sample_size else None
+	with config_context(working_memory=config.silhouette_working_memory_mb):
+		score = silhouette_score(X, labels, sample_size=sample_size, random_state=config.random_state)
+	return k, km, float(score)
 
 
 class CustomerSegmentationTrainer:
 	def __init__(self):
 		self.config = SegmentationConfig()
+		self.store = ArtifactStore()
+
+	def _outputs(self) -> dict:
+		return {
+			'segmenter.pkl': self.config.segmenter_path,
+			'segmenter_meta.json': self.config.segmenter_meta_path,
+		}
+
+	def _cache_key(self, train_csv_path: str, test_csv_path: str, preprocessor_path: str, streaming: bool):
+		if not self.config.use_cache:
+			return None
+		return self.store.fingerprint(
+			'segmentation',
+			files=[train_csv_path, test_csv_path, preprocessor_path] + [
+				path for path in (self.config.feature_engineer_path,) if os.path.exists(path)
+			],
+			config={
+				'streaming': streaming,
+				**{
+					name: getattr(self.config, name)
+					for name in ('k_candidates', 'mode', 'auto_minibatch_rows', 'minibatch_size',
+						'silhouette_sample_size', 'random_state')
+				},
+			},
+		)
+
+	def _restore(self, cache_key):
+		if cache_key is None or self.store.restore('segmentation', cache_key, self._outputs()) is None:
+			return None
+		logging.info("Segmentation inputs unchanged, reused cached segmenter")
+		with open(self.config.segmenter_meta_path, 'r', encoding='utf-8') as f:
+			return json.load(f)
+
+	def _save(self, best_model, best_k: int, best_score: float, profiles_df: pd.DataFrame, cache_key) -> dict:
+		"""Persist the segmenter and its meta, with a strategy for each segment's numeric means."""
+		save_object(self.config.segmenter_path, best_model)
 
-	def _apply_feature_engineering(self, df: pd.DataFrame) -> pd.DataFrame:
-		"""Mirror transformation step: create TotalVisiting and drop its components if present."""
-		df = df.copy()
-		if 'NumberOfPersonVisiting' in df.columns and 'NumberOfChildrenVisiting' in df.columns:
-			df['TotalVisiting'] = df['NumberOfPersonVisiting'] + df['NumberOfChildrenVisiting']
-			df.drop(columns=['NumberOfPersonVisiting','NumberOfChildrenVisiting'], inplace=True)
-		return df
+		# Simple strategy suggestions per segment (based on income and trips)
+		segment_summaries = {}
+		for seg, row in profiles_df.iterrows():
+			mi = float(row.get('MonthlyIncome', 0.0))
+			tr = float(row.get('NumberOfTrips', 0.0))
+			pps = float(row.get('PreferredPropertyStar', 0.0))
+			if mi >= float(profiles_df.get('MonthlyIncome', pd.Series([mi])).median()):
+				strategy = 'Premium bundle offer (Deluxe/King), loyalty perks, concierge call'
+			elif tr >= float(profiles_df.get('NumberOfTrips', pd.Series([tr])).median()):
+				strategy = 'Frequent-traveler discount, upsell to higher star property'
+			else:
+				strategy = 'Entry-level Basic/Standard with limited-time discount via email/SMS'
+			segment_summaries[str(int(seg))] = {
+				'avg_monthly_income': round(mi, 2),
+				'avg_trips': round(tr, 2),
+				'avg_pref_star': round(pps, 2),
+				'strategy': strategy,
+			}
+
+		meta = {
+			'best_k': int(best_k),
+			'silhouette': float(best_score),
+			'profiles': segment_summaries,
+		}
+		with open(self.config.segmenter_meta_path, 'w', encoding='utf-8') as f:
+			json.dump(meta, f, indent=2)
+		if cache_key is not None:
+			self.store.store('segmentation', cache_key, self._outputs())
+
+		logging.info(f"Saved segmenter (k={best_k}) and meta")
+		return meta
 
-	def train(self, train_csv_path: str, test_csv_path: str, preprocessor_path: str) -> dict:
+	def train(self, train_csv_path: str, test_csv_path: str, preprocessor_path: str, features=None) -> dict:
+		'''
+		features: optional already-transformed train rows followed by test rows
+		(FeatureCache.segmentation_features); skips transforming the data again.
+		'''
 		try:
-			# Load datasets
-			train_df = pd.read_csv(train_csv_path)
-			test_df = pd.read_csv(test_csv_path)
-			full_df = pd.concat([train_df, test_df], ignore_index=True)
+			cache_key = self._cache_key(train_csv_path, test_csv_path, preprocessor_path, streaming=False)
+			meta = self._restore(cache_key)
+			if meta is not None:
+				return meta
 
-			# Separate features and apply same preprocessing
+			# Load feature columns only; the target is never read
 			target = 'ProdTaken'
-			X_full = full_df.drop(columns=[target], errors='ignore')
-			X_full = self._apply_feature_engineering(X_full)
-			preprocessor = load_object(preprocessor_path)
-			X_full_transformed = preprocessor.transform(X_full)
+			feature_columns = [col for col in dataset_columns(train_csv_path) if col != target]
+			train_df = read_dataset(train_csv_path, columns=feature_columns)
+			test_df = read_dataset(test_csv_path, columns=feature_columns)
+			X_full = pd.concat([train_df, test_df], ignore_index=True)
+
+			# Apply same preprocessing
+			X_full = load_feature_engineer(self.config.feature_engineer_path).transform(X_full)
+			if features is not None and features.shape[0] == len(X_full):
+				X_full_transformed = features
+			else:
+				preprocessor = load_object(preprocessor_path)
+				X_full_transformed = preprocessor.transform(X_full)
 
 			# Try different cluster counts and pick by silhouette score
 			best_k = None
 			best_score = -1.0
 			best_model = None
-			for k in [3, 4, 5, 6]:
-				km = KMeans(n_clusters=k, n_init=10, random_state=42)
-				labels = km.fit_predict(X_full_transformed)
-				score = silhouette_score(X_full_transformed, labels)
-				logging.info(f"KMeans(k={k}) silhouette: {score:.4f}")
+			mode = self.config.mode
+			if mode == 'auto':
+				mode = 'minibatch' if X_full_transformed.shape[0] > self.config.auto_minibatch_rows else 'kmeans'
+			candidates = Parallel(n_jobs=self.config.n_jobs)(
+				delayed(_fit_candidate)(X_full_transformed, k, mode, self.config)
+				for k in self.config.k_candidates
+			)
+			for k, km, score in candidates:
+				logging.info(f"{type(km).__name__}(k={k}) silhouette: {score:.4f}")
 				if score > best_score:
 					best_score = score
 					best_k = k
 					best_model = km
 
-			# Persist best model
-			save_object(self.config.segmenter_path, best_model)
-
 			# Build human-readable profiles on original feature space
 			labels = best_model.predict(X_full_transformed)
-			profile_df = X_full.copy()
+			# X_full is this method's own frame, so the label column is added in place
+			profile_df = X_full
 			profile_df['segment'] = labels
 			# Simple numeric means for quick profiling
-			numeric_cols = profile_df.select_dtypes(exclude='object').columns.tolist()
+			numeric_cols = profile_df.select_dtypes(exclude=['object', 'category']).columns.tolist()
 			profiles_df = profile_df.groupby('segment')[numeric_cols].mean()
+			return self._save(best_model, best_k, best_score, profiles_df, cache_key)
 
-			# Simple strategy suggestions per segment (based on income and trips)
-			segment_summaries = {}
-			for seg, row in profiles_df.iterrows():
-				mi = float(row.get('MonthlyIncome', 0.0))
-				tr = float(row.get('NumberOfTrips', 0.0))
-				pps = float(row.get('PreferredPropertyStar', 0.0))
-				if mi >= float(profiles_df.get('MonthlyIncome', pd.Series([mi])).median()):
-					strategy = 'Premium bundle offer (Deluxe/King), loyalty perks, concierge call'
-				elif tr >= float(profiles_df.get('NumberOfTrips', pd.Series([tr])).median()):
-					strategy = 'Frequent-traveler discount, upsell to higher star property'
-				else:
-					strategy = 'Entry-level Basic/Standard with limited-time discount via email/SMS'
-				segment_summaries[str(int(seg))] = {
-					'avg_monthly_income': round(mi, 2),
-					'avg_trips': round(tr, 2),
-					'avg_pref_star': round(pps, 2),
-					'strategy': strategy,
-				}
-
-			meta = {
-				'best_k': int(best_k),
-				'silhouette': float(best_score),
-				'profiles': segment_summaries,
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def _iter_transformed(self, paths: list, feature_engineer, preprocessor):
+		"""(engineered frame, preprocessed matrix) per chunk of the given files, target dropped."""
+		for path in paths:
+			for chunk in iter_dataset_chunks(path, self.config.chunk_size):
+				chunk = feature_engineer.transform(chunk.drop(columns=['ProdTaken'], errors='ignore'))
+				yield chunk, preprocessor.transform(chunk)
+
+	def train_streaming(self, train_path: str, test_path: str, preprocessor_path: str) -> dict:
+		'''
+		Out-of-core counterpart of train(): every k candidate is a MiniBatchKMeans
+		fed chunk by chunk with partial_fit, the silhouette is computed on a
+		uniform sample of silhouette_sample_size rows, and the segment profiles
+		are summed over a second pass. Memory stays O(chunk_size + sample).
+		'''
+		try:
+			cache_key = self._cache_key(train_path, test_path, preprocessor_path, streaming=True)
+			meta = self._restore(cache_key)
+			if meta is not None:
+				return meta
+
+			from scipy import sparse
+			paths = [train_path, test_path]
+			feature_engineer = load_feature_engineer(self.config.feature_engineer_path)
+			preprocessor = load_object(preprocessor_path)
+			rng = np.random.default_rng(self.config.random_state)
+			models = {
+				k: MiniBatchKMeans(n_clusters=k, batch_size=self.config.minibatch_size, n_init=3,
+					random_state=self.config.random_state)
+				for k in self.config.k_candidates
 			}
-			with open(self.config.segmenter_meta_path, 'w', encoding='utf-8') as f:
-				json.dump(meta, f, indent=2)
+			# uniform sample: the rows with the smallest random keys seen so far
+			sample, sample_keys = None, np.empty(0)
+			for _, X in self._iter_transformed(paths, feature_engineer, preprocessor):
+				for k, km in models.items():
+					# the first partial_fit initializes k centers and needs at least k rows
+					if hasattr(km, 'cluster_centers_') or X.shape[0] >= k:
+						km.partial_fit(X)
+				keys = rng.random(X.shape[0])
+				if sample is None:
+					sample, sample_keys = X, keys
+				else:
+					stack = sparse.vstack if sparse.issparse(X) else np.vstack
+					sample, sample_keys = stack([sample, X]), np.concatenate([sample_keys, keys])
+				if sample.shape[0] > self.config.silhouette_sample_size:
+					keep = np.sort(np.argsort(sample_keys, kind='stable')[:self.config.silhouette_sample_size])
+					sample, sample_keys = sample[keep], sample_keys[keep]
+			if sample is None:
+				raise ValueError(f"No rows found in {train_path} and {test_path}")
+
+			best_k, best_score, best_model = None, -1.0, None
+			for k, km in models.items():
+				if not hasattr(km, 'cluster_centers_'):
+					continue
+				labels = km.predict(sample)
+				if len(np.unique(labels)) < 2:
+					continue
+				with config_context(working_memory=self.config.silhouette_working_memory_mb):
+					score = float(silhouette_score(sample, labels, random_state=self.config.random_state))
+				logging.info(f"MiniBatchKMeans(k={k}) streaming silhouette: {score:.4f}")
+				if score > best_score:
+					best_k, best_score, best_model = k, score, km
+			if best_model is None:
+				raise ValueError("No segmentation candidate could be scored")
+
+			# per-segment means of the numeric columns, NaN skipped as in groupby().mean()
+			sums, counts = None, None
+			for frame, X in self._iter_transformed(paths, feature_engineer, preprocessor):
+				numeric = frame.select_dtypes(exclude=['object', 'category'])
+				numeric = numeric.assign(segment=best_model.predict(X))
+				chunk_sums = numeric.groupby('segment').sum(min_count=1)
+				chunk_counts = numeric.groupby('segment').count()
+				sums = chunk_sums if sums is None else sums.add(chunk_sums, fill_value=0)
+				counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+			profiles_df = sums / counts
+			return self._save(best_model, best_k, best_score, profiles_df, cache_key)
 
-			logging.info(f"Saved segmenter (k={best_k}) and meta")
-			return meta
 		except Exception as e:
 			raise CustomException(e, sys) 
\ No newline at end of file
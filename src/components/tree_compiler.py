@@ -0,0 +1,342 @@
+import sys
+import json
+import copy
+
+import numpy as np
+from scipy import sparse
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+	'''
+	Largest float32 not above each float64 threshold. For float32 inputs
+	x <= threshold holds exactly when x <= _float32_floor(threshold), so the
+	engine can compare in float32 like sklearn's trees do.
+	'''
+	t32 = threshold.astype(np.float32)
+	above = t32.astype(np.float64) > threshold
+	t32[above] = np.nextafter(t32[above], np.float32(-np.inf))
+	return t32
+
+
+def _last_cumsum(values: np.ndarray, axis: int=1) -> np.ndarray:
+	"""Sum along `axis` strictly left to right (np.sum would reorder the additions)."""
+	return np.take(np.cumsum(values, axis=axis), -1, axis=axis)
+
+
+class CompiledTreeModel:
+	'''
+	Array-based replay of a fitted binary tree ensemble. All trees are
+	flattened into shared node arrays (feature, float32 threshold,
+	left/right child, missing-value direction, leaf output); leaves point
+	at themselves so a batch is traversed for every tree at once with
+	max_depth vectorized gather steps. Leaf outputs are combined in the
+	estimator's own order and arithmetic, so predict/predict_proba equal
+	the original model's output bit for bit.
+	'''
+	def __init__(self, kind: str, roots, feature, threshold, left, right, missing_left, leaf_value,
+			max_depth: int, n_features: int, classes, params: dict=None, strict_less: bool=False,
+			missing_from_sparse: bool=False):
+		self.kind = kind
+		self.roots = roots
+		self.feature = feature
+		self.threshold = threshold
+		self.left = left
+		self.right = right
+		self.missing_left = missing_left
+		self.leaf_value = leaf_value
+		self.max_depth = max_depth
+		self.n_features_in_ = n_features
+		self.classes_ = np.asarray(classes)
+		self.params = params or {}
+		# xgboost splits on x < threshold, sklearn on x <= threshold
+		self.strict_less = strict_less
+		# xgboost treats entries absent from a sparse matrix as missing, sklearn as zero
+		self.missing_from_sparse = missing_from_sparse
+
+	@property
+	def n_trees(self) -> int:
+		return len(self.roots)
+
+	@property
+	def nbytes(self) -> int:
+		return sum(arr.nbytes for arr in (self.roots, self.feature, self.threshold, self.left,
+			self.right, self.missing_left, self.leaf_value))
+
+	def _dense_block(self, X, start: int, stop: int) -> np.ndarray:
+		if sparse.issparse(X):
+			block = sparse.csr_matrix(X[start:stop])
+			if self.missing_from_sparse:
+				dense = np.full(block.shape, np.nan, dtype=np.float32)
+				rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+				dense[rows, block.indices] = block.data
+				return dense
+			return block.toarray().astype(np.float32)
+		return np.asarray(X[start:stop], dtype=np.float32)
+
+	def apply(self, X_block: np.ndarray) -> np.ndarray:
+		"""Leaf node index reached in every tree, shape (n_rows, n_trees)."""
+		node = np.broadcast_to(self.roots, (X_block.shape[0], self.n_trees)).copy()
+		has_missing = np.isnan(X_block).any()
+		for _ in range(self.max_depth):
+			values = np.take_along_axis(X_block, self.feature[node], axis=1)
+			threshold = self.threshold[node]
+			go_left = values < threshold if self.strict_less else values <= threshold
+			if has_missing:
+				go_left |= np.isnan(values) & self.missing_left[node]
+			node = np.where(go_left, self.left[node], self.right[node])
+		return node
+
+	def _block_rows(self) -> int:
+		# bound the (rows, trees) working arrays to a few million cells
+		return max(1, (1 << 21) // max(self.n_trees, 1))
+
+	def _combine(self, leaves: np.ndarray):
+		'''Positive-class score per row, in the form the original estimator produces.'''
+		values = self.leaf_value[leaves]
+		params = self.params
+		if self.kind == "forest":
+			proba = _last_cumsum(values)
+			if params["n_estimators"] is not None:
+				proba /= params["n_estimators"]
+			return proba
+		if self.kind == "gradient_boosting":
+			contributions = params["learning_rate"] * values[:, :, 0]
+			init = np.full((len(leaves), 1), params["init_raw"])
+			return _last_cumsum(np.concatenate([init, contributions], axis=1))
+		if self.kind == "adaboost":
+			pred = _last_cumsum(values * params["estimator_weights"][None, :, None])
+			pred /= params["weight_sum"]
+			pred[:, 0] *= -1
+			return pred.sum(axis=1)
+		if self.kind == "xgboost":
+			base = np.full((len(leaves), 1), params["base_margin"], dtype=np.float32)
+			return _last_cumsum(np.concatenate([base, values[:, :, 0]], axis=1))
+		raise ValueError(f"Unknown compiled model kind '{self.kind}'")
+
+	def _raw(self, X):
+		n_rows = X.shape[0]
+		step = self._block_rows()
+		parts = [self._combine(self.apply(self._dense_block(X, start, start + step))) for start in range(0, n_rows, step)]
+		return np.concatenate(parts, axis=0) if parts else np.empty((0,))
+
+	def predict_proba(self, X) -> np.ndarray:
+		try:
+			raw = self._raw(X)
+			if self.kind == "forest":
+				return raw
+			if self.kind == "gradient_boosting":
+				return self.params["loss"].predict_proba(raw)
+			if self.kind == "adaboost":
+				from sklearn.utils.extmath import softmax
+				return softmax(np.vstack([-raw, raw]).T / 2, copy=False)
+			one = np.float32(1.0)
+			positive = one / (np.exp(-raw) + one)
+			return np.vstack((one - positive, positive)).transpose()
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def predict(self, X) -> np.ndarray:
+		try:
+			if self.kind == "forest":
+				return self.classes_.take(np.argmax(self._raw(X), axis=1), axis=0)
+			if self.kind == "gradient_boosting":
+				return self.classes_[(self._raw(X) >= 0).astype(int)]
+			if self.kind == "adaboost":
+				return self.classes_.take(self._raw(X) > 0, axis=0)
+			return self.classes_.take((self.predict_proba(X)[:, 1] > 0.5).astype(int), axis=0)
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+
+def _flatten(trees: list) -> dict:
+	'''
+	Concatenate per-tree node arrays (dicts of feature, threshold, left,
+	right, missing_left, value, depth) into one node space.
+	'''
+	roots, parts = [], {name: [] for name in ("feature", "threshold", "left", "right", "missing_left", "value")}
+	offset = 0
+	for tree in trees:
+		n_nodes = len(tree["left"])
+		leaf = tree["left"] < 0
+		own = np.arange(n_nodes)
+		roots.append(offset)
+		parts["left"].append(np.where(leaf, own, tree["left"]) + offset)
+		parts["right"].append(np.where(leaf, own, tree["right"]) + offset)
+		parts["feature"].append(np.where(leaf, 0, tree["feature"]))
+		parts["threshold"].append(tree["threshold"])
+		parts["missing_left"].append(tree["missing_left"])
+		parts["value"].append(tree["value"])
+		offset += n_nodes
+	return {
+		"roots": np.asarray(roots, dtype=np.int32),
+		"feature": np.concatenate(parts["feature"]).astype(np.int32),
+		"threshold": np.concatenate(parts["threshold"]).astype(np.float32),
+		"left": np.concatenate(parts["left"]).astype(np.int32),
+		"right": np.concatenate(parts["right"]).astype(np.int32),
+		"missing_left": np.concatenate(parts["missing_left"]).astype(bool),
+		"leaf_value": np.concatenate(parts["value"]),
+		"max_depth": max(tree["depth"] for tree in trees),
+	}
+
+
+def _sklearn_tree(estimator, value: np.ndarray) -> dict:
+	tree = estimator.tree_
+	missing_left = getattr(tree, "missing_go_to_left", None)
+	return {
+		"feature": tree.feature,
+		"threshold": _float32_floor(tree.threshold),
+		"left": tree.children_left,
+		"right": tree.children_right,
+		"missing_left": np.zeros(tree.node_count, dtype=bool) if missing_left is None else np.asarray(missing_left, dtype=bool),
+		"value": value,
+		"depth": tree.max_depth,
+	}
+
+
+def _normalized_proba(estimator) -> np.ndarray:
+	"""Leaf class probabilities exactly as DecisionTreeClassifier.predict_proba computes them."""
+	proba = estimator.tree_.value[:, 0, :estimator.n_classes_].astype(np.float64)
+	normalizer = proba.sum(axis=1)[:, np.newaxis]
+	normalizer[normalizer == 0.0] = 1.0
+	proba /= normalizer
+	return proba
+
+
+def _compile_forest(model):
+	from sklearn.tree import DecisionTreeClassifier
+	estimators = [model] if isinstance(model, DecisionTreeClassifier) else list(model.estimators_)
+	trees = [_sklearn_tree(est, _normalized_proba(est)) for est in estimators]
+	n_estimators = None if isinstance(model, DecisionTreeClassifier) else len(estimators)
+	return "forest", trees, {"n_estimators": n_estimators}, False
+
+
+def _compile_gradient_boosting(model):
+	init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))
+	trees = [_sklearn_tree(est, est.tree_.value[:, 0, :1].astype(np.float64)) for est in model.estimators_[:, 0]]
+	params = {"learning_rate": float(model.learning_rate), "init_raw": float(init_raw[0, 0]), "loss": model._loss}
+	return "gradient_boosting", trees, params, False
+
+
+def _compile_adaboost(model):
+	if getattr(model, "algorithm", "SAMME") == "SAMME.R":
+		raise ValueError("AdaBoost SAMME.R cannot be compiled")
+	trees = []
+	for est in model.estimators_:
+		labels = est.classes_.take(np.argmax(est.tree_.value[:, 0, :], axis=1))
+		# SAMME votes +w for the predicted class and -w / (n_classes - 1) for the other one
+		trees.append(_sklearn_tree(est, np.where(labels[:, None] == model.classes_[None, :], 1.0, -1.0)))
+	weights = np.asarray(model.estimator_weights_, dtype=np.float64)
+	params = {"estimator_weights": weights[:len(trees)], "weight_sum": weights.sum()}
+	return "adaboost", trees, params, False
+
+
+def _compile_xgboost(model):
+	booster = model.get_booster()
+	config = json.loads(booster.save_config())
+	if config["learner"]["objective"]["name"] != "binary:logistic":
+		raise ValueError("Only binary:logistic XGBoost models can be compiled")
+	dump = json.loads(booster.save_raw(raw_format="json"))
+	gbm = dump["learner"]["gradient_booster"]
+	if gbm.get("name", "gbtree") != "gbtree":
+		raise ValueError(f"XGBoost booster '{gbm.get('name')}' cannot be compiled")
+	tree_dumps = gbm["model"]["trees"]
+	try:
+		best_iteration = model.best_iteration
+	except AttributeError:
+		best_iteration = None
+	if best_iteration is not None:
+		tree_dumps = tree_dumps[:best_iteration + 1]
+
+	trees = []
+	for tree in tree_dumps:
+		if any(tree.get("split_type", [])):
+			raise ValueError("Categorical XGBoost splits cannot be compiled")
+		left = np.asarray(tree["left_children"], dtype=np.int64)
+		conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+		depth, frontier = 0, [0]
+		while frontier:
+			frontier = [child for node in frontier for child in (left[node], tree["right_children"][node]) if child >= 0]
+			depth += 1 if frontier else 0
+		trees.append({
+			"feature": np.asarray(tree["split_indices"], dtype=np.int64),
+			"threshold": conditions,
+			"left": left,
+			"right": np.asarray(tree["right_children"], dtype=np.int64),
+			"missing_left": np.asarray(tree["default_left"], dtype=bool),
+			"value": conditions[:, None],
+			"depth": depth,
+		})
+	base_score = np.float32(float(config["learner"]["learner_model_param"]["base_score"]))
+	one = np.float32(1.0)
+	params = {"base_margin": -np.log(one / base_score - one)}
+	return "xgboost", trees, params, True
+
+
+def compile_tree_model(model) -> CompiledTreeModel:
+	'''
+	Export a fitted DecisionTree, RandomForest, GradientBoosting, AdaBoost or
+	XGBoost binary classifier to a CompiledTreeModel. Raises for anything else.
+	'''
+	try:
+		from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier
+		from sklearn.tree import DecisionTreeClassifier
+
+		if len(getattr(model, "classes_", ())) != 2:
+			raise ValueError("Only binary classifiers can be compiled")
+		if isinstance(model, (DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier)):
+			kind, trees, params, strict_less = _compile_forest(model)
+		elif isinstance(model, GradientBoostingClassifier):
+			kind, trees, params, strict_less = _compile_gradient_boosting(model)
+		elif isinstance(model, AdaBoostClassifier):
+			kind, trees, params, strict_less = _compile_adaboost(model)
+		elif type(model).__name__ == "XGBClassifier":
+			kind, trees, params, strict_less = _compile_xgboost(model)
+		else:
+			raise ValueError(f"{type(model).__name__} is not a supported tree model")
+
+		return CompiledTreeModel(kind=kind, n_features=model.n_features_in_, classes=model.classes_, params=params,
+			strict_less=strict_less, missing_from_sparse=kind == "xgboost", **_flatten(trees))
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def compile_model(model, X_check=None):
+	'''
+	Compile `model` (or each member of an EnsembleModel) where possible.
+	With X_check, a compiled model is only used if its predict_proba on
+	X_check equals the original's exactly; otherwise the original is kept.
+	'''
+	from src.components.ensemble import EnsembleModel
+	from src.components.dense_input import DenseInputClassifier
+
+	if isinstance(model, EnsembleModel):
+		compiled = copy.copy(model)
+		compiled.members = [(name, compile_model(member, X_check)) for name, member in model.members]
+		return compiled
+	if isinstance(model, DenseInputClassifier):
+		inner = compile_model(model.estimator_, X_check.toarray() if sparse.issparse(X_check) else X_check)
+		if not isinstance(inner, CompiledTreeModel):
+			return model
+		# trained on dense rows: an entry absent from a CSR matrix is 0 here, not missing
+		inner.missing_from_sparse = False
+		return inner
+
+	try:
+		compiled = compile_tree_model(model)
+	except CustomException as e:
+		logging.info(f"Model not compiled: {e}")
+		return model
+	if X_check is not None:
+		expected = model.predict_proba(X_check)
+		actual = compiled.predict_proba(X_check)
+		if expected.shape != actual.shape or not np.array_equal(expected, actual):
+			logging.info(f"Compiled {type(model).__name__} differs from predict_proba, keeping the original")
+			return model
+	logging.info(f"Compiled {type(model).__name__}: {compiled.n_trees} trees, {compiled.nbytes / 2**20:.1f} MiB of node arrays")
+	return compiled
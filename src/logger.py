@@ -1,18 +1,168 @@
 import logging
-import os 
+import logging.handlers
+import os
+import json
+import time
+import queue
+import atexit
+import random
 from datetime import datetime
 
-LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
+# Records are put on a bounded in-memory queue by the calling thread and
+# written to disk by a background listener thread, so request handlers never
+# wait on file I/O. Settings come from the environment:
+#   LOG_DIR, LOG_FILE           where to write (default logs/app.log); a forked worker writes
+#                               its own app.<pid>.log, rotating handlers are not multi-process safe
+#   LOG_ROTATION                internal (default) or external, for logrotate: reopen the file
+#                               when it is moved instead of rotating it here
+#   LOG_LEVEL                   default INFO
+#   LOG_FORMAT                  json (default) or text
+#   LOG_MAX_BYTES               rotate when the file grows past this size (default 50 MiB, 0 disables)
+#   LOG_ROTATE_SECONDS          rotate at least this often (default 86400, 0 disables)
+#   LOG_BACKUP_COUNT            rotated files to keep (default 7)
+#   LOG_QUEUE_SIZE              records buffered before new ones are dropped (default 10000)
+#   LOG_INFERENCE_SAMPLE_RATE   fraction of per-prediction records kept (default 0.01)
+LOG_DIR=os.environ.get("LOG_DIR",os.path.join(os.getcwd(),"logs"))
+LOG_FILE=os.environ.get("LOG_FILE","app.log")
+os.makedirs(LOG_DIR,exist_ok=True)
 
+LOG_FILE_PATH=os.path.join(LOG_DIR,LOG_FILE)
 
-LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
+TEXT_FORMAT="[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES=set(vars(logging.LogRecord("",0,"",0,"",None,None)))|{"message","asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any `extra` fields."""
+    def format(self, record):
+        entry={
+            "time":datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level":record.levelname,
+            "logger":record.name,
+            "line":record.lineno,
+            "message":record.getMessage(),
+        }
+        for key,value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key]=value
+        if record.exc_text:
+            entry["exception"]=record.exc_text
+        return json.dumps(entry,default=str)
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Numbered rotation (app.log.1, app.log.2, ...) on size or age, whichever comes first."""
+    def __init__(self, filename, maxBytes=0, interval=0, backupCount=0, encoding=None):
+        super().__init__(filename,maxBytes=maxBytes,backupCount=backupCount,encoding=encoding,delay=True)
+        self.interval=interval
+        self.rollover_at=time.time()+interval if interval else None
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and time.time()>=self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval:
+            self.rollover_at=time.time()+self.interval
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the writer falls behind."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped=0
+
+    def prepare(self, record):
+        # resolve the message now, the arguments may change once the call returns;
+        # formatting into the final layout is left to the writer thread
+        record.message=record.getMessage()
+        record.msg=record.message
+        record.args=None
+        if record.exc_info:
+            record.exc_text=logging.Formatter().formatException(record.exc_info)
+            record.exc_info=None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped+=1
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random `rate` fraction of records; WARNING and above always pass."""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate=rate
+
+    def filter(self, record):
+        return record.levelno>=logging.WARNING or random.random()<self.rate
+
+
+def _process_log_path(pid):
+    """logs/app.log -> logs/app.<pid>.log"""
+    root,ext=os.path.splitext(LOG_FILE_PATH)
+    return f"{root}.{pid}{ext}"
+
+
+def _file_handler(path=LOG_FILE_PATH):
+    if os.environ.get("LOG_ROTATION","internal")=="external":
+        handler=logging.handlers.WatchedFileHandler(path,encoding="utf-8",delay=True)
+    else:
+        handler=SizeAndTimeRotatingFileHandler(
+            path,
+            maxBytes=int(os.environ.get("LOG_MAX_BYTES",50*2**20)),
+            interval=float(os.environ.get("LOG_ROTATE_SECONDS",86400)),
+            backupCount=int(os.environ.get("LOG_BACKUP_COUNT",7)),
+            encoding="utf-8",
+        )
+    if os.environ.get("LOG_FORMAT","json")=="text":
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+log_queue=queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE",10000)))
+queue_handler=NonBlockingQueueHandler(log_queue)
+file_handler=_file_handler()
+listener=logging.handlers.QueueListener(log_queue,file_handler,respect_handler_level=True)
 
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO
+    handlers=[queue_handler],
+    level=os.environ.get("LOG_LEVEL","INFO").upper()
 
 )
 
+# high-volume per-prediction records, sampled before they reach the queue
+inference_logger=logging.getLogger("inference")
+inference_logger.addFilter(SamplingFilter(float(os.environ.get("LOG_INFERENCE_SAMPLE_RATE",0.01))))
+
+
+def _restart_listener():
+    # the writer thread does not survive fork (gunicorn --preload); give the child its own
+    # and a fresh queue, the parent's may have been locked by its writer at fork time.
+    # Workers sharing one rotating file would rename it under each other, so each gets its own.
+    global log_queue,listener,file_handler
+    log_queue=queue.Queue(maxsize=log_queue.maxsize)
+    queue_handler.queue=log_queue
+    file_handler=_file_handler(_process_log_path(os.getpid()))
+    listener=logging.handlers.QueueListener(log_queue,file_handler,respect_handler_level=True)
+    listener.start()
+
+
+def flush_logs():
+    """Write out everything queued so far and stop the writer thread."""
+    if listener._thread is not None:
+        listener.stop()
+    file_handler.flush()
+
+
+listener.start()
+os.register_at_fork(after_in_child=_restart_listener)
+atexit.register(flush_logs)
@@ -0,0 +1,141 @@
+import os
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# latency buckets in seconds, from 0.1 ms to 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# set while synthetic traffic (warm-up) runs, so it stays out of the served-traffic series
+_paused = contextvars.ContextVar("metrics_paused", default=False)
+
+
+class Histogram:
+	def __init__(self, buckets=DEFAULT_BUCKETS):
+		self.buckets = tuple(buckets)
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.total = 0.0
+		self.count = 0
+		self._lock = threading.Lock()
+
+	def observe(self, value: float):
+		idx = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			self.counts[idx] += 1
+			self.total += value
+			self.count += 1
+
+	def snapshot(self):
+		with self._lock:
+			return list(self.counts), self.total, self.count
+
+
+def _format_labels(labels: tuple, extra: str=None) -> str:
+	parts = [f'{key}="{value}"' for key, value in labels]
+	if extra:
+		parts.append(extra)
+	return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+	'''
+	In-process latency histograms and counters rendered in the Prometheus text
+	format. Recording is a bisect plus a short lock, cheap enough to leave on
+	in production; set METRICS_ENABLED=0 to turn it off.
+	'''
+	def __init__(self, enabled: bool=True):
+		self.enabled = enabled
+		self._histograms = {}
+		self._counters = {}
+		self._lock = threading.Lock()
+
+	def _histogram(self, name: str, labels: tuple) -> Histogram:
+		key = (name, labels)
+		histogram = self._histograms.get(key)
+		if histogram is None:
+			with self._lock:
+				histogram = self._histograms.setdefault(key, Histogram())
+		return histogram
+
+	def _recording(self) -> bool:
+		return self.enabled and not _paused.get()
+
+	@contextmanager
+	def paused(self):
+		"""Record nothing from the enclosed block (in this thread or context)."""
+		token = _paused.set(True)
+		try:
+			yield
+		finally:
+			_paused.reset(token)
+
+	def observe(self, name: str, value: float, **labels):
+		if self._recording():
+			self._histogram(name, tuple(sorted(labels.items()))).observe(value)
+
+	def inc(self, name: str, value: float=1, **labels):
+		if not self._recording():
+			return
+		key = (name, tuple(sorted(labels.items())))
+		with self._lock:
+			self._counters[key] = self._counters.get(key, 0) + value
+
+	@contextmanager
+	def span(self, stage: str, **labels):
+		"""Time the enclosed block into stage_latency_seconds{stage=..., **labels}."""
+		if not self._recording():
+			yield
+			return
+		key = tuple(sorted({**labels, "stage": stage}.items()))
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self._histogram("stage_latency_seconds", key).observe(time.perf_counter() - start)
+
+	def render(self, gauges: dict=None, counters: dict=None) -> str:
+		'''
+		Prometheus text for the recorded series plus externally held values:
+		`gauges` are current levels, `counters` cumulative totals kept elsewhere
+		(e.g. by the prediction cache).
+		'''
+		lines = []
+		with self._lock:
+			histograms = sorted(self._histograms.items())
+			recorded = sorted(self._counters.items())
+
+		typed = set()
+		for (name, labels), histogram in histograms:
+			if name not in typed:
+				lines.append(f"# TYPE {name} histogram")
+				typed.add(name)
+			counts, total, count = histogram.snapshot()
+			cumulative = 0
+			for bound, bucket_count in zip(histogram.buckets, counts):
+				cumulative += bucket_count
+				le = 'le="%s"' % bound
+				lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+			le = 'le="+Inf"'
+			lines.append(f"{name}_bucket{_format_labels(labels, le)} {count}")
+			lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+			lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+		for (name, labels), value in recorded:
+			if name not in typed:
+				lines.append(f"# TYPE {name} counter")
+				typed.add(name)
+			lines.append(f"{name}{_format_labels(labels)} {value}")
+
+		for kind, values in (("counter", counters), ("gauge", gauges)):
+			for name, value in sorted((values or {}).items()):
+				if value is None:
+					continue
+				lines.append(f"# TYPE {name} {kind}")
+				lines.append(f"{name} {float(value)}")
+		return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.environ.get("METRICS_ENABLED", "1") != "0")
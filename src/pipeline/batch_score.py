@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import iter_dataset_chunks, ChunkWriter, PARQUET_EXTENSIONS
+
+
+_worker_pipeline = None
+
+
+def score_chunk(chunk: pd.DataFrame, keep_columns: list=None) -> pd.DataFrame:
+	"""Score one chunk with the process-local PredictPipeline and append the results."""
+	global _worker_pipeline
+	if _worker_pipeline is None:
+		_worker_pipeline = PredictPipeline()
+	labels, probabilities = _worker_pipeline.predict_batch(chunk, chunk_size=max(len(chunk), 1))
+	out = chunk[keep_columns].copy() if keep_columns else chunk
+	out['prediction'] = labels
+	if probabilities is not None:
+		out['probability'] = probabilities
+	return out
+
+
+def _label_type(model):
+	"""pyarrow type of the model's predicted labels, taken from classes_."""
+	import pyarrow as pa
+	kind = np.asarray(getattr(model, 'classes_', [0, 1])).dtype.kind
+	if kind in 'iub':
+		return pa.int64()
+	return pa.float64() if kind == 'f' else pa.string()
+
+
+def output_schema(input_path: str, chunk_size: int, keep_columns: list=None, column_types: dict=None,
+		label_type=None, with_probability: bool=True):
+	'''
+	Parquet schema of the scored output, fixed before the first chunk is
+	scored. Input columns come from the Parquet/Feather file's own schema, or
+	for a CSV from its first `chunk_size` rows (numeric or entirely missing
+	columns float64, the rest strings). Integer columns are widened to
+	float64, since a later chunk may hold missing values. `column_types`
+	({column: "float64" | "string" | "int64" | ...}) overrides any column;
+	prediction (`label_type`, int64 by default) and probability follow.
+	'''
+	import pyarrow as pa
+	lower = input_path.lower()
+	if lower.endswith(PARQUET_EXTENSIONS):
+		import pyarrow.parquet as pq
+		fields = list(pq.read_schema(input_path))
+	elif lower.endswith('.feather'):
+		import pyarrow.feather as feather
+		fields = list(feather.read_table(input_path, memory_map=True).schema)
+	else:
+		first = pd.read_csv(input_path, nrows=chunk_size)
+		fields = [pa.field(col, pa.float64() if pd.api.types.is_numeric_dtype(first[col]) or first[col].isna().all() else pa.string())
+			for col in first.columns]
+
+	types = {}
+	for field in fields:
+		if field.name.startswith('__index_level_'):
+			# a pandas index stored in the file, read back as the index and not scored
+			continue
+		if pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_decimal(field.type):
+			types[field.name] = pa.float64()
+		elif pa.types.is_large_string(field.type):
+			types[field.name] = pa.string()
+		else:
+			types[field.name] = field.type
+	if keep_columns:
+		types = {col: types[col] for col in keep_columns}
+	for col, kind in (column_types or {}).items():
+		types[col] = pa.type_for_alias(kind) if isinstance(kind, str) else kind
+
+	schema = [pa.field(col, kind) for col, kind in types.items() if col not in ('prediction', 'probability')]
+	schema.append(pa.field('prediction', label_type if label_type is not None else pa.int64()))
+	if with_probability:
+		schema.append(pa.field('probability', pa.float64()))
+	return pa.schema(schema)
+
+
+def conform_chunk(df: pd.DataFrame, schema) -> pd.DataFrame:
+	"""Cast a scored chunk to `schema`: floats for float64 columns, str values (missing kept) for strings."""
+	import pyarrow as pa
+	for field in schema:
+		values = df[field.name]
+		if pa.types.is_floating(field.type):
+			df[field.name] = values.astype('float64')
+		elif pa.types.is_string(field.type):
+			values = values.astype(object).where(values.notna(), None)
+			df[field.name] = values.where(values.isna(), values.astype(str))
+	return df
+
+
+def run_batch_scoring(input_path: str, output_path: str, chunk_size: int=50000, workers: int=1, keep_columns: list=None,
+		column_types: dict=None) -> dict:
+	'''
+	Stream `input_path` through PredictPipeline in bounded chunks and write the
+	scored rows to `output_path` (.csv or .parquet). With workers > 1 chunks are
+	scored in a process pool; at most 2 * workers chunks are in flight and
+	results are written in input order. A Parquet output's schema is fixed up
+	front by output_schema, so a later chunk with missing values or a column
+	that was empty so far still fits it.
+	'''
+	try:
+		start = time.perf_counter()
+		schema = None
+		if output_path.lower().endswith(PARQUET_EXTENSIONS):
+			model = PredictPipeline().registry.get().model
+			schema = output_schema(input_path, chunk_size, keep_columns, column_types,
+				label_type=_label_type(model), with_probability=hasattr(model, 'predict_proba'))
+		writer = ChunkWriter(output_path, schema=schema)
+
+		def write(scored):
+			writer.write(conform_chunk(scored, schema) if schema is not None else scored)
+
+		try:
+			if workers <= 1:
+				for chunk in iter_dataset_chunks(input_path, chunk_size):
+					write(score_chunk(chunk, keep_columns))
+			else:
+				max_in_flight = workers * 2
+				pending = deque()
+				with ProcessPoolExecutor(max_workers=workers) as executor:
+					for chunk in iter_dataset_chunks(input_path, chunk_size):
+						pending.append(executor.submit(score_chunk, chunk, keep_columns))
+						if len(pending) >= max_in_flight:
+							write(pending.popleft().result())
+					while pending:
+						write(pending.popleft().result())
+		finally:
+			writer.close()
+
+		elapsed = time.perf_counter() - start
+		summary = {
+			'rows': writer.rows_written,
+			'seconds': elapsed,
+			'rows_per_second': writer.rows_written / elapsed if elapsed > 0 else None,
+			'output_path': output_path,
+		}
+		logging.info(f"Batch scoring finished: {summary}")
+		return summary
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Score a CSV/Parquet lead file in streaming chunks.")
+	parser.add_argument("input_path", help="input .csv or .parquet file")
+	parser.add_argument("output_path", help="output .csv or .parquet file")
+	parser.add_argument("--chunk-size", type=int, default=50000, help="rows per chunk (default: 50000)")
+	parser.add_argument("--workers", type=int, default=1, help="scoring processes (default: 1)")
+	parser.add_argument("--keep-columns", default=None,
+		help="comma-separated input columns to copy to the output (default: all)")
+	args = parser.parse_args(argv)
+
+	keep_columns = args.keep_columns.split(',') if args.keep_columns else None
+	summary = run_batch_scoring(args.input_path, args.output_path, chunk_size=args.chunk_size,
+		workers=args.workers, keep_columns=keep_columns)
+	print(summary)
+
+
+if __name__ == "__main__":
+	main()
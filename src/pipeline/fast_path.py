@@ -0,0 +1,186 @@
+import sys
+import threading
+
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+def _is_missing(value) -> bool:
+	return value is None or (isinstance(value, float) and value != value)
+
+
+class _NumericBlock:
+	"""SimpleImputer -> StandardScaler on numeric columns, flattened to vectors."""
+	def __init__(self, columns, fill, mean, scale):
+		self.columns = columns
+		self.width = len(columns)
+		self.fill = fill
+		self.mean = mean
+		self.scale = scale
+
+	def apply(self, record: dict, out: np.ndarray, offset: int):
+		values = out[offset:offset + self.width]
+		for i, col in enumerate(self.columns):
+			value = record[col]
+			values[i] = self.fill[i] if _is_missing(value) else value
+		# same in-place float64 operations as StandardScaler.transform on dense input
+		if self.mean is not None:
+			values -= self.mean
+		if self.scale is not None:
+			values /= self.scale
+
+
+class _OneHotBlock:
+	"""SimpleImputer(most_frequent) -> OneHotEncoder -> StandardScaler(with_mean=False)."""
+	def __init__(self, columns, fill, index_maps, hot, width):
+		self.columns = columns
+		self.fill = fill
+		# per input column: category -> output index relative to the block start
+		self.index_maps = index_maps
+		# output value of each hot cell (1 scaled by its column scale)
+		self.hot = hot
+		self.width = width
+
+	def apply(self, record: dict, out: np.ndarray, offset: int):
+		out[offset:offset + self.width] = 0.0
+		for i, col in enumerate(self.columns):
+			value = record[col]
+			if _is_missing(value):
+				value = self.fill[i]
+			idx = self.index_maps[i].get(value)
+			# unknown categories and the dropped first category encode as all zeros
+			if idx is not None:
+				out[offset + idx] = self.hot[idx]
+
+
+class CompiledPreprocessor:
+	'''
+	Flat, pandas-free replay of a fitted ColumnTransformer built by
+	DataTransformation.get_data_transformer_object. Imputation values,
+	category index maps and scale vectors are precomputed so one record
+	(a plain dict) is written straight into a preallocated float64 row.
+	The output equals preprocessor.transform(...) densified, bit for bit.
+	'''
+	def __init__(self, blocks, n_features_out: int):
+		self.blocks = blocks
+		self.n_features_out = n_features_out
+
+	@staticmethod
+	def _steps(transformer):
+		if isinstance(transformer, Pipeline):
+			return [step for _, step in transformer.steps]
+		return [transformer]
+
+	@classmethod
+	def _compile_block(cls, transformer, columns):
+		steps = cls._steps(transformer)
+		if not all(isinstance(col, str) for col in columns):
+			raise ValueError("Only string column selections can be compiled")
+
+		fill = None
+		if steps and isinstance(steps[0], SimpleImputer):
+			imputer = steps.pop(0)
+			if not _is_missing(imputer.missing_values) or getattr(imputer, "add_indicator", False):
+				raise ValueError("Only NaN-imputers without indicators can be compiled")
+			fill = list(imputer.statistics_)
+			if any(_is_missing(v) for v in fill):
+				raise ValueError("Imputer dropped an all-missing column")
+
+		if steps and isinstance(steps[0], OneHotEncoder):
+			encoder = steps.pop(0)
+			if getattr(encoder, "_infrequent_enabled", False):
+				raise ValueError("Infrequent-category grouping cannot be compiled")
+			sparse = getattr(encoder, "sparse_output", getattr(encoder, "sparse", True))
+			drop_idx = encoder.drop_idx_
+			index_maps = []
+			width = 0
+			for i, categories in enumerate(encoder.categories_):
+				dropped = None if drop_idx is None else drop_idx[i]
+				mapping = {}
+				for j, category in enumerate(categories):
+					if dropped is not None and j == dropped:
+						continue
+					mapping[category] = width
+					width += 1
+				index_maps.append(mapping)
+
+			hot = np.ones(width, dtype=np.float64)
+			if steps and isinstance(steps[0], StandardScaler):
+				scaler = steps.pop(0)
+				if scaler.with_mean:
+					raise ValueError("Centering a one-hot block cannot be compiled")
+				if scaler.scale_ is not None:
+					# sparse input is scaled by multiplying with 1/scale, dense by dividing
+					hot = hot * (1.0 / scaler.scale_) if sparse else hot / scaler.scale_
+			if steps:
+				raise ValueError(f"Unsupported step after OneHotEncoder: {steps[0]!r}")
+			if fill is None:
+				fill = [None] * len(columns)
+			return _OneHotBlock(list(columns), fill, index_maps, hot, width)
+
+		mean = scale = None
+		if steps and isinstance(steps[0], StandardScaler):
+			scaler = steps.pop(0)
+			mean = scaler.mean_ if scaler.with_mean else None
+			scale = scaler.scale_ if scaler.with_std else None
+		if steps:
+			raise ValueError(f"Unsupported numeric step: {steps[0]!r}")
+		if fill is None:
+			fill = [np.nan] * len(columns)
+		return _NumericBlock(list(columns), np.asarray(fill, dtype=np.float64), mean, scale)
+
+	@classmethod
+	def from_column_transformer(cls, preprocessor):
+		try:
+			blocks = []
+			for name, transformer, columns in preprocessor.transformers_:
+				if (isinstance(transformer, str) and transformer == "drop") or len(columns) == 0:
+					continue
+				if isinstance(transformer, str):
+					raise ValueError(f"Passthrough block '{name}' cannot be compiled")
+				blocks.append(cls._compile_block(transformer, columns))
+			n_features_out = sum(block.width for block in blocks)
+			return cls(blocks, n_features_out)
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def transform_record(self, record: dict) -> np.ndarray:
+		"""Transform one raw (feature-engineered) record into a (1, n_features_out) array."""
+		out = np.empty((1, self.n_features_out), dtype=np.float64)
+		row = out[0]
+		offset = 0
+		for block in self.blocks:
+			block.apply(record, row, offset)
+			offset += block.width
+		return out
+
+
+_compiled_cache = {}
+_compiled_cache_lock = threading.Lock()
+
+
+def get_compiled_preprocessor(artifacts):
+	'''
+	Compile (once per artifact version) the preprocessor held by a
+	LoadedArtifacts. Returns None if it uses steps the plan cannot express,
+	so callers can fall back to preprocessor.transform.
+	'''
+	cached = _compiled_cache.get(artifacts.version)
+	if cached is not None or artifacts.version in _compiled_cache:
+		return cached
+	with _compiled_cache_lock:
+		if artifacts.version not in _compiled_cache:
+			try:
+				compiled = CompiledPreprocessor.from_column_transformer(artifacts.preprocessor)
+			except CustomException as e:
+				logging.info(f"Preprocessor not compilable, using ColumnTransformer: {e}")
+				compiled = None
+			_compiled_cache.clear()
+			_compiled_cache[artifacts.version] = compiled
+		return _compiled_cache[artifacts.version]
@@ -0,0 +1,116 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.logger import logging
+from src.metrics import metrics
+from src.components.ensemble import request_deadline
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@dataclass
+class MicroBatcherConfig:
+	max_batch_size: int = int(os.environ.get("MICROBATCH_MAX_SIZE", 256))
+	# how long the first request of a batch waits for others to join
+	max_wait_ms: float = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", 3.0))
+
+
+class MicroBatcher:
+	'''
+	Collects single-customer prediction requests from concurrent callers into
+	micro-batches. A background thread waits at most max_wait_ms after the
+	first queued request (or until max_batch_size requests arrived), runs one
+	vectorized PredictPipeline call and resolves each caller's future.
+	A batch of one goes through the compiled single-row fast path instead.
+	Each request carries the caller's request_deadline; a batch is scored
+	under the earliest deadline among its requests.
+	'''
+	def __init__(self, pipeline: PredictPipeline=None, config: MicroBatcherConfig=None):
+		self.pipeline = pipeline or PredictPipeline()
+		self.config = config or MicroBatcherConfig()
+		self._queue = queue.Queue()
+		self._closed = False
+		self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+		self._thread.start()
+
+	def submit(self, record: dict) -> Future:
+		if self._closed:
+			raise RuntimeError("MicroBatcher is closed")
+		future = Future()
+		self._queue.put((record, future, request_deadline.get()))
+		return future
+
+	def predict(self, record: dict, timeout: float=None):
+		"""Block until the batch containing `record` has been scored; returns its label."""
+		return self.submit(record).result(timeout=timeout)
+
+	def _collect(self):
+		first = self._queue.get()
+		if first is None:
+			return None
+		batch = [first]
+		deadline = time.monotonic() + self.config.max_wait_ms / 1000.0
+		while len(batch) < self.config.max_batch_size:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			try:
+				item = self._queue.get(timeout=remaining)
+			except queue.Empty:
+				break
+			if item is None:
+				# re-queue the shutdown marker so the loop exits after this batch
+				self._queue.put(None)
+				break
+			batch.append(item)
+		return batch
+
+	def _score(self, records: list):
+		if len(records) == 1:
+			return self.pipeline.predict_record(records[0])
+		return self.pipeline.predict(pd.DataFrame.from_records(records))
+
+	def _run(self):
+		while True:
+			batch = self._collect()
+			if batch is None:
+				return
+			futures = [future for _, future, _ in batch]
+			deadlines = [deadline for _, _, deadline in batch if deadline is not None]
+			token = request_deadline.set(min(deadlines) if deadlines else None)
+			try:
+				labels = self._score([record for record, _, _ in batch])
+				for future, label in zip(futures, labels):
+					future.set_result(label)
+			except Exception as e:
+				logging.info(f"Micro-batch of {len(batch)} failed: {e}")
+				for future in futures:
+					future.set_exception(e)
+			finally:
+				request_deadline.reset(token)
+			metrics.inc("microbatch_batches_total")
+			metrics.inc("microbatch_requests_total", len(batch))
+
+	def close(self):
+		self._closed = True
+		self._queue.put(None)
+		self._thread.join()
+
+
+_default_batcher = None
+_default_batcher_lock = threading.Lock()
+
+
+def get_micro_batcher() -> MicroBatcher:
+	"""Per-process batcher, created lazily so it starts after a pre-forking server forks."""
+	global _default_batcher
+	if _default_batcher is None:
+		with _default_batcher_lock:
+			if _default_batcher is None:
+				_default_batcher = MicroBatcher()
+	return _default_batcher
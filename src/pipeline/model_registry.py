@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import load_object, file_sha256, is_artifact, ARTIFACT_MANIFEST
+from src.components.feature_engineering import load_feature_engineer
+
+
+@dataclass
+class ModelRegistryConfig:
+	model_path: str = os.path.join("artifacts", "model.pkl")
+	preprocessor_path: str = os.path.join("artifacts", "preprocessor.pkl")
+	# mmap-able artifact directories, used instead of the dill pickles when present
+	model_artifact_path: str = os.path.join("artifacts", "model_artifact")
+	preprocessor_artifact_path: str = os.path.join("artifacts", "preprocessor_artifact")
+	prefer_artifacts: bool = True
+	# fitted FeatureEngineer saved with the preprocessor
+	feature_engineer_path: str = os.path.join("artifacts", "features.pkl")
+	# optional customer segmentation outputs, served alongside the model
+	segmenter_path: str = os.path.join("artifacts", "segmenter.pkl")
+	segmenter_meta_path: str = os.path.join("artifacts", "segmenter_meta.json")
+	# training copies the model, preprocessor and feature engineering into releases/<id>/ and then
+	# rewrites this pointer; once it exists only the pointer is watched and the loose files are ignored
+	release_pointer_path: str = os.path.join("artifacts", "release.json")
+	releases_dir: str = os.path.join("artifacts", "releases")
+	keep_releases: int = 3
+	# 'mtime' compares (mtime, size) of each file, 'hash' compares their sha256
+	change_detection: str = "mtime"
+	# how often (seconds) the artifact files are re-checked for changes
+	check_interval_seconds: float = 1.0
+
+
+@dataclass(frozen=True)
+class LoadedArtifacts:
+	model: object
+	preprocessor: object
+	version: str
+	loaded_at: float
+	segmenter: object = None
+	segment_meta: dict = None
+	feature_engineer: object = None
+
+
+class ModelRegistry:
+	'''
+	Process-resident holder for the trained model, preprocessor and (if
+	trained) the customer segmenter.
+	Artifacts are loaded once and swapped in as a single object when they
+	change on disk. With a published release (publish_release) the model,
+	preprocessor and feature engineering come from one immutable directory
+	and are reloaded only when release.json names another, so a model is
+	never paired with a preprocessor from a different training run. Loose
+	files in artifacts/ are watched only when nothing has been published.
+	'''
+	def __init__(self, config: ModelRegistryConfig=None):
+		self.config = config or ModelRegistryConfig()
+		self._lock = threading.Lock()
+		self._current = None
+		self._signature = None
+		self._last_check = 0.0
+		self.load_count = 0
+		self.last_load_seconds = 0.0
+		self.total_load_seconds = 0.0
+		self.get_count = 0
+
+	def _release(self) -> str:
+		"""Id of the published release, or None when serving loose files."""
+		if not os.path.exists(self.config.release_pointer_path):
+			return None
+		with open(self.config.release_pointer_path, "r", encoding="utf-8") as f:
+			return json.load(f)["release"]
+
+	def _in_release(self, release: str, path: str) -> str:
+		if release is None:
+			return path
+		return os.path.join(self.config.releases_dir, release, os.path.basename(path))
+
+	def _resolve(self, release: str, pickle_path: str, artifact_path: str) -> str:
+		artifact_path = self._in_release(release, artifact_path)
+		if self.config.prefer_artifacts and is_artifact(artifact_path):
+			return artifact_path
+		return self._in_release(release, pickle_path)
+
+	def _model_path(self, release: str) -> str:
+		return self._resolve(release, self.config.model_path, self.config.model_artifact_path)
+
+	def _preprocessor_path(self, release: str) -> str:
+		return self._resolve(release, self.config.preprocessor_path, self.config.preprocessor_artifact_path)
+
+	def _file_signature(self, path: str) -> str:
+		# an artifact directory changes when its manifest (written last) changes
+		if os.path.isdir(path):
+			path = os.path.join(path, ARTIFACT_MANIFEST)
+		if self.config.change_detection == "hash":
+			return file_sha256(path)
+		stat = os.stat(path)
+		return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+	def _optional_signature(self, path: str) -> str:
+		return self._file_signature(path) if os.path.exists(path) else "missing"
+
+	def _current_signature(self) -> tuple:
+		"""(release, model/preprocessor/features signature, segmenter, segmenter meta)"""
+		release = self._release()
+		if release is not None:
+			# a release directory never changes, its id is the whole signature
+			core = f"release:{release}"
+		else:
+			core = "|".join([
+				self._file_signature(self._model_path(None)),
+				self._file_signature(self._preprocessor_path(None)),
+				self._optional_signature(self.config.feature_engineer_path),
+			])
+		return (
+			release,
+			core,
+			self._optional_signature(self.config.segmenter_path),
+			self._optional_signature(self.config.segmenter_meta_path),
+		)
+
+	def _load(self, signature: tuple):
+		start = time.perf_counter()
+		release = signature[0]
+		model = load_object(file_path=self._model_path(release))
+		preprocessor = load_object(file_path=self._preprocessor_path(release))
+		feature_engineer = load_feature_engineer(self._in_release(release, self.config.feature_engineer_path))
+		segmenter = segment_meta = None
+		if os.path.exists(self.config.segmenter_path):
+			segmenter = load_object(file_path=self.config.segmenter_path)
+		if os.path.exists(self.config.segmenter_meta_path):
+			with open(self.config.segmenter_meta_path, "r", encoding="utf-8") as f:
+				segment_meta = json.load(f)
+		elapsed = time.perf_counter() - start
+
+		# the version tracks the model, preprocessor and feature engineering only,
+		# so cached predictions survive a segmenter retrain
+		version = hashlib.sha1(signature[1].encode("utf-8")).hexdigest()[:12]
+		self._current = LoadedArtifacts(model=model, preprocessor=preprocessor, version=version, loaded_at=time.time(),
+			segmenter=segmenter, segment_meta=segment_meta, feature_engineer=feature_engineer)
+		self._signature = signature
+		self.load_count += 1
+		self.last_load_seconds = elapsed
+		self.total_load_seconds += elapsed
+		logging.info(f"Model registry loaded artifacts version {version} in {elapsed:.3f}s (load #{self.load_count})")
+
+	def get(self) -> LoadedArtifacts:
+		try:
+			self.get_count += 1
+			current = self._current
+			now = time.monotonic()
+			if current is not None and now - self._last_check < self.config.check_interval_seconds:
+				return current
+
+			with self._lock:
+				if self._current is not None and now - self._last_check < self.config.check_interval_seconds:
+					return self._current
+				try:
+					signature = self._current_signature()
+					if self._current is None or signature != self._signature:
+						self._load(signature)
+				except Exception as e:
+					# keep serving the previous version if a reload fails mid-write
+					if self._current is None:
+						raise
+					logging.info(f"Model registry reload failed, keeping version {self._current.version}: {e}")
+				self._last_check = now
+				return self._current
+
+		except Exception as e:
+			raise CustomException(e, sys)
+
+	def stats(self) -> dict:
+		current = self._current
+		return {
+			"version": current.version if current else None,
+			"loaded_at": current.loaded_at if current else None,
+			"load_count": self.load_count,
+			"last_load_seconds": self.last_load_seconds,
+			"total_load_seconds": self.total_load_seconds,
+			"get_count": self.get_count,
+		}
+
+
+def _content_id(path: str) -> str:
+	# an artifact directory is identified by its manifest, which holds the payload checksum
+	if os.path.isdir(path):
+		path = os.path.join(path, ARTIFACT_MANIFEST)
+	return file_sha256(path)
+
+
+def publish_release(config: ModelRegistryConfig=None) -> str:
+	'''
+	Copy the model, preprocessor and feature engineering written by the last
+	training run into releases/<id>/, then point release.json at it. The
+	directory is complete before it is renamed into place and the pointer is
+	replaced atomically last, so serving switches to the new pair in one
+	step. The id hashes the contents; the newest keep_releases releases are
+	kept. Returns the id.
+	'''
+	try:
+		config = config or ModelRegistryConfig()
+		sources = [config.model_path, config.preprocessor_path, config.feature_engineer_path,
+			config.model_artifact_path, config.preprocessor_artifact_path]
+		sources = [path for path in sources if os.path.exists(path)]
+		for required in (config.model_path, config.preprocessor_path):
+			if required not in sources:
+				raise FileNotFoundError(f"Cannot publish a release without {required}")
+
+		digest = hashlib.sha1()
+		for path in sources:
+			digest.update(f"{os.path.basename(path)}:{_content_id(path)}".encode("utf-8"))
+		release = digest.hexdigest()[:16]
+
+		release_dir = os.path.join(config.releases_dir, release)
+		if not os.path.isdir(release_dir):
+			os.makedirs(config.releases_dir, exist_ok=True)
+			tmp_dir = tempfile.mkdtemp(dir=config.releases_dir, prefix=".tmp-")
+			try:
+				# copies, not links: save_object rewrites the loose files in place
+				for path in sources:
+					target = os.path.join(tmp_dir, os.path.basename(path))
+					if os.path.isdir(path):
+						shutil.copytree(path, target)
+					else:
+						shutil.copy2(path, target)
+				os.replace(tmp_dir, release_dir)
+			except Exception:
+				shutil.rmtree(tmp_dir, ignore_errors=True)
+				raise
+
+		pointer_dir = os.path.dirname(os.path.abspath(config.release_pointer_path))
+		fd, tmp_pointer = tempfile.mkstemp(dir=pointer_dir, prefix=".release-")
+		with os.fdopen(fd, "w", encoding="utf-8") as f:
+			json.dump({"release": release, "published_at": time.time()}, f)
+		os.replace(tmp_pointer, config.release_pointer_path)
+		logging.info(f"Published release {release}")
+
+		releases = sorted(
+			(name for name in os.listdir(config.releases_dir) if not name.startswith(".")),
+			key=lambda name: os.path.getmtime(os.path.join(config.releases_dir, name)),
+		)
+		for name in releases[:-config.keep_releases or None]:
+			if name != release:
+				shutil.rmtree(os.path.join(config.releases_dir, name), ignore_errors=True)
+		return release
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+	"""Return the registry shared by every PredictPipeline in this process."""
+	global _default_registry
+	if _default_registry is None:
+		with _default_registry_lock:
+			if _default_registry is None:
+				_default_registry = ModelRegistry()
+	return _default_registry
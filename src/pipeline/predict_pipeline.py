@@ -1,36 +1,216 @@
 import sys
+import numpy as np
 import pandas as pd
+from scipy import sparse
 from src.exception import CustomException
-from src.utils import load_object
-import os
+from src.metrics import metrics
+from src.pipeline.model_registry import ModelRegistry, get_registry
+from src.pipeline.fast_path import get_compiled_preprocessor
+from src.pipeline.prediction_cache import PredictionCache, get_prediction_cache, canonical_key
+
+
+FEATURE_COLUMNS = [
+	"Age", "TypeofContact", "CityTier", "DurationOfPitch", "Occupation", "Gender",
+	"NumberOfPersonVisiting", "NumberOfFollowups", "ProductPitched", "PreferredPropertyStar",
+	"MaritalStatus", "NumberOfTrips", "Passport", "PitchSatisfactionScore", "OwnCar",
+	"NumberOfChildrenVisiting", "Designation", "MonthlyIncome",
+]
 
 
 class PredictPipeline:
-	def __init__(self):
-		pass
+	def __init__(self, registry: ModelRegistry=None, cache: PredictionCache=None, use_cache: bool=True):
+		self.registry = registry or get_registry()
+		self.cache = (cache or get_prediction_cache()) if use_cache else None
 
-	def _apply_feature_engineering(self, df: pd.DataFrame) -> pd.DataFrame:
-		"""Mirror training feature engineering for inference."""
-		df = df.copy()
-		if 'NumberOfPersonVisiting' in df.columns and 'NumberOfChildrenVisiting' in df.columns:
-			df['TotalVisiting'] = df['NumberOfPersonVisiting'] + df['NumberOfChildrenVisiting']
-			df.drop(columns=['NumberOfPersonVisiting','NumberOfChildrenVisiting'], inplace=True)
-		return df
+	@staticmethod
+	def _cache_key(record: dict) -> bytes:
+		"""Canonical key over the CustomData fields (plus any extra columns the record carries)."""
+		extra = sorted(name for name in record if name not in FEATURE_COLUMNS)
+		values = [record.get(name) for name in FEATURE_COLUMNS]
+		return canonical_key(values + extra + [record[name] for name in extra])
 
-	def predict(self,features):
+	def predict_record(self, record: dict):
+		"""
+		Score a single customer given as a plain dict of CustomData fields.
+		Uses the compiled preprocessing plan, skipping pandas and the
+		ColumnTransformer; falls back to predict() if the plan is unavailable.
+		"""
 		try:
-			model_path=os.path.join("artifacts","model.pkl")
-			preprocessor_path=os.path.join('artifacts','preprocessor.pkl')
-			model=load_object(file_path=model_path)
-			preprocessor=load_object(file_path=preprocessor_path)
-			features = self._apply_feature_engineering(features)
-			data_scaled=preprocessor.transform(features)
-			preds=model.predict(data_scaled)
+			artifacts=self.registry.get()
+			key=None
+			if self.cache is not None:
+				key=self._cache_key(record)
+				cached=self.cache.get(artifacts.version,key)
+				if cached is not None:
+					return cached.copy()
+
+			compiled=get_compiled_preprocessor(artifacts)
+			if compiled is None:
+				preds=self._predict_frame(artifacts,pd.DataFrame([record]),path='single')
+			else:
+				with metrics.span('feature_engineering',path='single'):
+					record=artifacts.feature_engineer.transform_record(record)
+				with metrics.span('transform',path='single'):
+					data_scaled=compiled.transform_record(record)
+				with metrics.span('model_predict',path='single'):
+					preds=artifacts.model.predict(data_scaled)
+
+			if key is not None:
+				self.cache.put(artifacts.version,key,preds.copy())
 			return preds
+
+		except Exception as e:
+			raise CustomException(e,sys)
+
+	def _predict_frame(self, artifacts, features: pd.DataFrame, path: str='batch'):
+		with metrics.span('feature_engineering',path=path):
+			features = artifacts.feature_engineer.transform(features)
+		with metrics.span('transform',path=path):
+			data_scaled=artifacts.preprocessor.transform(features)
+		with metrics.span('model_predict',path=path):
+			return artifacts.model.predict(data_scaled)
+
+	def predict(self,features):
+		try:
+			artifacts=self.registry.get()
+			if self.cache is None or len(features)==0:
+				return self._predict_frame(artifacts,features)
+
+			# serve repeated profiles from the cache and only score the misses
+			keys=[self._cache_key(record) for record in features.to_dict('records')]
+			results=[self.cache.get(artifacts.version,key) for key in keys]
+			missing=[i for i,result in enumerate(results) if result is None]
+			if missing:
+				preds=self._predict_frame(artifacts,features.iloc[missing])
+				for j,i in enumerate(missing):
+					results[i]=preds[j:j + 1].copy()
+					self.cache.put(artifacts.version,keys[i],results[i])
+			return np.concatenate(results)
 		
 		except Exception as e:
 			raise CustomException(e,sys)
 
+	@staticmethod
+	def _positive_proba(model, data_scaled):
+		"""Probability of the positive class, or None if the model has no predict_proba."""
+		if not hasattr(model, "predict_proba"):
+			return None
+		proba = model.predict_proba(data_scaled)
+		classes = list(getattr(model, "classes_", [0, 1]))
+		positive_idx = classes.index(1) if 1 in classes else proba.shape[1] - 1
+		return proba[:, positive_idx]
+
+	def _iter_transformed(self, artifacts, features: pd.DataFrame, chunk_size: int):
+		"""Yield the preprocessed matrix of each chunk of `chunk_size` rows."""
+		for start in range(0, len(features), chunk_size):
+			with metrics.span('feature_engineering', path='batch'):
+				chunk = artifacts.feature_engineer.transform(features.iloc[start:start + chunk_size])
+			with metrics.span('transform', path='batch'):
+				data_scaled = artifacts.preprocessor.transform(chunk)
+			yield data_scaled
+
+	def predict_batch(self, features: pd.DataFrame, chunk_size: int=10000):
+		"""
+		Score many customers at once. Feature engineering and the preprocessor
+		run once per chunk of `chunk_size` rows instead of once per customer.
+		Returns (labels, probabilities); probabilities is None when the model
+		does not support predict_proba.
+		"""
+		try:
+			artifacts=self.registry.get()
+			labels=[]
+			probabilities=[]
+			for data_scaled in self._iter_transformed(artifacts, features, chunk_size):
+				with metrics.span('model_predict', path='batch'):
+					labels.append(np.asarray(artifacts.model.predict(data_scaled)))
+					probabilities.append(self._positive_proba(artifacts.model, data_scaled))
+
+			if not labels:
+				return np.empty(0), np.empty(0)
+			if any(p is None for p in probabilities):
+				return np.concatenate(labels), None
+			return np.concatenate(labels), np.concatenate(probabilities)
+
+		except Exception as e:
+			raise CustomException(e,sys)
+
+
+
+def nearest_centroid(X, centers, chunk_size: int=65536) -> np.ndarray:
+	"""
+	Index of the closest center for every row of X (dense or CSR), computed
+	as argmin(||c||^2 - 2 x.c) in chunks so memory stays O(chunk_size * k).
+	"""
+	centers = np.asarray(centers, dtype=np.float64)
+	center_norms = np.einsum('ij,ij->i', centers, centers)
+	n_rows = X.shape[0]
+	out = np.empty(n_rows, dtype=np.int64)
+	for start in range(0, n_rows, chunk_size):
+		block = X[start:start + chunk_size]
+		cross = block @ centers.T if sparse.issparse(block) else np.asarray(block, dtype=np.float64) @ centers.T
+		out[start:start + block.shape[0]] = np.argmin(center_norms[None, :] - 2.0 * np.asarray(cross), axis=1)
+	return out
+
+
+class SegmentPipeline(PredictPipeline):
+	"""
+	Assigns customers to the segments trained by CustomerSegmentationTrainer.
+	Shares the model registry with PredictPipeline, so a single preprocessor
+	transform can feed both the purchase model and the segment assignment.
+	"""
+	def _segmenter(self, artifacts):
+		if artifacts.segmenter is None:
+			raise FileNotFoundError("Segmenter not found, run the training pipeline first")
+		return artifacts.segmenter
+
+	@staticmethod
+	def _strategies(artifacts, segments) -> list:
+		profiles = (artifacts.segment_meta or {}).get('profiles', {})
+		return [profiles.get(str(int(seg)), {}).get('strategy') for seg in segments]
+
+	def assign_record(self, record: dict) -> dict:
+		"""Segment and suggested strategy for a single CustomData record."""
+		try:
+			artifacts=self.registry.get()
+			segmenter=self._segmenter(artifacts)
+			compiled=get_compiled_preprocessor(artifacts)
+			if compiled is None:
+				data_scaled=artifacts.preprocessor.transform(artifacts.feature_engineer.transform(pd.DataFrame([record])))
+			else:
+				data_scaled=compiled.transform_record(artifacts.feature_engineer.transform_record(record))
+			segment=int(nearest_centroid(data_scaled, segmenter.cluster_centers_)[0])
+			return {'segment': segment, 'strategy': self._strategies(artifacts, [segment])[0]}
+
+		except Exception as e:
+			raise CustomException(e,sys)
+
+	def score_batch(self, features: pd.DataFrame, chunk_size: int=10000, with_predictions: bool=False) -> dict:
+		"""
+		Assign segments (and optionally purchase predictions) for many customers,
+		transforming each chunk once for both outputs.
+		"""
+		try:
+			artifacts=self.registry.get()
+			segmenter=self._segmenter(artifacts)
+			segments=[]
+			labels=[]
+			probabilities=[]
+			for data_scaled in self._iter_transformed(artifacts, features, chunk_size):
+				segments.append(nearest_centroid(data_scaled, segmenter.cluster_centers_))
+				if with_predictions:
+					labels.append(np.asarray(artifacts.model.predict(data_scaled)))
+					probabilities.append(self._positive_proba(artifacts.model, data_scaled))
+
+			segments=np.concatenate(segments) if segments else np.empty(0, dtype=np.int64)
+			result={'segments': segments, 'strategies': self._strategies(artifacts, segments)}
+			if with_predictions:
+				result['labels']=np.concatenate(labels) if labels else np.empty(0)
+				has_proba=probabilities and all(p is not None for p in probabilities)
+				result['probabilities']=np.concatenate(probabilities) if has_proba else None
+			return result
+
+		except Exception as e:
+			raise CustomException(e,sys)
 
 
 class CustomData:
@@ -74,6 +254,9 @@ class CustomData:
 		self.Designation = Designation
 		self.MonthlyIncome = MonthlyIncome
 
+	def get_data_as_dict(self) -> dict:
+		return {name: getattr(self, name) for name in FEATURE_COLUMNS}
+
 	def get_data_as_data_frame(self):
 		try:
 			custom_data_input_dict = {
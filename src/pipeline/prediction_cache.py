@@ -0,0 +1,144 @@
+import sys
+import time
+import hashlib
+import numbers
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+# approximate bytes of bookkeeping per entry: the OrderedDict slot, key bytes object and (stored_at, value) tuple
+ENTRY_OVERHEAD_BYTES = 200
+
+
+@dataclass
+class PredictionCacheConfig:
+	# upper bound on cached profiles
+	max_entries: int = 100000
+	# upper bound on the estimated memory of all entries (keys, values and per-entry overhead)
+	max_bytes: int = 64 * 2 ** 20
+	# seconds an entry stays valid, None disables expiry
+	ttl_seconds: float = 3600.0
+
+
+def canonical_key(values) -> bytes:
+	'''
+	Hash a sequence of CustomData field values so equivalent profiles collide:
+	numbers compare as floats (3 == 3.0), NaN and None are both treated as
+	missing. Strings are kept as given: the one-hot encoder treats "Male " as
+	an unknown category, so it must not share an entry with "Male".
+	'''
+	normalized = []
+	for value in values:
+		if value is None:
+			normalized.append(None)
+		elif isinstance(value, str):
+			normalized.append(value)
+		elif isinstance(value, numbers.Number):
+			value = float(value)
+			normalized.append(None if value != value else value)
+		else:
+			normalized.append(str(value))
+	return hashlib.blake2b(repr(normalized).encode("utf-8"), digest_size=16).digest()
+
+
+class PredictionCache:
+	'''
+	Thread-safe LRU/TTL cache of predictions keyed on canonical profile hashes.
+	Entries are tagged with the model registry version; the whole cache is
+	dropped as soon as a lookup arrives for a different version.
+	'''
+	def __init__(self, config: PredictionCacheConfig=None):
+		self.config = config or PredictionCacheConfig()
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+		self._version = None
+		self.bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+		self.invalidations = 0
+
+	@staticmethod
+	def _entry_bytes(key: bytes, value) -> int:
+		nbytes = getattr(value, "nbytes", None)
+		return ENTRY_OVERHEAD_BYTES + len(key) + (sys.getsizeof(value) if nbytes is None else nbytes)
+
+	def _remove(self, key: bytes):
+		_, value = self._entries.pop(key)
+		self.bytes -= self._entry_bytes(key, value)
+
+	def _check_version(self, version: str):
+		if version != self._version:
+			if self._entries:
+				self.invalidations += 1
+			self._entries.clear()
+			self.bytes = 0
+			self._version = version
+
+	def get(self, version: str, key: bytes):
+		"""Return the cached prediction or None."""
+		with self._lock:
+			self._check_version(version)
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			stored_at, value = entry
+			ttl = self.config.ttl_seconds
+			if ttl is not None and time.monotonic() - stored_at > ttl:
+				self._remove(key)
+				self.expirations += 1
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return value
+
+	def put(self, version: str, key: bytes, value):
+		with self._lock:
+			self._check_version(version)
+			if key in self._entries:
+				self._remove(key)
+			self._entries[key] = (time.monotonic(), value)
+			self.bytes += self._entry_bytes(key, value)
+			while self._entries and (len(self._entries) > self.config.max_entries or self.bytes > self.config.max_bytes):
+				self._remove(next(iter(self._entries)))
+				self.evictions += 1
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.bytes = 0
+
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+		return {
+			"version": self._version,
+			"entries": len(self._entries),
+			"max_entries": self.config.max_entries,
+			"bytes": self.bytes,
+			"max_bytes": self.config.max_bytes,
+			"ttl_seconds": self.config.ttl_seconds,
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / lookups if lookups else None,
+			"evictions": self.evictions,
+			"expirations": self.expirations,
+			"invalidations": self.invalidations,
+		}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_prediction_cache() -> PredictionCache:
+	"""Return the prediction cache shared by every PredictPipeline in this process."""
+	global _default_cache
+	if _default_cache is None:
+		with _default_cache_lock:
+			if _default_cache is None:
+				_default_cache = PredictionCache()
+	return _default_cache
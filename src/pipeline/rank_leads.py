@@ -0,0 +1,164 @@
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import metrics
+from src.pipeline.predict_pipeline import SegmentPipeline, nearest_centroid
+from src.utils import iter_dataset_chunks, ChunkWriter
+
+
+class TopK:
+	'''
+	The k highest-probability rows seen so far. A pushed chunk only contributes
+	rows that beat the current k-th score, and the pool is cut back to k with a
+	partial sort, so memory stays O(k + chunk) however many rows stream through.
+	Ties are broken by input position, earlier rows first.
+	'''
+	def __init__(self, k: int):
+		self.k = k
+		self.scores = np.empty(0)
+		self.positions = np.empty(0, dtype=np.int64)
+		self.rows = None
+
+	def threshold(self) -> float:
+		return self.scores.min() if len(self.scores) >= self.k else -np.inf
+
+	def push(self, scores: np.ndarray, positions: np.ndarray, rows: pd.DataFrame):
+		# an equal score arriving later never displaces an earlier row
+		candidates = np.flatnonzero(scores > self.threshold())
+		if not len(candidates):
+			return
+		scores = np.concatenate([self.scores, scores[candidates]])
+		positions = np.concatenate([self.positions, positions[candidates]])
+		new_rows = rows.iloc[candidates]
+		rows = new_rows if self.rows is None else pd.concat([self.rows, new_rows], ignore_index=True)
+
+		if len(scores) > self.k:
+			cut = len(scores) - self.k
+			kth = np.partition(scores, cut)[cut]
+			above = np.flatnonzero(scores > kth)
+			tied = np.flatnonzero(scores == kth)
+			tied = tied[np.argsort(positions[tied], kind="stable")[:self.k - len(above)]]
+			keep = np.concatenate([above, tied])
+			scores, positions, rows = scores[keep], positions[keep], rows.iloc[keep]
+
+		self.scores, self.positions, self.rows = scores, positions, rows.reset_index(drop=True)
+
+	def result(self) -> pd.DataFrame:
+		"""Kept rows ordered by descending probability, with rank, input row position and probability."""
+		if self.rows is None:
+			return pd.DataFrame(columns=['rank', 'row', 'probability'])
+		order = np.lexsort((self.positions, -self.scores))
+		out = self.rows.iloc[order].reset_index(drop=True)
+		out.insert(0, 'probability', self.scores[order])
+		out.insert(0, 'row', self.positions[order])
+		out.insert(0, 'rank', np.arange(1, len(order) + 1))
+		return out
+
+
+def _iter_source(source, chunk_size: int):
+	if isinstance(source, str):
+		yield from iter_dataset_chunks(source, chunk_size)
+	elif isinstance(source, pd.DataFrame):
+		for start in range(0, len(source), chunk_size):
+			yield source.iloc[start:start + chunk_size]
+	else:
+		yield from source
+
+
+def _score_chunk(pipeline: SegmentPipeline, artifacts, chunk: pd.DataFrame, per_segment: bool):
+	"""Positive-class probabilities (and segments) of one chunk from a single preprocessor pass."""
+	data_scaled = next(pipeline._iter_transformed(artifacts, chunk, max(len(chunk), 1)))
+	with metrics.span('model_predict', path='batch'):
+		proba = pipeline._positive_proba(artifacts.model, data_scaled)
+	segments = None
+	if per_segment:
+		segments = nearest_centroid(data_scaled, pipeline._segmenter(artifacts).cluster_centers_)
+	return proba, segments
+
+
+def rank_leads(source, k: int, chunk_size: int=50000, per_segment: bool=False, keep_columns: list=None,
+		pipeline: SegmentPipeline=None):
+	'''
+	The k most likely buyers in `source` (a .csv/.parquet path, a DataFrame or
+	an iterable of DataFrame chunks), scored chunk by chunk. Returns a DataFrame
+	ordered by rank, or with per_segment a {segment: DataFrame} dict holding
+	the top k of every segment from segmenter.pkl. All chunks are scored with
+	the artifacts loaded at the start, even if the registry reloads meanwhile.
+	'''
+	if k < 1:
+		raise ValueError(f"k must be at least 1, got {k}")
+	try:
+		start = time.perf_counter()
+		pipeline = pipeline or SegmentPipeline(use_cache=False)
+		artifacts = pipeline.registry.get()
+		if not hasattr(artifacts.model, 'predict_proba'):
+			raise TypeError("Lead ranking needs a model with predict_proba")
+		overall = TopK(k)
+		by_segment = {}
+		offset = 0
+		for chunk in _iter_source(source, chunk_size):
+			if not len(chunk):
+				continue
+			proba, segments = _score_chunk(pipeline, artifacts, chunk, per_segment)
+			rows = chunk[keep_columns] if keep_columns else chunk
+			positions = np.arange(offset, offset + len(chunk))
+			offset += len(chunk)
+			if not per_segment:
+				overall.push(proba, positions, rows)
+				continue
+			for segment in np.unique(segments):
+				mask = np.flatnonzero(segments == segment)
+				by_segment.setdefault(int(segment), TopK(k)).push(proba[mask], positions[mask], rows.iloc[mask])
+
+		metrics.inc('rows_scored_total', offset, endpoint='rank_leads')
+		logging.info(f"Ranked {offset} leads for top {k} in {time.perf_counter() - start:.2f}s")
+		if not per_segment:
+			return overall.result()
+
+		strategies = SegmentPipeline._strategies(artifacts, sorted(by_segment))
+		result = {}
+		for segment, strategy in zip(sorted(by_segment), strategies):
+			ranked = by_segment[segment].result()
+			ranked.insert(3, 'segment', segment)
+			ranked.insert(4, 'strategy', strategy)
+			result[segment] = ranked
+		return result
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Rank a CSV/Parquet lead file and keep the top-K most likely buyers.")
+	parser.add_argument("input_path", help="input .csv or .parquet file")
+	parser.add_argument("output_path", help="output .csv or .parquet file")
+	parser.add_argument("--top-k", type=int, default=1000, help="leads to keep (per segment with --per-segment, default: 1000)")
+	parser.add_argument("--per-segment", action="store_true", help="rank within every customer segment")
+	parser.add_argument("--chunk-size", type=int, default=50000, help="rows per chunk (default: 50000)")
+	parser.add_argument("--keep-columns", default=None,
+		help="comma-separated input columns to copy to the output (default: all)")
+	args = parser.parse_args(argv)
+	if args.top_k < 1:
+		parser.error("--top-k must be at least 1")
+
+	keep_columns = args.keep_columns.split(',') if args.keep_columns else None
+	ranked = rank_leads(args.input_path, args.top_k, chunk_size=args.chunk_size,
+		per_segment=args.per_segment, keep_columns=keep_columns)
+	if args.per_segment:
+		ranked = pd.concat(ranked.values(), ignore_index=True) if ranked else TopK(args.top_k).result()
+	writer = ChunkWriter(args.output_path)
+	try:
+		writer.write(ranked)
+	finally:
+		writer.close()
+	print({'rows_written': writer.rows_written, 'output_path': args.output_path})
+
+
+if __name__ == "__main__":
+	main()
@@ -2,21 +2,52 @@ from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
 from src.components.segmentation import CustomerSegmentationTrainer
+from src.components.out_of_core import OutOfCoreTrainer
+from src.components.feature_cache import FeatureCache
+from src.pipeline.model_registry import publish_release
 
 
-def run_training_pipeline():
+def run_training_pipeline(use_cache: bool = True, out_of_core: bool = False, fold_features: bool = True):
+	"""
+	Run every training stage; with use_cache, stages whose inputs are unchanged are restored from the artifact store.
+	With out_of_core, the train/test split is streamed and the preprocessor, model and segmenter are fitted
+	chunk by chunk instead of on in-memory arrays.
+	With fold_features, the model search uses per-fold preprocessing from a FeatureCache shared with segmentation.
+	"""
 	ingestor = DataIngestion()
+	ingestor.ingestion_config.use_cache = use_cache
+	if out_of_core:
+		ingestor.ingestion_config.split_mode = "streaming"
 	train_path, test_path = ingestor.initiate_data_ingestion()
 
 	transformer = DataTransformation()
-	train_arr, test_arr, preproc_path = transformer.initiate_data_transformation(train_path, test_path)
+	transformer.data_transformation_config.use_cache = use_cache
+	feature_cache = FeatureCache(transformation=transformer)
+	feature_cache.config.use_disk = use_cache
+	segment_features = None
 
-	trainer = ModelTrainer()
-	score = trainer.initiate_model_trainer(train_arr, test_arr)
+	if out_of_core:
+		score, preproc_path = OutOfCoreTrainer().train(train_path, test_path)
+	else:
+		X_train, y_train, X_test, y_test, preproc_path = feature_cache.transformed(train_path, test_path)
+		segment_features = feature_cache.segmentation_features(train_path, test_path)
+
+		trainer = ModelTrainer()
+		trainer.model_trainer_config.use_cache = use_cache
+		cv_data = feature_cache.search_inputs(train_path) if fold_features else None
+		score = trainer.initiate_model_trainer(X_train, y_train, X_test, y_test, cv_data=cv_data)
+
+	# serving switches to the new model and preprocessor together
+	publish_release()
 
 	# Train segmentation to support targeted strategies
 	seg = CustomerSegmentationTrainer()
-	seg_meta = seg.train(train_path, test_path, preproc_path)
+	seg.config.use_cache = use_cache
+	if out_of_core:
+		# the in-memory trainer would read and transform all of train and test at once
+		seg_meta = seg.train_streaming(train_path, test_path, preproc_path)
+	else:
+		seg_meta = seg.train(train_path, test_path, preproc_path, features=segment_features)
 	return score, seg_meta
 
 
@@ -0,0 +1,70 @@
+import time
+
+from src.logger import logging
+from src.metrics import metrics
+
+
+# a typical lead, used only to exercise the prediction paths
+WARMUP_RECORD = {
+	"Age": 35, "TypeofContact": "Self Enquiry", "CityTier": 1, "DurationOfPitch": 15.0,
+	"Occupation": "Salaried", "Gender": "Male", "NumberOfPersonVisiting": 3, "NumberOfFollowups": 4.0,
+	"ProductPitched": "Basic", "PreferredPropertyStar": 3.0, "MaritalStatus": "Married", "NumberOfTrips": 3.0,
+	"Passport": 0, "PitchSatisfactionScore": 3, "OwnCar": 1, "NumberOfChildrenVisiting": 1.0,
+	"Designation": "Executive", "MonthlyIncome": 22000.0,
+}
+
+
+def _timed(summary: dict, step: str, fn):
+	start = time.perf_counter()
+	try:
+		fn()
+		summary[step] = round(time.perf_counter() - start, 6)
+	except Exception as e:
+		# a failed warm-up step must not stop the worker; the first request reports the error
+		summary[step] = None
+		summary.setdefault("errors", {})[step] = str(e)
+		logging.info(f"Warm-up step {step} failed: {e}")
+
+
+def warm_up(record: dict=None) -> dict:
+	'''
+	Load the serving artifacts into the process registry and push one dummy
+	record through the single-row, batch and segment paths, so the first real
+	request does not pay for unpickling, preprocessor compilation or lazy
+	imports inside the estimators. Returns per-step seconds (None if a step failed).
+	'''
+	record = record or WARMUP_RECORD
+	summary = {}
+	state = {}
+
+	def load():
+		from src.pipeline.predict_pipeline import PredictPipeline
+		# the prediction cache stays untouched by the dummy record
+		state["pipeline"] = PredictPipeline(use_cache=False)
+		state["artifacts"] = state["pipeline"].registry.get()
+
+	def compile_preprocessor():
+		from src.pipeline.fast_path import get_compiled_preprocessor
+		get_compiled_preprocessor(state["artifacts"])
+
+	def predict_batch():
+		import pandas as pd
+		state["pipeline"].predict_batch(pd.DataFrame([record]))
+
+	def assign_segment():
+		from src.pipeline.predict_pipeline import SegmentPipeline
+		SegmentPipeline(use_cache=False).assign_record(record)
+
+	started = time.perf_counter()
+	# the dummy predictions are not traffic; keep them out of the latency histograms and counters
+	with metrics.paused():
+		_timed(summary, "load_artifacts", load)
+		if "artifacts" in state:
+			_timed(summary, "compile_preprocessor", compile_preprocessor)
+			_timed(summary, "predict_record", lambda: state["pipeline"].predict_record(record))
+			_timed(summary, "predict_batch", predict_batch)
+			if state["artifacts"].segmenter is not None:
+				_timed(summary, "assign_segment", assign_segment)
+	summary["total"] = round(time.perf_counter() - started, 6)
+	logging.info(f"Warm-up finished: {summary}")
+	return summary
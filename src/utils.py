@@ -1,13 +1,20 @@
 import os
 import sys
+import json
+import time
+import shutil
+import hashlib
+import platform
+import tempfile
 
 import numpy as np 
 import pandas as pd
-import dill
-from sklearn.metrics import r2_score, f1_score
-from sklearn.model_selection import GridSearchCV
 
 from src.exception import CustomException
+from src.logger import logging
+
+# dill, joblib and the sklearn search/metric modules are imported where they are
+# used, so the serving path (load_object/load_artifact) does not pay for them at import
 
 def save_object(file_path, obj):
 	try:
@@ -16,29 +23,309 @@ def save_object(file_path, obj):
 		os.makedirs(dir_path, exist_ok=True)
 
 		with open(file_path, "wb") as file_obj:
+			import dill
 			dill.dump(obj, file_obj)
 
 	except Exception as e:
 		raise CustomException(e, sys)
 	
 
-def evaluate_models(X_train, y_train,X_test,y_test,models,param, classification: bool=False):
+COLUMNAR_EXTENSIONS = ('.parquet', '.feather')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+
+def write_dataset(df: pd.DataFrame, file_path):
+	"""
+	Write a DataFrame as CSV, Parquet (zstd) or Feather (lz4), chosen by the file
+	extension. Columnar formats store text columns as categoricals so dtypes
+	survive the round trip and repeated strings are dictionary-encoded.
+	"""
+	try:
+		dir_path = os.path.dirname(file_path)
+		if dir_path:
+			os.makedirs(dir_path, exist_ok=True)
+
+		lower = file_path.lower()
+		if not lower.endswith(COLUMNAR_EXTENSIONS):
+			df.to_csv(file_path, index=False, header=True)
+			return
+
+		object_columns = df.select_dtypes(include="object").columns
+		if len(object_columns):
+			df = df.astype({col: "category" for col in object_columns})
+		df = df.reset_index(drop=True)
+		if lower.endswith('.parquet'):
+			df.to_parquet(file_path, engine="pyarrow", compression="zstd", index=False)
+		else:
+			df.to_feather(file_path, compression="lz4")
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def read_dataset(file_path, columns=None) -> pd.DataFrame:
+	"""
+	Read a dataset written by write_dataset, loading only `columns` if given.
+	Feather files are memory-mapped; Parquet keeps its stored dtypes.
+	"""
+	try:
+		lower = file_path.lower()
+		if lower.endswith('.parquet'):
+			return pd.read_parquet(file_path, engine="pyarrow", columns=columns)
+		if lower.endswith('.feather'):
+			import pyarrow.feather as feather
+			return feather.read_table(file_path, columns=columns, memory_map=True).to_pandas()
+		return pd.read_csv(file_path, usecols=columns)
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def iter_dataset_chunks(file_path, chunk_size: int, columns=None):
+	"""Yield a CSV, Parquet or Feather dataset as DataFrames of at most `chunk_size` rows."""
+	try:
+		lower = file_path.lower()
+		if lower.endswith(('.parquet', '.pq')):
+			import pyarrow.parquet as pq
+			parquet_file = pq.ParquetFile(file_path)
+			for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+				yield batch.to_pandas()
+		elif lower.endswith('.feather'):
+			import pyarrow.feather as feather
+			table = feather.read_table(file_path, columns=columns, memory_map=True)
+			for start in range(0, table.num_rows, chunk_size):
+				yield table.slice(start, chunk_size).to_pandas()
+		else:
+			for chunk in pd.read_csv(file_path, chunksize=chunk_size, usecols=columns):
+				yield chunk
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+class ChunkWriter:
+	'''
+	Appends DataFrame chunks to a CSV or Parquet file so that only one chunk
+	is ever held in memory. The Parquet schema is the given pyarrow `schema`,
+	or else fixed by the first chunk.
+	'''
+	def __init__(self, output_path: str, schema=None):
+		self.output_path = output_path
+		self.rows_written = 0
+		self._csv_file = None
+		self._parquet_writer = None
+		self._schema = schema
+		dir_path = os.path.dirname(output_path)
+		if dir_path:
+			os.makedirs(dir_path, exist_ok=True)
+
+	def write(self, df: pd.DataFrame):
+		if self.output_path.lower().endswith(PARQUET_EXTENSIONS):
+			import pyarrow as pa
+			import pyarrow.parquet as pq
+			if self._schema is None:
+				table = pa.Table.from_pandas(df, preserve_index=False)
+				self._schema = table.schema
+			else:
+				table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+			if self._parquet_writer is None:
+				self._parquet_writer = pq.ParquetWriter(self.output_path, self._schema)
+			self._parquet_writer.write_table(table)
+		else:
+			if self._csv_file is None:
+				self._csv_file = open(self.output_path, 'w', newline='', encoding='utf-8')
+				df.to_csv(self._csv_file, index=False, header=True)
+			else:
+				df.to_csv(self._csv_file, index=False, header=False)
+		self.rows_written += len(df)
+
+	def close(self):
+		if self._parquet_writer is not None:
+			self._parquet_writer.close()
+		if self._csv_file is not None:
+			self._csv_file.close()
+
+
+def save_matrix(file_path, X):
+	"""Save a feature matrix to .npz, keeping scipy sparse matrices sparse."""
+	try:
+		dir_path = os.path.dirname(file_path)
+		if dir_path:
+			os.makedirs(dir_path, exist_ok=True)
+		from scipy import sparse
+		if sparse.issparse(X):
+			sparse.save_npz(file_path, sparse.csr_matrix(X), compressed=False)
+		else:
+			np.savez(file_path, dense=np.asarray(X))
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def matrix_nbytes(X) -> int:
+	"""Bytes held by a dense array or by the buffers of a CSR/CSC matrix."""
+	if hasattr(X, "indptr"):
+		return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+	return np.asarray(X).nbytes
+
+
+def load_matrix(file_path):
+	"""Load a matrix written by save_matrix as a CSR matrix or ndarray."""
+	try:
+		from scipy import sparse
+		with np.load(file_path, allow_pickle=False) as data:
+			if "dense" in data.files:
+				return data["dense"]
+		return sparse.load_npz(file_path)
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def dataset_columns(file_path) -> list:
+	"""Column names of a dataset without reading its rows."""
+	try:
+		lower = file_path.lower()
+		if lower.endswith('.parquet'):
+			import pyarrow.parquet as pq
+			return pq.read_schema(file_path).names
+		if lower.endswith('.feather'):
+			import pyarrow.feather as feather
+			return feather.read_table(file_path, memory_map=True).schema.names
+		return pd.read_csv(file_path, nrows=0).columns.tolist()
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def _search_candidates(para, search: str, n_splits: int, max_fits, random_state: int) -> list:
+	"""Parameter settings to try for one model family, respecting the per-model fit budget."""
+	from sklearn.model_selection import ParameterGrid, ParameterSampler
+	n_candidates = len(ParameterGrid(para))
+	if search == 'grid' and max_fits is not None and n_candidates * n_splits > max_fits:
+		logging.info(f"Grid of {n_candidates} candidates exceeds fit budget {max_fits}, using random search")
+		search = 'random'
+
+	if search == 'grid':
+		return list(ParameterGrid(para))
+	if search == 'random':
+		n_iter = n_candidates if max_fits is None else max(1, min(n_candidates, max_fits // n_splits))
+		return list(ParameterSampler(para, n_iter=n_iter, random_state=random_state))
+	raise ValueError(f"Unknown search strategy '{search}', expected 'grid', 'random' or 'halving'")
+
+
+def _halving_search(model, para, cv, n_jobs, max_fits, random_state: int):
+	'''
+	Successive halving with factor 3. Every round keeps a third of the
+	candidates, so n candidates cost about 1.5 * n * folds fits; with max_fits
+	a random subset of the grid small enough to stay within it is raced.
+	'''
+	from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+	from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV, ParameterGrid
+	n_candidates = len(ParameterGrid(para))
+	n_splits = cv if isinstance(cv, int) else len(cv)
+	if max_fits is not None:
+		affordable = max(1, int(max_fits / (1.5 * n_splits)))
+		if affordable < n_candidates:
+			logging.info(f"Halving over {n_candidates} candidates exceeds fit budget {max_fits}, racing {affordable}")
+			return HalvingRandomSearchCV(model, para, n_candidates=affordable, cv=cv, factor=3, n_jobs=n_jobs,
+				random_state=random_state, refit=False)
+	return HalvingGridSearchCV(model, para, cv=cv, factor=3, n_jobs=n_jobs, random_state=random_state, refit=False)
+
+
+def _search(model, para, X, y, search: str, cv, n_jobs, max_fits, random_state: int, out_of_time) -> tuple:
+	'''
+	(best params, candidates scored) for one model family. With out_of_time,
+	grid and random candidates are scored one parallel wave at a time and the
+	search stops at the first wave boundary after out_of_time() turns true,
+	keeping the best candidate so far; without it they run as one search.
+	Halving rounds depend on each other and run whole.
+	'''
+	from joblib import effective_n_jobs
+	from sklearn.model_selection import GridSearchCV
+	if search == 'halving':
+		gs = _halving_search(model, para, cv, n_jobs, max_fits, random_state)
+		gs.fit(X, y)
+		return gs.best_params_, len(gs.cv_results_['params'])
+
+	n_splits = cv if isinstance(cv, int) else len(cv)
+	candidates = _search_candidates(para, search, n_splits, max_fits, random_state)
+	# enough candidates per wave to keep every worker busy with one fold each
+	wave = len(candidates) if out_of_time is None else max(1, effective_n_jobs(n_jobs) // n_splits)
+	best_params, best_score, scored = None, -np.inf, 0
+	for start in range(0, len(candidates), wave):
+		if scored and out_of_time is not None and out_of_time():
+			logging.info(f"Search time budget spent after {scored} of {len(candidates)} candidates")
+			break
+		batch = [{key: [value] for key, value in candidate.items()} for candidate in candidates[start:start + wave]]
+		gs = GridSearchCV(model, batch, cv=cv, n_jobs=n_jobs, refit=False).fit(X, y)
+		scores = np.nan_to_num(gs.cv_results_['mean_test_score'], nan=-np.inf)
+		# ties go to the earlier candidate, as in a single GridSearchCV
+		if scores.max() > best_score or best_params is None:
+			best_score = scores.max()
+			best_params = gs.cv_results_['params'][int(np.argmax(scores))]
+		scored += len(batch)
+	return best_params, scored
+
+
+def evaluate_models(X_train, y_train,X_test,y_test,models,param, classification: bool=False,
+		search: str='grid', n_jobs=None, max_fits: int=None, time_budget_seconds: float=None,
+		cv: int=3, random_state: int=42, dense_only=(), cv_data=None):
+	'''
+	Tune every model family and return {name: test score}.
+	- search: 'grid', 'random' or 'halving' (successive halving)
+	- n_jobs: candidates x folds are fitted in parallel worker processes
+	- max_fits: per-model cap on candidate x fold fits (grid falls back to random search,
+	  halving races a random subset)
+	- time_budget_seconds: wall-clock budget, checked between waves of candidates; once
+	  spent, the current family keeps its best candidate so far and the rest are skipped
+	- dense_only: model names that cannot take sparse X; only they get a dense copy
+	- cv_data: (X, y, splits) from FeatureCache.search_inputs; the search runs on
+	  these per-fold preprocessed features
+	The winner of each search is refit on X_train and replaces the entry in `models`.
+	'''
 	try:
+		from sklearn.base import clone
+		from sklearn.metrics import r2_score, f1_score
+
 		report = {}
+		started = time.perf_counter()
+		dense_cache = {}
+
+		def out_of_time():
+			return time_budget_seconds is not None and time.perf_counter() - started >= time_budget_seconds
+
+		def densify(key, X):
+			if key not in dense_cache:
+				dense_cache[key] = X.toarray() if hasattr(X, "toarray") else X
+			return dense_cache[key]
 
-		for i in range(len(list(models))):
-			model = list(models.values())[i]
-			para=param[list(models.keys())[i]]
+		def features_for(name):
+			X_search = X_train if cv_data is None else cv_data[0]
+			if name not in dense_only:
+				return X_train, X_test, X_search
+			return densify("train", X_train), densify("test", X_test), densify("search", X_search)
 
-			gs = GridSearchCV(model,para,cv=3)
-			gs.fit(X_train,y_train)
+		for name, model in list(models.items()):
+			if report and out_of_time():
+				logging.info(f"Search time budget of {time_budget_seconds}s spent, skipping {name}")
+				continue
 
-			model.set_params(**gs.best_params_)
-			model.fit(X_train,y_train)
+			para=param[name]
+			X_fit, X_eval, X_search = features_for(name)
+			y_search, search_cv = (y_train, cv) if cv_data is None else (cv_data[1], cv_data[2])
+			model_start = time.perf_counter()
+			best_params, n_scored = _search(model, para, X_search, y_search, search, search_cv, n_jobs, max_fits,
+				random_state, out_of_time if time_budget_seconds is not None else None)
+			search_seconds = time.perf_counter() - model_start
+			refit_start = time.perf_counter()
+			model = clone(model).set_params(**best_params).fit(X_fit,y_train)
+			refit_seconds = time.perf_counter() - refit_start
+			models[name] = model
 
 			# Predictions
-			y_train_pred = model.predict(X_train)
-			y_test_pred = model.predict(X_test)
+			y_train_pred = model.predict(X_fit)
+			y_test_pred = model.predict(X_eval)
 
 			if classification:
 				train_model_score = f1_score(y_train, y_train_pred)
@@ -47,8 +334,15 @@ def evaluate_models(X_train, y_train,X_test,y_test,models,param, classification:
 				train_model_score = r2_score(y_train, y_train_pred)
 				test_model_score = r2_score(y_test, y_test_pred)
 
-			report[list(models.keys())[i]] = test_model_score
+			logging.info(
+				f"{name}: {n_scored} candidates searched in {search_seconds:.2f}s "
+				f"(refit {refit_seconds:.2f}s), best params {best_params}, "
+				f"train score {train_model_score:.4f}, test score {test_model_score:.4f}"
+			)
 
+			report[name] = test_model_score
+
+		logging.info(f"Model search finished in {time.perf_counter() - started:.2f}s")
 		return report
 
 	except Exception as e:
@@ -57,8 +351,134 @@ def evaluate_models(X_train, y_train,X_test,y_test,models,param, classification:
 
 def load_object(file_path):
 	try:
+		if os.path.isdir(file_path):
+			return load_artifact(file_path)
 		with open(file_path, "rb") as file_obj:
+			import dill
 			return dill.load(file_obj)
 
 	except Exception as e:
-		raise CustomException(e, sys)
\ No newline at end of file
+		raise CustomException(e, sys)
+
+
+def file_sha256(file_path, chunk_size: int=1 << 20) -> str:
+	"""Return the hex sha256 digest of a file, read in fixed-size chunks."""
+	try:
+		digest = hashlib.sha256()
+		with open(file_path, "rb") as file_obj:
+			for block in iter(lambda: file_obj.read(chunk_size), b""):
+				digest.update(block)
+		return digest.hexdigest()
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_MANIFEST = "manifest.json"
+ARTIFACT_PAYLOAD = "payload.joblib"
+
+
+def _library_versions() -> dict:
+	import joblib
+	versions = {"python": platform.python_version(), "numpy": np.__version__, "joblib": joblib.__version__}
+	for module_name in ("sklearn", "xgboost"):
+		try:
+			versions[module_name] = __import__(module_name).__version__
+		except ImportError:
+			versions[module_name] = None
+	return versions
+
+
+def save_artifact(dir_path, obj):
+	'''
+	Save `obj` as a versioned artifact directory:
+	- payload.joblib: uncompressed joblib pickle, numpy arrays stored raw so they can be memory-mapped
+	- manifest.json: format version, payload sha256 and library versions (written last)
+	The directory is built next to `dir_path` as a hidden version and `dir_path`
+	is a symlink to it, swapped with a single rename, so a reader always finds
+	either the old or the new artifact. The previous version is kept for
+	readers that resolved the link just before the swap.
+	'''
+	try:
+		parent_dir = os.path.dirname(os.path.abspath(dir_path))
+		os.makedirs(parent_dir, exist_ok=True)
+		version_prefix = f".{os.path.basename(os.path.abspath(dir_path))}-"
+		tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=version_prefix)
+		try:
+			payload_path = os.path.join(tmp_dir, ARTIFACT_PAYLOAD)
+			import joblib
+			joblib.dump(obj, payload_path, compress=0)
+			manifest = {
+				"format_version": ARTIFACT_FORMAT_VERSION,
+				"payload": ARTIFACT_PAYLOAD,
+				"sha256": file_sha256(payload_path),
+				"object_type": f"{type(obj).__module__}.{type(obj).__qualname__}",
+				"created_at": time.time(),
+				"versions": _library_versions(),
+			}
+			with open(os.path.join(tmp_dir, ARTIFACT_MANIFEST), "w", encoding="utf-8") as f:
+				json.dump(manifest, f, indent=2)
+
+			previous = os.path.realpath(dir_path) if os.path.islink(dir_path) else None
+			if os.path.isdir(dir_path) and not os.path.islink(dir_path):
+				# a directory written before artifacts were symlinked; this one swap is not atomic
+				legacy_dir = tempfile.mkdtemp(dir=parent_dir, prefix=version_prefix)
+				os.rmdir(legacy_dir)
+				os.replace(dir_path, legacy_dir)
+				previous = legacy_dir
+			tmp_link = f"{tmp_dir}.link"
+			os.symlink(os.path.basename(tmp_dir), tmp_link)
+			os.replace(tmp_link, dir_path)
+		except Exception:
+			shutil.rmtree(tmp_dir, ignore_errors=True)
+			raise
+
+		keep = {os.path.realpath(path) for path in (tmp_dir, previous) if path}
+		for name in os.listdir(parent_dir):
+			path = os.path.join(parent_dir, name)
+			if name.startswith(version_prefix) and not os.path.islink(path) and os.path.realpath(path) not in keep:
+				shutil.rmtree(path, ignore_errors=True)
+
+	except Exception as e:
+		raise CustomException(e, sys)
+
+
+def is_artifact(path) -> bool:
+	return os.path.isfile(os.path.join(path, ARTIFACT_MANIFEST))
+
+
+def load_artifact(dir_path, mmap_mode="r", verify: bool=True):
+	'''
+	Load an artifact written by save_artifact. With mmap_mode="r" numpy arrays
+	are memory-mapped read-only, so worker processes share the page cache
+	instead of each holding a private copy. That covers plain arrays such as
+	the preprocessor's and a CompiledTreeModel's; fitted sklearn trees copy
+	their node arrays into memory when unpickled.
+	'''
+	try:
+		# resolve the symlink once, the manifest and payload must come from the same version
+		dir_path = os.path.realpath(dir_path)
+		with open(os.path.join(dir_path, ARTIFACT_MANIFEST), "r", encoding="utf-8") as f:
+			manifest = json.load(f)
+		if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+			raise ValueError(f"Unsupported artifact format version {manifest.get('format_version')} in {dir_path}")
+
+		payload_path = os.path.join(dir_path, manifest["payload"])
+		if verify and file_sha256(payload_path) != manifest["sha256"]:
+			raise ValueError(f"Checksum mismatch for artifact {dir_path}")
+
+		import joblib
+		obj = joblib.load(payload_path, mmap_mode=mmap_mode)
+
+		# only libraries the payload actually imported are compared, so loading never imports xgboost on its own
+		for module_name in ("sklearn", "xgboost"):
+			saved = manifest.get("versions", {}).get(module_name)
+			module = sys.modules.get(module_name)
+			current = getattr(module, "__version__", None)
+			if saved and module is not None and saved != current:
+				logging.info(f"Artifact {dir_path} was saved with {module_name} {saved}, running {current}")
+		return obj
+
+	except Exception as e:
+		raise CustomException(e, sys)
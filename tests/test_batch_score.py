@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("sklearn")
+
+from src.pipeline.batch_score import conform_chunk, output_schema
+from src.utils import ChunkWriter, iter_dataset_chunks
+
+
+def _source(tmp_path, ext):
+	n = 30
+	df = pd.DataFrame({
+		"CustomerID": np.arange(n),
+		"Age": np.arange(n) + 20.0,
+		"Gender": ["Male", "Female"] * (n // 2),
+		"Notes": np.nan,
+	})
+	# the first chunk has no missing value anywhere and an all-missing column; later ones have both
+	df.loc[15:, "Notes"] = "called back"
+	df.loc[20, ["CustomerID", "Age", "Gender"]] = np.nan
+	path = tmp_path / f"source{ext}"
+	if ext == ".csv":
+		df.to_csv(path, index=False)
+	else:
+		df.to_parquet(path, index=False)
+	return df, str(path)
+
+
+def _score(tmp_path, source, schema, keep_columns=None):
+	output = str(tmp_path / "scored.parquet")
+	writer = ChunkWriter(output, schema=schema)
+	for chunk in iter_dataset_chunks(source, 10):
+		out = chunk[keep_columns].copy() if keep_columns else chunk
+		out["prediction"] = np.ones(len(chunk), dtype=np.int64)
+		out["probability"] = np.full(len(chunk), 0.75)
+		writer.write(conform_chunk(out, schema))
+	writer.close()
+	return pd.read_parquet(output)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+def test_later_missing_values_fit_the_up_front_schema(tmp_path, ext):
+	df, source = _source(tmp_path, ext)
+	schema = output_schema(source, 10, column_types={"Notes": "string"})
+	assert schema.field("CustomerID").type == pa.float64()
+	assert schema.field("prediction").type == pa.int64()
+
+	scored = _score(tmp_path, source, schema)
+	assert len(scored) == len(df)
+	assert scored["CustomerID"].isna().sum() == scored["Gender"].isna().sum() == 1
+	assert (scored["Notes"] == "called back").sum() == 15
+	assert (scored["probability"] == 0.75).all()
+
+
+def test_keep_columns_and_no_probability(tmp_path):
+	_, source = _source(tmp_path, ".csv")
+	schema = output_schema(source, 10, keep_columns=["CustomerID"], label_type=pa.string(), with_probability=False)
+	assert schema.names == ["CustomerID", "prediction"]
+	assert schema.field("prediction").type == pa.string()
@@ -0,0 +1,75 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("pyarrow")
+
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+
+
+def _ingestion(tmp_path, source, ext, chunk_size, test_size=0.2):
+	ingestion = DataIngestion()
+	ingestion.ingestion_config = DataIngestionConfig(
+		train_data_path=str(tmp_path / f"train{ext}"),
+		test_data_path=str(tmp_path / f"test{ext}"),
+		source_path=str(source),
+		test_size=test_size,
+		split_mode="streaming",
+		chunk_size=chunk_size,
+		use_cache=False,
+	)
+	return ingestion
+
+
+def _read(path):
+	return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+@pytest.mark.parametrize("chunk_size", [7, 37, 1000])
+@pytest.mark.parametrize("test_size", [0.2, 0.33])
+def test_every_class_is_within_one_row_of_its_test_share(tmp_path, ext, chunk_size, test_size):
+	rng = np.random.default_rng(0)
+	n = 1003
+	df = pd.DataFrame({
+		"CustomerID": np.arange(n),
+		"Age": rng.integers(18, 70, n),
+		"Gender": rng.choice(["Male", "Female"], n),
+		# imbalanced, with a third rare class
+		"ProdTaken": rng.choice([0, 1, 2], n, p=[0.8, 0.18, 0.02]),
+	})
+	source = tmp_path / "source.csv"
+	df.to_csv(source, index=False)
+
+	ingestion = _ingestion(tmp_path, source, ext, chunk_size, test_size)
+	summary = ingestion._streaming_split()
+	config = ingestion.ingestion_config
+	train, test = _read(config.train_data_path), _read(config.test_data_path)
+
+	assert summary["rows"] == len(train) + len(test) == n
+	assert not set(train["CustomerID"]) & set(test["CustomerID"])
+	for label, count in df["ProdTaken"].value_counts().items():
+		assert abs((test["ProdTaken"] == label).sum() - count * test_size) <= 1
+
+
+def test_parquet_schema_survives_later_missing_values(tmp_path):
+	df = pd.read_csv("notebook/data/Travel.xls").sort_values("Age", na_position="last", ignore_index=True)
+	# the first chunk has no missing value anywhere and an all-missing column; later ones have both
+	df.loc[:99, :] = df.loc[:99, :].fillna({"TypeofContact": "Self Enquiry"})
+	df["Notes"] = np.nan
+	df.loc[500:, "Notes"] = 1.5
+	df.loc[len(df) - 1, "ProdTaken"] = np.nan
+	source = tmp_path / "source.csv"
+	df.to_csv(source, index=False)
+
+	ingestion = _ingestion(tmp_path, source, ".parquet", 100)
+	summary = ingestion._streaming_split()
+	config = ingestion.ingestion_config
+	train, test = _read(config.train_data_path), _read(config.test_data_path)
+
+	assert summary["rows"] == len(train) + len(test) == len(df)
+	combined = pd.concat([train, test])
+	assert combined["Age"].isna().sum() == df["Age"].isna().sum() > 0
+	assert combined["Notes"].notna().sum() == df["Notes"].notna().sum()
+	assert combined["ProdTaken"].isna().sum() == 1
@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+sparse = pytest.importorskip("scipy.sparse")
+pytest.importorskip("sklearn")
+xgboost = pytest.importorskip("xgboost")
+
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+
+from src.components.dense_input import DenseInputClassifier
+from src.components.tree_compiler import CompiledTreeModel, compile_model
+
+
+def _data():
+	X, y = make_classification(n_samples=400, n_features=10, n_informative=5, random_state=0)
+	X[np.random.default_rng(0).random(X.shape) < 0.5] = 0.0
+	return X, y
+
+
+def _fitted():
+	X, y = _data()
+	model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+	return DenseInputClassifier.from_fitted(model), X
+
+
+def test_csr_and_dense_rows_score_the_same():
+	model, X = _fitted()
+	np.testing.assert_array_equal(model.predict_proba(sparse.csr_matrix(X)), model.predict_proba(X))
+	# one dense row, as the single-record fast path sends it
+	np.testing.assert_array_equal(model.predict_proba(X[:1]), model.predict_proba(sparse.csr_matrix(X)[:1]))
+
+
+def test_clone_refits_on_dense_input():
+	model, X = _fitted()
+	_, y = _data()
+	refit = clone(model).fit(sparse.csr_matrix(X), y)
+	np.testing.assert_array_equal(refit.predict_proba(X), model.predict_proba(X))
+
+
+def test_compiled_model_keeps_dense_semantics_for_csr():
+	model, X = _fitted()
+	compiled = compile_model(model, X_check=sparse.csr_matrix(X[:100]))
+	assert isinstance(compiled, CompiledTreeModel)
+	expected = model.predict_proba(X)
+	np.testing.assert_array_equal(compiled.predict_proba(sparse.csr_matrix(X)), expected)
+	np.testing.assert_array_equal(compiled.predict_proba(X), expected)
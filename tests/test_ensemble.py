@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.components import ensemble as ensemble_module
+from src.components.ensemble import EnsembleModel
+from src.metrics import metrics
+
+
+class ConstantModel:
+	"""predict_proba that returns `value` for every row after sleeping `delay` seconds."""
+	def __init__(self, value: float, delay: float=0.0):
+		self.value = value
+		self.delay = delay
+
+	def predict_proba(self, X):
+		time.sleep(self.delay)
+		positive = np.full(X.shape[0], self.value)
+		return np.column_stack([1.0 - positive, positive])
+
+
+def _ensemble(*models, **kwargs):
+	return EnsembleModel([(f"m{i}", model) for i, model in enumerate(models)], **kwargs)
+
+
+def test_soft_vote_averages_members():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.6))
+	np.testing.assert_allclose(model.predict_proba(np.zeros((3, 2)))[:, 1], 0.4)
+
+
+def test_pool_is_rebuilt_in_a_forked_child():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.6))
+	model.predict_proba(np.zeros((1, 2)))
+	assert model._executor is not None
+	assert model in ensemble_module._pooled_ensembles
+	# what os.register_at_fork runs in the child
+	ensemble_module._reset_pools_after_fork()
+	assert model._executor is None
+	np.testing.assert_allclose(model.predict_proba(np.zeros((1, 2)))[:, 1], 0.4)
+
+
+def test_members_see_paused_metrics():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.6))
+	before = metrics.render()
+	with metrics.paused():
+		model.predict_proba(np.zeros((1, 2)))
+	assert metrics.render() == before
+
+
+class MeanMetaModel:
+	"""Stacking meta model that averages the member probabilities it is given."""
+	def predict_proba(self, X):
+		positive = np.asarray(X).mean(axis=1)
+		return np.column_stack([1.0 - positive, positive])
+
+
+def _drain(model):
+	# let calls dropped at a deadline finish so they do not leak into other tests
+	model._executor.shutdown(wait=True)
+
+
+def test_member_past_the_budget_is_dropped_and_then_skipped():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.9, delay=0.5), budget_ms=50)
+	start = time.monotonic()
+	np.testing.assert_allclose(model.predict_proba(np.zeros((2, 2)))[:, 1], 0.2)
+	assert time.monotonic() - start < 0.4
+	assert model._stragglers == {1: 1}
+
+	# the dropped call is still running, so the next request does not start the member again
+	start = time.monotonic()
+	member_proba = model.member_probabilities(np.zeros((2, 2)))
+	assert time.monotonic() - start < 0.4
+	assert np.isnan(member_proba[:, 1]).all()
+	_drain(model)
+	assert model._stragglers == {}
+
+
+def test_request_deadline_applies_without_a_budget():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.9, delay=0.5))
+	token = ensemble_module.request_deadline.set(time.monotonic() + 0.05)
+	try:
+		np.testing.assert_allclose(model.predict_proba(np.zeros((1, 2)))[:, 1], 0.2)
+	finally:
+		ensemble_module.request_deadline.reset(token)
+	_drain(model)
+
+
+def test_stacking_substitutes_the_fallback_for_a_dropped_member():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.9, delay=0.5), method="stacked",
+		meta_model=MeanMetaModel(), fallback_proba=[0.5, 0.4], budget_ms=50)
+	np.testing.assert_allclose(model.predict_proba(np.zeros((1, 2)))[:, 1], 0.3)
+	_drain(model)
+
+
+def test_first_member_to_finish_is_kept_when_all_miss_the_deadline():
+	model = _ensemble(ConstantModel(0.2, delay=0.1), ConstantModel(0.9, delay=0.5), budget_ms=1)
+	np.testing.assert_allclose(model.predict_proba(np.zeros((1, 2)))[:, 1], 0.2)
+	_drain(model)
+
+
+def test_empty_input_keeps_the_member_columns():
+	model = _ensemble(ConstantModel(0.2), ConstantModel(0.6), budget_ms=50)
+	assert model.member_probabilities(np.zeros((0, 2))).shape == (0, 2)
+	assert model.predict_proba(np.zeros((0, 2))).shape == (0, 2)
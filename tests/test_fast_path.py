@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from src.components.data_transformation import DataTransformation
+from src.components.feature_engineering import FeatureEngineer
+from src.pipeline.fast_path import CompiledPreprocessor
+
+
+TRAVEL = "notebook/data/Travel.xls"
+
+
+@pytest.fixture(scope="module")
+def fitted():
+	df = pd.read_csv(TRAVEL).drop(columns=["ProdTaken"])
+	engineer = FeatureEngineer().fit(df)
+	features = engineer.transform(df)
+	preprocessor = DataTransformation().get_data_transformer_object(features).fit(features)
+	return engineer, features, preprocessor, CompiledPreprocessor.from_column_transformer(preprocessor)
+
+
+def _dense(X):
+	return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+def _compiled_rows(compiled, frame):
+	return np.vstack([compiled.transform_record(record) for record in frame.to_dict("records")])
+
+
+def test_transform_record_matches_column_transformer_on_training_frame(fitted):
+	_, features, preprocessor, compiled = fitted
+	assert features.isna().any().any()
+	np.testing.assert_array_equal(_compiled_rows(compiled, features), _dense(preprocessor.transform(features)))
+
+
+def test_transform_record_matches_column_transformer_on_unknown_categories(fitted):
+	_, features, preprocessor, compiled = fitted
+	frame = features.head(50).copy()
+	frame.loc[frame.index[::3], "Occupation"] = "Astronaut"
+	frame.loc[frame.index[1::3], "Gender"] = "Male "
+	frame.loc[frame.index[2::3], "ProductPitched"] = None
+	np.testing.assert_array_equal(_compiled_rows(compiled, frame), _dense(preprocessor.transform(frame)))
+
+
+def test_record_path_matches_frame_path_end_to_end(fitted):
+	engineer, _, preprocessor, compiled = fitted
+	raw = pd.read_csv(TRAVEL).drop(columns=["ProdTaken"]).head(200)
+	expected = _dense(preprocessor.transform(engineer.transform(raw)))
+	actual = np.vstack([compiled.transform_record(engineer.transform_record(record)) for record in raw.to_dict("records")])
+	np.testing.assert_array_equal(actual, expected)
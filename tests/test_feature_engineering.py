@@ -0,0 +1,39 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.components.feature_engineering import FeatureEngineer
+
+
+TRAVEL = "notebook/data/Travel.xls"
+
+
+@pytest.fixture(scope="module")
+def frame():
+	return pd.read_csv(TRAVEL).drop(columns=["ProdTaken"])
+
+
+def test_missing_input_of_a_fitted_feature_names_the_column(frame):
+	engineer = FeatureEngineer().fit(frame)
+	with pytest.raises(Exception, match="NumberOfChildrenVisiting"):
+		engineer.transform(frame.drop(columns=["NumberOfChildrenVisiting"]))
+	with pytest.raises(KeyError, match="NumberOfChildrenVisiting"):
+		engineer.transform_record({col: 1 for col in frame.columns if col != "NumberOfChildrenVisiting"})
+
+
+def test_json_null_input_matches_the_frame_path(frame):
+	engineer = FeatureEngineer().fit(frame)
+	record = frame[frame["NumberOfChildrenVisiting"].isna()].iloc[0].to_dict()
+	expected = engineer.transform(pd.DataFrame([record]))
+	record["NumberOfChildrenVisiting"] = None
+	actual = engineer.transform_record(record)
+	assert np.isnan(actual["TotalVisiting"]) and expected["TotalVisiting"].isna().all()
+	assert set(actual) == set(expected.columns)
+
+
+def test_fitted_recipes_survive_a_changed_table(frame, monkeypatch):
+	from src.components import feature_engineering
+	engineer = FeatureEngineer().fit(frame)
+	monkeypatch.setattr(feature_engineering, "FEATURES", {})
+	assert "TotalVisiting" in engineer.transform(frame.head()).columns
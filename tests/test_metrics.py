@@ -0,0 +1,49 @@
+from src.metrics import Metrics
+
+
+def _lines(text):
+	return text.strip().split("\n")
+
+
+def test_render_includes_external_counters_before_any_request():
+	metrics = Metrics()
+	lines = _lines(metrics.render({"cache_entries": 1}, {"cache_hits_total": 3}))
+	assert "# TYPE cache_hits_total counter" in lines
+	assert "cache_hits_total 3.0" in lines
+	assert "# TYPE cache_entries gauge" in lines
+	assert "cache_entries 1.0" in lines
+
+
+def test_render_after_recording_keeps_recorded_and_external_counters():
+	metrics = Metrics()
+	metrics.inc("requests_total", endpoint="predict", status="200")
+	metrics.observe("request_latency_seconds", 0.003, endpoint="predict")
+	lines = _lines(metrics.render({"cache_entries": 1}, {"cache_hits_total": 3}))
+	assert 'requests_total{endpoint="predict",status="200"} 1' in lines
+	assert 'request_latency_seconds_count{endpoint="predict"} 1' in lines
+	assert 'request_latency_seconds_bucket{endpoint="predict",le="0.005"} 1' in lines
+	assert "cache_hits_total 3.0" in lines
+	assert "cache_entries 1.0" in lines
+
+
+def test_none_values_are_skipped():
+	assert "missing" not in Metrics().render({"missing": None}, {"missing_total": None})
+
+
+def test_span_labels_stage_and_path():
+	metrics = Metrics()
+	with metrics.span("transform", path="single"):
+		pass
+	assert 'stage_latency_seconds_count{path="single",stage="transform"} 1' in _lines(metrics.render())
+
+
+def test_paused_and_disabled_record_nothing():
+	metrics = Metrics()
+	with metrics.paused():
+		metrics.inc("requests_total")
+		metrics.observe("request_latency_seconds", 0.1)
+		with metrics.span("transform"):
+			pass
+	disabled = Metrics(enabled=False)
+	disabled.inc("requests_total")
+	assert metrics.render() == disabled.render() == "\n"
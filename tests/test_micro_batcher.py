@@ -0,0 +1,62 @@
+import time
+import threading
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from src.components.ensemble import request_deadline
+from src.pipeline.micro_batcher import MicroBatcher, MicroBatcherConfig
+
+
+class RecordingPipeline:
+	"""Labels each record with its 'x' field and remembers the batches and deadlines it saw."""
+	def __init__(self):
+		self.batches = []
+		self.deadlines = []
+
+	def predict_record(self, record):
+		self.batches.append(1)
+		self.deadlines.append(request_deadline.get())
+		return np.array([record["x"]])
+
+	def predict(self, frame):
+		self.batches.append(len(frame))
+		self.deadlines.append(request_deadline.get())
+		return frame["x"].to_numpy()
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_label():
+	pipeline = RecordingPipeline()
+	batcher = MicroBatcher(pipeline, MicroBatcherConfig(max_batch_size=64, max_wait_ms=200.0))
+	futures = [batcher.submit({"x": i}) for i in range(20)]
+	assert [future.result(timeout=5) for future in futures] == list(range(20))
+	batcher.close()
+	assert sum(pipeline.batches) == 20 and len(pipeline.batches) < 20
+
+
+def test_batch_is_scored_under_the_earliest_caller_deadline():
+	pipeline = RecordingPipeline()
+	batcher = MicroBatcher(pipeline, MicroBatcherConfig(max_batch_size=2, max_wait_ms=1000.0))
+	results = []
+
+	def call(seconds):
+		deadline = time.monotonic() + seconds
+		request_deadline.set(deadline)
+		results.append((deadline, batcher.predict({"x": 1}, timeout=5)))
+
+	threads = [threading.Thread(target=call, args=(seconds,)) for seconds in (30.0, 5.0)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	batcher.close()
+	assert pipeline.deadlines == [min(deadline for deadline, _ in results)]
+
+
+def test_submit_after_close_raises():
+	batcher = MicroBatcher(RecordingPipeline())
+	batcher.close()
+	with pytest.raises(RuntimeError, match="closed"):
+		batcher.submit({"x": 1})
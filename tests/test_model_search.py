@@ -0,0 +1,31 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+
+from src.utils import _search
+
+
+GRID = {"C": [0.01, 0.1, 1.0, 10.0], "fit_intercept": [True, False]}
+
+
+def _data():
+	return make_classification(n_samples=200, n_features=6, random_state=0)
+
+
+def test_without_budget_one_search_matches_grid_search():
+	X, y = _data()
+	best_params, scored = _search(LogisticRegression(), GRID, X, y, "grid", 3, 1, None, 0, None)
+	assert scored == 8
+	assert best_params == GridSearchCV(LogisticRegression(), GRID, cv=3).fit(X, y).best_params_
+
+
+def test_spent_budget_stops_after_the_first_wave():
+	X, y = _data()
+	best_params, scored = _search(LogisticRegression(), GRID, X, y, "grid", 3, 1, None, 0, lambda: True)
+	assert scored == 1
+	assert best_params == {"C": 0.01, "fit_intercept": True}
@@ -0,0 +1,46 @@
+import os
+import gzip
+import shutil
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.components.readers import read_source, iter_source_chunks, sniff_format
+
+
+TRAVEL = os.path.join("notebook", "data", "Travel.xls")
+
+
+def test_travel_is_sniffed_as_csv():
+	assert sniff_format(TRAVEL) == "csv"
+
+
+def test_read_source_matches_pandas_including_missing_values():
+	expected = pd.read_csv(TRAVEL)
+	actual = read_source(TRAVEL)
+	pd.testing.assert_frame_equal(actual, expected)
+	assert actual["TypeofContact"].isna().sum() == expected["TypeofContact"].isna().sum() > 0
+	assert not (actual.select_dtypes(include="object") == "").any().any()
+
+
+def test_streaming_chunks_match_whole_read():
+	chunks = pd.concat(list(iter_source_chunks(TRAVEL, 1000)), ignore_index=True)
+	pd.testing.assert_frame_equal(chunks, read_source(TRAVEL), check_dtype=False)
+
+
+def test_gzip_is_sniffed_whatever_the_extension(tmp_path):
+	target = tmp_path / "travel.csv"
+	with open(TRAVEL, "rb") as src, gzip.open(target, "wb") as dst:
+		shutil.copyfileobj(src, dst)
+	assert sniff_format(str(target)) == "csv.gz"
+	pd.testing.assert_frame_equal(read_source(str(target)), pd.read_csv(TRAVEL))
+
+
+def test_sharded_directory_is_concatenated_in_path_order(tmp_path):
+	df = pd.read_csv(TRAVEL)
+	half = len(df) // 2
+	df.iloc[:half].to_parquet(tmp_path / "part-0.parquet", index=False)
+	df.iloc[half:].to_parquet(tmp_path / "part-1.parquet", index=False)
+	pd.testing.assert_frame_equal(read_source(str(tmp_path)), df)
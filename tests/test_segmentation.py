@@ -0,0 +1,40 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("dill")
+
+from src.components.data_transformation import DataTransformation
+from src.components.feature_engineering import FeatureEngineer
+from src.components.segmentation import CustomerSegmentationTrainer
+from src.utils import save_object
+
+
+TRAVEL = "notebook/data/Travel.xls"
+
+
+def test_streaming_segmentation_reads_in_chunks_and_profiles_every_segment(tmp_path):
+	df = pd.read_csv(TRAVEL)
+	train_path, test_path = tmp_path / "train.csv", tmp_path / "test.csv"
+	df.iloc[:4000].to_csv(train_path, index=False)
+	df.iloc[4000:].to_csv(test_path, index=False)
+
+	engineer = FeatureEngineer().fit(df)
+	features = engineer.transform(df.drop(columns=["ProdTaken"]))
+	preprocessor = DataTransformation().get_data_transformer_object(features).fit(features)
+	save_object(str(tmp_path / "features.pkl"), engineer)
+	save_object(str(tmp_path / "preprocessor.pkl"), preprocessor)
+
+	trainer = CustomerSegmentationTrainer()
+	trainer.config.segmenter_path = str(tmp_path / "segmenter.pkl")
+	trainer.config.segmenter_meta_path = str(tmp_path / "segmenter_meta.json")
+	trainer.config.feature_engineer_path = str(tmp_path / "features.pkl")
+	trainer.config.chunk_size = 700
+	trainer.config.silhouette_sample_size = 1500
+	trainer.config.use_cache = False
+	meta = trainer.train_streaming(str(train_path), str(test_path), str(tmp_path / "preprocessor.pkl"))
+
+	assert meta["best_k"] in trainer.config.k_candidates
+	assert -1.0 <= meta["silhouette"] <= 1.0
+	assert len(meta["profiles"]) == meta["best_k"]
+	assert (tmp_path / "segmenter.pkl").exists()
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+sparse = pytest.importorskip("scipy.sparse")
+pytest.importorskip("sklearn")
+
+from sklearn.datasets import make_classification
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.components.tree_compiler import compile_tree_model
+
+
+def _data():
+	X, y = make_classification(n_samples=600, n_features=12, n_informative=6, random_state=0)
+	# half the entries zero, so the CSR form really is sparse
+	X[np.random.default_rng(0).random(X.shape) < 0.5] = 0.0
+	return X, y
+
+
+def _adaboost():
+	# SAMME is the only algorithm left in recent sklearn, where the parameter is deprecated
+	if "algorithm" in AdaBoostClassifier().get_params():
+		return AdaBoostClassifier(n_estimators=40, algorithm="SAMME", random_state=0)
+	return AdaBoostClassifier(n_estimators=40, random_state=0)
+
+
+def _xgboost():
+	xgboost = pytest.importorskip("xgboost")
+	return xgboost.XGBClassifier(n_estimators=40, max_depth=4, random_state=0)
+
+
+MODELS = {
+	"decision_tree": lambda: DecisionTreeClassifier(max_depth=8, random_state=0),
+	"random_forest": lambda: RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0),
+	"gradient_boosting": lambda: GradientBoostingClassifier(n_estimators=40, max_depth=3, random_state=0),
+	"adaboost": _adaboost,
+	"xgboost": _xgboost,
+}
+
+
+@pytest.mark.parametrize("name", MODELS)
+@pytest.mark.parametrize("layout", ["dense", "csr"])
+def test_compiled_model_matches_original_bit_for_bit(name, layout):
+	X, y = _data()
+	model = MODELS[name]().fit(X, y)
+	compiled = compile_tree_model(model)
+	X_eval = sparse.csr_matrix(X) if layout == "csr" else X
+
+	expected = model.predict_proba(X_eval)
+	actual = compiled.predict_proba(X_eval)
+	assert actual.dtype == expected.dtype
+	np.testing.assert_array_equal(actual, expected)
+	np.testing.assert_array_equal(compiled.predict(X_eval), model.predict(X_eval))
+
+
+@pytest.mark.parametrize("name", ["decision_tree", "xgboost"])
+def test_compiled_model_routes_missing_values_like_the_original(name):
+	X, y = _data()
+	X[np.random.default_rng(1).random(X.shape) < 0.1] = np.nan
+	model = MODELS[name]().fit(X, y)
+	np.testing.assert_array_equal(compile_tree_model(model).predict_proba(X), model.predict_proba(X))
+
+
+def test_unsupported_model_raises():
+	from sklearn.linear_model import LogisticRegression
+	X, y = _data()
+	with pytest.raises(Exception, match="not a supported tree model"):
+		compile_tree_model(LogisticRegression().fit(X, y))